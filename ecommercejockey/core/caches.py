@@ -0,0 +1,394 @@
+"""
+This module defines caches used by API clients.
+
+"""
+
+
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import deepcopy
+from threading import Event, Lock
+
+
+class ApiResponseCache(object):
+    """
+    This class defines a persistent, content-addressed cache of API
+    response bodies. Each entry is a file named by the hash of its
+    endpoint and canonicalised params, so the cache is shared by all
+    threads and processes on the host.
+
+    Entries expire after their endpoint's TTL, and the least recently
+    used entries are evicted when the cache exceeds its maximum size.
+    Endpoints without a TTL are not cached.
+
+    Refreshing is a context variable, so it only applies to the thread
+    or task that is refreshing (and the calls it hands to workers).
+
+    """
+
+    def __init__(self, root, ttls, max_size):
+        """
+        Initializes cache with directory, TTLs, and size bound.
+
+        :param root: directory in which to store entries
+        :type root: str
+        :param ttls: seconds entries are fresh by endpoint
+        :type ttls: dict
+        :param max_size: maximum total size of entries in bytes
+        :type max_size: int
+
+        """
+
+        self.root = root
+        self.ttls = ttls
+        self.max_size = max_size
+        self._size = None
+        self._refreshing = ContextVar(
+            f'api_response_cache_refreshing_{id(self)}',
+            default=False
+        )
+        self._lock = Lock()
+        self._metrics = defaultdict(
+            lambda: {
+                'hits': 0,
+                'misses': 0,
+                'stores': 0
+            }
+        )
+
+    @staticmethod
+    def canonicalize(params):
+        """
+        Returns params as a canonical JSON string. None values are
+        dropped, keys are sorted, and list values are sorted (filters
+        are sets to the API).
+
+        :param params: request params
+        :type params: dict
+
+        :return: canonical params
+        :rtype: str
+
+        """
+
+        canonical = {}
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple)):
+                value = sorted(value, key=str)
+            canonical[key] = value
+        return json.dumps(canonical, sort_keys=True, default=str)
+
+    def get_key(self, endpoint, params):
+        canonical = f'{endpoint}?{self.canonicalize(params)}'
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.root, key[:2], f'{key}.json')
+
+    def is_cached(self, endpoint):
+        return bool(self.ttls.get(endpoint))
+
+    @property
+    def is_refreshing(self):
+        return self._refreshing.get()
+
+    @contextmanager
+    def refreshing(self, refresh=True):
+        """
+        Skips cache reads while in context, so responses are retrieved
+        from API (and cache is refreshed with them).
+
+        :param refresh: whether or not to refresh
+        :type refresh: bool
+
+        """
+
+        if not refresh:
+            yield
+            return
+
+        token = self._refreshing.set(True)
+        try:
+            yield
+        finally:
+            self._refreshing.reset(token)
+
+    def get(self, endpoint, params):
+        """
+        Returns cached body of endpoint and params if cached and fresh,
+        and marks entry as recently used.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+        :param params: request params
+        :type params: dict
+
+        :return: cached body or None
+        :rtype: object
+
+        """
+
+        if not self.is_cached(endpoint) or self.is_refreshing:
+            return None
+
+        path = self.get_path(self.get_key(endpoint, params))
+        body = None
+        try:
+            with open(path) as entry_file:
+                entry = json.load(entry_file)
+            if entry['stored'] + self.ttls[endpoint] > time.time():
+                body = entry['body']
+                os.utime(path)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        with self._lock:
+            metric = 'misses' if body is None else 'hits'
+            self._metrics[endpoint][metric] += 1
+        return body
+
+    def set(self, endpoint, params, body):
+        """
+        Stores body of endpoint and params, evicting least recently
+        used entries if cache exceeds maximum size.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+        :param params: request params
+        :type params: dict
+        :param body: response body
+        :type body: object
+
+        """
+
+        if not self.is_cached(endpoint):
+            return
+
+        path = self.get_path(self.get_key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as entry_file:
+            json.dump(
+                {
+                    'endpoint': endpoint,
+                    'params': self.canonicalize(params),
+                    'stored': time.time(),
+                    'body': body
+                },
+                entry_file
+            )
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._metrics[endpoint]['stores'] += 1
+            if self._size is None:
+                self._size = self.get_size()
+            else:
+                self._size += size
+            evict = self._size > self.max_size
+        if evict:
+            self.evict()
+
+    def get_entries(self):
+        """
+        Returns (path, last used, size) of each entry.
+
+        :return: entries
+        :rtype: list
+
+        """
+
+        entries = []
+        for directory, _, file_names in os.walk(self.root):
+            for file_name in file_names:
+                if not file_name.endswith('.json'):
+                    continue
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def get_size(self):
+        return sum(size for _, _, size in self.get_entries())
+
+    def evict(self):
+        """
+        Deletes least recently used entries until cache is below 90% of
+        maximum size.
+
+        """
+
+        entries = sorted(self.get_entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        target = self.max_size * 0.9
+        for path, _, entry_size in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                continue
+
+        with self._lock:
+            self._size = size
+
+    def clear(self):
+        """
+        Deletes all entries.
+
+        """
+
+        for path, _, _ in self.get_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+        with self._lock:
+            self._size = 0
+
+    @property
+    def stats(self):
+        """
+        Returns per-endpoint hit, miss, and store counts of this
+        process.
+
+        :return: counts by endpoint
+        :rtype: dict
+
+        **-Return Format-**
+        ::
+            ret = {
+                <str>: {
+                    "hits": <int>,
+                    "misses": <int>,
+                    "stores": <int>
+                },
+                {...}
+            }
+
+        """
+
+        with self._lock:
+            return {
+                endpoint: dict(values)
+                for endpoint, values in self._metrics.items()
+            }
+
+
+class SingleFlight(object):
+    """
+    This class defines a group of in-flight calls in which identical
+    concurrent calls are merged: the first caller of a key makes the
+    call, and callers of the same key that arrive while it is in flight
+    wait for it and share its result (or exception).
+
+    If a call was shared, every caller receives its own deep copy of
+    the result, since callers may modify data they are given.
+
+    """
+
+    class Call(object):
+        def __init__(self):
+            self.done = Event()
+            self.result = None
+            self.error = None
+            self.waiters = 0
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = Lock()
+        self._metrics = defaultdict(
+            lambda: {
+                'calls': 0,
+                'coalesced': 0
+            }
+        )
+
+    def do(self, endpoint, key, func):
+        """
+        Calls function, or waits for in-flight call of same key.
+
+        :param endpoint: endpoint name (for metrics)
+        :type endpoint: str
+        :param key: call key
+        :type key: str
+        :param func: function to call
+        :type func: callable
+
+        :return: function return value
+        :rtype: object
+
+        :raises Exception: exception raised by function
+
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.Call()
+                self._calls[key] = call
+                self._metrics[endpoint]['calls'] += 1
+            else:
+                call.waiters += 1
+                self._metrics[endpoint]['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return deepcopy(call.result)
+
+        try:
+            call.result = func()
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.waiters > 0
+            call.done.set()
+
+        if shared:
+            return deepcopy(call.result)
+        return call.result
+
+    @property
+    def stats(self):
+        """
+        Returns per-endpoint call and coalesced call counts.
+
+        :return: counts by endpoint
+        :rtype: dict
+
+        **-Return Format-**
+        ::
+            ret = {
+                <str>: {
+                    "calls": <int>,
+                    "coalesced": <int>
+                },
+                {...}
+            }
+
+        """
+
+        with self._lock:
+            return {
+                endpoint: dict(values)
+                for endpoint, values in self._metrics.items()
+            }
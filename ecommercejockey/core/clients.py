@@ -0,0 +1,1024 @@
+"""
+This module defines base API client components shared by all apps.
+
+"""
+
+
+import asyncio
+import codecs
+import contextvars
+import fcntl
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from threading import Lock
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+
+
+class HttpTransport(object):
+    """
+    This class defines a pooled, keep-alive HTTP transport. One
+    `requests.Session` is kept per host so connections (and their TLS
+    handshakes) are reused across calls.
+
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None,
+                 timeout=None):
+        """
+        Initializes transport with pool sizes and default timeout.
+
+        :param pool_connections: number of host pools to cache per
+            session
+        :type pool_connections: int
+        :param pool_maxsize: maximum number of connections kept alive
+            per host
+        :type pool_maxsize: int
+        :param timeout: default (connect, read) timeout in seconds
+        :type timeout: tuple
+
+        """
+
+        self.pool_connections = (
+            pool_connections or settings.API_POOL_CONNECTIONS
+        )
+        self.pool_maxsize = pool_maxsize or settings.API_POOL_MAXSIZE
+        self.timeout = timeout or (
+            settings.API_CONNECT_TIMEOUT,
+            settings.API_READ_TIMEOUT
+        )
+        self.adapter = None
+        self._sessions = {}
+        self._lock = Lock()
+        self._pid = os.getpid()
+
+    @staticmethod
+    def get_host(url):
+        """
+        Returns host (without credentials) of URL.
+
+        :param url: request URL
+        :type url: str
+
+        :return: host name and port
+        :rtype: str
+
+        """
+
+        parts = urlsplit(url)
+        host = parts.hostname or ''
+        if parts.port:
+            host += f':{parts.port}'
+        return host
+
+    def create_session(self):
+        """
+        Creates session with pooled adapters (or mounted adapter) and
+        default headers.
+
+        :return: session
+        :rtype: requests.Session
+
+        """
+
+        session = requests.Session()
+        session.headers.update(
+            {
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive'
+            }
+        )
+        adapter = self.adapter or HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def mount(self, adapter=None):
+        """
+        Mounts adapter on all sessions in place of pooled adapters, or
+        restores pooled adapters if adapter is None. Existing sessions
+        are closed.
+
+        :param adapter: `requests` transport adapter
+        :type adapter: requests.adapters.BaseAdapter
+
+        """
+
+        self.close()
+        with self._lock:
+            self.adapter = adapter
+
+    def get_session(self, url):
+        """
+        Returns session for URL host, creating it if necessary. Sessions
+        are discarded if process has been forked since they were
+        created.
+
+        :param url: request URL
+        :type url: str
+
+        :return: session
+        :rtype: requests.Session
+
+        """
+
+        host = self.get_host(url)
+        with self._lock:
+            if not self._pid == os.getpid():
+                self._sessions = {}
+                self._pid = os.getpid()
+            if host not in self._sessions:
+                self._sessions[host] = self.create_session()
+            return self._sessions[host]
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends request through pooled session of URL host.
+
+        :param method: HTTP method
+        :type method: str
+        :param url: request URL
+        :type url: str
+        :param kwargs: `requests` request kwargs
+
+        :return: requests Response object
+        :rtype: object
+
+        """
+
+        kwargs.setdefault('timeout', self.timeout)
+        session = self.get_session(url)
+        return session.request(method=method, url=url, **kwargs)
+
+    @property
+    def stats(self):
+        """
+        Returns per-host connection counts. `reused` is the number of
+        requests that did not need a new connection.
+
+        :return: connection counts by host
+        :rtype: dict
+
+        **-Return Format-**
+        ::
+            ret = {
+                <str>: {
+                    "requests": <int>,
+                    "connections": <int>,
+                    "reused": <int>
+                },
+                {...}
+            }
+
+        """
+
+        stats = {}
+        with self._lock:
+            sessions = list(self._sessions.items())
+
+        for host, session in sessions:
+            host_stats = {'requests': 0, 'connections': 0, 'reused': 0}
+            for adapter in set(session.adapters.values()):
+                if not hasattr(adapter, 'poolmanager'):
+                    continue
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    host_stats['requests'] += pool.num_requests
+                    host_stats['connections'] += pool.num_connections
+            host_stats['reused'] = max(
+                host_stats['requests'] - host_stats['connections'], 0
+            )
+            stats[host] = host_stats
+        return stats
+
+    def close(self):
+        """
+        Closes all sessions and their pooled connections.
+
+        """
+
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+
+http_transport = HttpTransport()
+
+
+class StreamingJsonBody(object):
+    """
+    This class defines an incrementally decoded JSON object body. The
+    items of one top-level array are decoded and yielded one at a time
+    as the body is iterated, so memory use does not grow with the
+    length of the array. Other top-level values are decoded into
+    `head` (those before the array) and `tail` (those after it).
+
+    """
+
+    WHITESPACE = ' \t\n\r'
+    STRING_PATTERN = re.compile(r'["\\]')
+    STRUCTURE_PATTERN = re.compile(r'["{}\[\]]')
+
+    def __init__(self, chunks, key):
+        """
+        Initializes body with byte chunks and array key, and decodes
+        values up to the array.
+
+        :param chunks: iterable of body byte chunks
+        :type chunks: iterable
+        :param key: key of top-level array to stream
+        :type key: str
+
+        :raises ValueError: body is not a JSON object
+
+        """
+
+        self.chunks = iter(chunks)
+        self.key = key
+        self.head = {}
+        self.tail = {}
+        self.is_streaming = False
+        self.is_exhausted = False
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._position = 0
+        self.expect('{')
+        self.decode_members(self.head, stop_key=key)
+
+    def fill(self):
+        """
+        Appends next chunk to buffer, discarding decoded text.
+
+        :return: whether or not a chunk was appended
+        :rtype: bool
+
+        """
+
+        for chunk in self.chunks:
+            text = self._text_decoder.decode(chunk)
+            if text:
+                self._buffer = self._buffer[self._position:] + text
+                self._position = 0
+                return True
+        return False
+
+    def peek(self):
+        """
+        Returns next non-whitespace character without consuming it.
+
+        :return: character
+        :rtype: str
+
+        :raises ValueError: body ends unexpectedly
+
+        """
+
+        while True:
+            while (self._position < len(self._buffer)
+                    and self._buffer[self._position] in self.WHITESPACE):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self.fill():
+                raise ValueError('Unexpected end of JSON body')
+
+    def expect(self, characters):
+        """
+        Consumes and returns next non-whitespace character.
+
+        :param characters: allowed characters
+        :type characters: str
+
+        :return: character
+        :rtype: str
+
+        :raises ValueError: character not allowed
+
+        """
+
+        character = self.peek()
+        if character not in characters:
+            raise ValueError(
+                f'Expected one of {characters!r} in JSON body, '
+                f'got {character!r}'
+            )
+        self._position += 1
+        return character
+
+    def find_value_end(self):
+        """
+        Returns buffer index after the object, array, or string value
+        at position, reading chunks until it is buffered. Characters are
+        scanned once, however many chunks the value spans.
+
+        :return: end index
+        :rtype: int
+
+        :raises ValueError: body ends unexpectedly
+
+        """
+
+        depth = 0
+        is_string = False
+        offset = 0
+        while True:
+            index = self._position + offset
+            while True:
+                if is_string:
+                    match = self.STRING_PATTERN.search(self._buffer, index)
+                else:
+                    match = self.STRUCTURE_PATTERN.search(self._buffer, index)
+                if not match:
+                    index = len(self._buffer)
+                    break
+
+                character = match.group()
+                if character == '\\':
+                    # The escaped character may be in the next chunk.
+                    if match.end() == len(self._buffer):
+                        index = match.start()
+                        break
+                    index = match.end() + 1
+                    continue
+
+                index = match.end()
+                if character == '"':
+                    is_string = not is_string
+                elif character in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                if not is_string and depth == 0:
+                    return index
+
+            offset = index - self._position
+            if not self.fill():
+                raise ValueError('Unexpected end of JSON body')
+
+    def decode_value(self):
+        """
+        Consumes and returns next JSON value, reading chunks until
+        value is complete. Objects, arrays, and strings are decoded once
+        they are buffered; other values are short, so are decoded again
+        after each chunk until complete.
+
+        :return: value
+        :rtype: object
+
+        """
+
+        if self.peek() in '{["':
+            self.find_value_end()
+            value, end = self._decoder.raw_decode(self._buffer, self._position)
+            self._position = end
+            return value
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(
+                    self._buffer,
+                    self._position
+                )
+                # A value ending at the buffer end may be truncated
+                # (e.g. a number), so it is only complete if followed
+                # by a delimiter or the body has no more chunks
+                if end < len(self._buffer) or not self.fill():
+                    self._position = end
+                    return value
+            except ValueError:
+                if not self.fill():
+                    raise
+
+    def decode_members(self, members, stop_key=None):
+        """
+        Decodes object members into dictionary until object ends or
+        stop key is reached.
+
+        :param members: dictionary to which to add members
+        :type members: dict
+        :param stop_key: key at which to stop (before its value)
+        :type stop_key: str
+
+        """
+
+        if self.peek() == '}':
+            self._position += 1
+            return
+
+        while True:
+            key = self.decode_value()
+            self.expect(':')
+            if key == stop_key:
+                self.expect('[')
+                self.is_streaming = True
+                return
+            members[key] = self.decode_value()
+            if self.expect(',}') == '}':
+                return
+
+    def __iter__(self):
+        """
+        Yields array items, then decodes remaining values into `tail`.
+
+        """
+
+        if not self.is_streaming or self.is_exhausted:
+            return
+
+        if self.peek() == ']':
+            self._position += 1
+        else:
+            while True:
+                yield self.decode_value()
+                if self.expect(',]') == ']':
+                    break
+
+        if self.expect(',}') == ',':
+            self.decode_members(self.tail)
+        self.is_exhausted = True
+
+    @property
+    def body(self):
+        """
+        Returns decoded top-level values other than streamed array.
+
+        :return: body values
+        :rtype: dict
+
+        """
+
+        return {**self.head, **self.tail}
+
+
+class ApiTokenStore(object):
+    """
+    This class defines a file-backed cache for API tokens and their
+    expiry. Token files are shared by all processes on the host, and
+    retrieval is guarded by a file lock so a pool of workers
+    authenticates once instead of once per process. Tokens are
+    credentials, so the directory and files are only readable by the
+    owner.
+
+    """
+
+    def __init__(self, root=None):
+        """
+        Initializes store with token directory.
+
+        :param root: directory in which to store tokens
+        :type root: str
+
+        """
+
+        self.root = root or settings.API_TOKEN_ROOT
+
+    def get_path(self, name):
+        return os.path.join(self.root, f'{name}.json')
+
+    def make_root(self):
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        os.chmod(self.root, 0o700)
+
+    @contextmanager
+    def locked(self, name):
+        """
+        Holds exclusive lock on named token while in context.
+
+        :param name: token name
+        :type name: str
+
+        """
+
+        self.make_root()
+        lock_fd = os.open(
+            f'{self.get_path(name)}.lock',
+            os.O_WRONLY | os.O_CREAT,
+            0o600
+        )
+        with os.fdopen(lock_fd, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, name):
+        """
+        Returns named token if stored and not expired.
+
+        :param name: token name
+        :type name: str
+
+        :return: token or None
+        :rtype: str
+
+        """
+
+        try:
+            with open(self.get_path(name)) as token_file:
+                data = json.load(token_file)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('expires', 0) <= time.time():
+            return None
+        return data.get('token')
+
+    def set(self, name, token, timeout):
+        """
+        Stores named token with expiry.
+
+        :param name: token name
+        :type name: str
+        :param token: token
+        :type token: str
+        :param timeout: seconds until token expires
+        :type timeout: int
+
+        """
+
+        self.make_root()
+        path = self.get_path(name)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        temp_fd = os.open(
+            temp_path,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+            0o600
+        )
+        with os.fdopen(temp_fd, 'w') as token_file:
+            json.dump(
+                {'token': token, 'expires': time.time() + timeout},
+                token_file
+            )
+        os.replace(temp_path, path)
+
+    def get_or_retrieve(self, name, retrieve, timeout):
+        """
+        Returns named token, retrieving and storing it if not stored
+        or expired.
+
+        :param name: token name
+        :type name: str
+        :param retrieve: callable that retrieves new token
+        :type retrieve: callable
+        :param timeout: seconds until new token expires
+        :type timeout: int
+
+        :return: token
+        :rtype: str
+
+        """
+
+        token = self.get(name)
+        if token:
+            return token
+
+        with self.locked(name):
+            token = self.get(name)
+            if not token:
+                token = retrieve()
+                self.set(name, token, timeout)
+            return token
+
+    def refresh(self, name, retrieve, timeout, rejected_token=None):
+        """
+        Retrieves and stores new named token. If the stored token is no
+        longer the rejected token, another worker has already replaced
+        it, so it is returned instead of retrieving another.
+
+        :param name: token name
+        :type name: str
+        :param retrieve: callable that retrieves new token
+        :type retrieve: callable
+        :param timeout: seconds until new token expires
+        :type timeout: int
+        :param rejected_token: token rejected by API
+        :type rejected_token: str
+
+        :return: token
+        :rtype: str
+
+        """
+
+        with self.locked(name):
+            token = self.get(name)
+            if rejected_token and token and not token == rejected_token:
+                return token
+
+            token = retrieve()
+            self.set(name, token, timeout)
+            return token
+
+
+token_store = ApiTokenStore()
+
+
+class BaseApiClient(object):
+    """
+    This base class defines base attributes for API clients. All calls
+    are sent through the shared pooled transport.
+
+    """
+
+    transport = http_transport
+    token_store = token_store
+    rate_limiter = None
+    rate_limit_status_code = None
+
+    @staticmethod
+    def get_endpoint(url):
+        """
+        Returns endpoint (URL path) used to budget requests.
+
+        :param url: request URL
+        :type url: str
+
+        :return: endpoint
+        :rtype: str
+
+        """
+
+        return urlsplit(url).path
+
+    @staticmethod
+    def get_request_token(response, key):
+        """
+        Returns token sent with the request of response, as query
+        parameter or json body value `key`.
+
+        :param response: requests Response object
+        :type response: object
+        :param key: token parameter name
+        :type key: str
+
+        :return: token or None
+        :rtype: str
+
+        """
+
+        request = response.request
+        values = parse_qs(urlsplit(request.url).query).get(key)
+        if values:
+            return values[0]
+
+        try:
+            return json.loads(request.body).get(key)
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends request through shared transport. If client has a rate
+        limiter, request is paced before it is sent and the response
+        status is fed back to the limiter (rate limited responses
+        decrease the rate, and 2xx responses increase it).
+
+        :param method: HTTP method
+        :type method: str
+        :param url: request URL
+        :type url: str
+        :param kwargs: `requests` request kwargs
+
+        :return: requests Response object
+        :rtype: object
+
+        """
+
+        if not self.rate_limiter:
+            return self.transport.request(method, url, **kwargs)
+
+        endpoint = self.get_endpoint(url)
+        self.rate_limiter.acquire(endpoint)
+        response = self.transport.request(method, url, **kwargs)
+        if response.status_code == self.rate_limit_status_code:
+            self.rate_limiter.record_rate_limited(endpoint)
+        elif 200 <= response.status_code < 300:
+            self.rate_limiter.record_success(endpoint)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    @property
+    def connection_stats(self):
+        """
+        Returns shared transport per-host connection counts.
+
+        :return: connection counts by host
+        :rtype: dict
+
+        """
+
+        return self.transport.stats
+
+    @property
+    def rate_limit_stats(self):
+        """
+        Returns rate limiter per-endpoint metrics.
+
+        :return: metrics by endpoint
+        :rtype: dict
+
+        """
+
+        if not self.rate_limiter:
+            return {}
+        return self.rate_limiter.stats
+
+
+class AsyncApiRequest(object):
+    """
+    This class defines a sent asynchronous API request. It has the
+    `requests` PreparedRequest attributes used by clients.
+
+    """
+
+    def __init__(self, url, body=None):
+        self.url = url
+        self.body = body
+
+
+class AsyncApiResponse(object):
+    """
+    This class defines a fully read asynchronous API response. It has
+    the `requests` Response attributes used by clients, so the same
+    body checks apply to both.
+
+    """
+
+    def __init__(self, url, status_code, reason, text, request=None):
+        self.url = url
+        self.request = request
+        self.status_code = status_code
+        self.reason = reason
+        self.text = text
+
+    def raise_for_status(self):
+        """
+        Raises `requests` HTTPError if status code is not in 200s or
+        300s.
+
+        :raises HTTPError: response status code is 400 or greater
+
+        """
+
+        if self.status_code >= 400:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.HTTPError(
+                f'{self.status_code} {kind} Error: '
+                f'{self.reason} for url: {self.url}',
+                response=self
+            )
+
+
+class AsyncBaseApiClient(object):
+    """
+    This base class defines base attributes for asyncio API clients.
+    Calls are coroutines sent through one pooled, keep-alive `aiohttp`
+    session per client, and are paced by the same (shared) rate
+    limiter as synchronous clients. Rate limiter and token store calls
+    lock files, so they are run in the default executor to keep the
+    event loop free.
+
+    """
+
+    token_store = token_store
+    rate_limiter = None
+    rate_limit_status_code = None
+    get_endpoint = staticmethod(BaseApiClient.get_endpoint)
+    get_request_token = staticmethod(BaseApiClient.get_request_token)
+
+    def __init__(self, max_connections=None, timeout=None):
+        """
+        Initializes client with connection limit and default timeout.
+        Session is created on first request, inside the running loop.
+
+        :param max_connections: maximum number of simultaneous
+            connections
+        :type max_connections: int
+        :param timeout: default (connect, read) timeout in seconds
+        :type timeout: tuple
+
+        """
+
+        self.max_connections = (
+            max_connections or settings.API_ASYNC_MAX_CONNECTIONS
+        )
+        self.timeout = timeout or (
+            settings.API_CONNECT_TIMEOUT,
+            settings.API_READ_TIMEOUT
+        )
+        # Base URLs of servers (e.g. fake API servers) requests to a
+        # host are sent to instead, by host
+        self.redirects = {}
+        self._session = None
+
+    @staticmethod
+    def get_params(params):
+        """
+        Returns query parameters as `aiohttp` accepts them, encoded the
+        way `requests` encodes them: None values are dropped, lists are
+        repeated keys, and other values are strings.
+
+        :param params: query parameters
+        :type params: dict
+
+        :return: query parameter pairs
+        :rtype: list
+
+        """
+
+        pairs = []
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple)) else [value]
+            pairs += [(key, str(item)) for item in values]
+        return pairs
+
+    def get_redirect(self, url):
+        """
+        Returns URL request is sent to, and its Host header (None if
+        request is not redirected).
+
+        :param url: request URL
+        :type url: str
+
+        :return: URL and Host header
+        :rtype: tuple
+
+        """
+
+        parts = urlsplit(url)
+        base_url = self.redirects.get(parts.hostname)
+        if not base_url:
+            return url, None
+
+        base_parts = urlsplit(base_url)
+        return urlunsplit(
+            (base_parts.scheme, base_parts.netloc) + tuple(parts[2:])
+        ), parts.netloc
+
+    def get_session(self):
+        """
+        Returns session, creating it if necessary.
+
+        :return: session
+        :rtype: aiohttp.ClientSession
+
+        """
+
+        if not self._session or self._session.closed:
+            connect_timeout, read_timeout = self.timeout
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect_timeout,
+                    sock_read=read_timeout
+                ),
+                headers={'Accept-Encoding': 'gzip, deflate'}
+            )
+        return self._session
+
+    async def run_sync(self, func, *args):
+        """
+        Runs blocking function in default executor, in a copy of the
+        current context.
+
+        :param func: blocking function
+        :type func: callable
+
+        :return: function return value
+        :rtype: object
+
+        """
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, context.run, func, *args)
+
+    async def request(self, method, url, params=None, **kwargs):
+        """
+        Sends request through session and reads response. If client has
+        a rate limiter, request is paced before it is sent and the
+        response status is fed back to the limiter (rate limited
+        responses decrease the rate, and 2xx responses increase it).
+
+        :param method: HTTP method
+        :type method: str
+        :param url: request URL
+        :type url: str
+        :param params: query parameters
+        :type params: dict
+        :param kwargs: `aiohttp` request kwargs
+
+        :return: response
+        :rtype: AsyncApiResponse
+
+        """
+
+        if self.rate_limiter:
+            endpoint = self.get_endpoint(url)
+            wait = await self.run_sync(self.rate_limiter.reserve, endpoint)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        sent_url, host = self.get_redirect(url)
+        if host:
+            kwargs['headers'] = {**kwargs.get('headers', {}), 'Host': host}
+        async with self.get_session().request(
+                method, sent_url, params=self.get_params(params), **kwargs
+        ) as response:
+            response = AsyncApiResponse(
+                url=str(response.url),
+                status_code=response.status,
+                reason=response.reason,
+                text=await response.text(),
+                request=AsyncApiRequest(
+                    url=str(response.url),
+                    body=(
+                        json.dumps(kwargs['json'])
+                        if 'json' in kwargs else None
+                    )
+                )
+            )
+
+        if self.rate_limiter:
+            if response.status_code == self.rate_limit_status_code:
+                await self.run_sync(
+                    self.rate_limiter.record_rate_limited,
+                    endpoint
+                )
+            elif 200 <= response.status_code < 300:
+                await self.run_sync(
+                    self.rate_limiter.record_success,
+                    endpoint
+                )
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request('PUT', url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request('DELETE', url, **kwargs)
+
+    async def close(self):
+        """
+        Closes session and its pooled connections.
+
+        """
+
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def rate_limit_stats(self):
+        """
+        Returns rate limiter per-endpoint metrics.
+
+        :return: metrics by endpoint
+        :rtype: dict
+
+        """
+
+        if not self.rate_limiter:
+            return {}
+        return self.rate_limiter.stats
@@ -11,3 +11,12 @@ class ApiInvalidContentToken(Exception):
 class ApiRateLimitExceeded(Exception):
     def __init__(self):
         Exception.__init__(self, "Rate limit exceeded")
+
+
+class ConcurrentCallError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        Exception.__init__(
+            self,
+            '; '.join(f'{item}: {error}' for item, error in errors)
+        )
@@ -0,0 +1,657 @@
+"""
+This module defines fake API components used to benchmark API
+pipelines offline. Fake APIs are served in process by a transport
+adapter that is mounted on the shared HTTP transport, so clients and
+their pipelines run unchanged against synthetic or recorded responses.
+Asyncio clients are served the same way by a local server in front of
+the adapter.
+
+"""
+
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from http.client import responses as status_reasons
+from io import BytesIO
+from threading import Lock
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from aiohttp import web
+from aiohttp.test_utils import RawTestServer
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from core.caches import ApiResponseCache
+from core.clients import http_transport
+
+
+class FakeApiRequest(object):
+    """
+    This class defines a request received by a fake API. Query params
+    and JSON body values are merged into `params`.
+
+    """
+
+    def __init__(self, method, url, headers, body):
+        self.method = method.upper()
+        self.url = url
+        self.headers = headers
+        self.path = urlsplit(url).path
+        self.params = {
+            key: values[0] if len(values) == 1 else values
+            for key, values in parse_qs(urlsplit(url).query).items()
+        }
+        self.body = body or b''
+        if isinstance(self.body, str):
+            self.body = self.body.encode('utf-8')
+        content_type = headers.get('Content-Type', '')
+        if self.body and content_type.startswith('application/json'):
+            self.params.update(json.loads(self.body))
+
+    def get_list(self, key):
+        """
+        Returns param value as list (params may be sent once, repeated,
+        or comma-separated).
+
+        :param key: param name
+        :type key: str
+
+        :return: param values
+        :rtype: list
+
+        """
+
+        value = self.params.get(key)
+        if value is None or value == '':
+            return []
+        if isinstance(value, str):
+            return value.split(',')
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        return [value]
+
+
+class FakeApi(object):
+    """
+    This base class defines a fake API. Requests are routed by method
+    and path (relative to the API base URL) to handler methods, which
+    return a status code and a body. Generated data is a deterministic
+    function of `seed` and `scale`.
+
+    """
+
+    base_url = None
+    rate_limit_status_code = None
+    routes = ()
+
+    def __init__(self, scale=1, seed=0, base_url=None):
+        """
+        Initializes fake API with payload scale and seed.
+
+        :param scale: factor applied to generated collection sizes
+        :type scale: int
+        :param seed: seed of generated data
+        :type seed: int
+        :param base_url: API base URL (defaults to class attribute)
+        :type base_url: str
+
+        """
+
+        self.scale = max(int(scale), 1)
+        self.seed = seed
+        if base_url:
+            self.base_url = base_url
+        parts = urlsplit(self.base_url)
+        self.host = parts.hostname
+        self.base_path = parts.path.rstrip('/')
+        self._routes = [
+            (method, re.compile(f'^{pattern}$'), handler)
+            for method, pattern, handler in self.routes
+        ]
+
+    def get_random(self, *key):
+        """
+        Returns random generator seeded by API seed and key, so values
+        generated for a key do not depend on request order.
+
+        :param key: values identifying generated item
+        :type key: tuple
+
+        :return: random generator
+        :rtype: random.Random
+
+        """
+
+        return random.Random(f'{self.seed}:{":".join(map(str, key))}')
+
+    def handle(self, request):
+        """
+        Routes request to handler.
+
+        :param request: fake API request
+        :type request: FakeApiRequest
+
+        :return: status code and body (dict or list sent as JSON, str
+            sent as HTML)
+        :rtype: tuple
+
+        """
+
+        path = request.path[len(self.base_path):]
+        for method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match and method == request.method:
+                return getattr(self, handler)(request, *match.groups())
+        return requests.codes.not_found, {'errors': 'Not Found'}
+
+
+class ApiFixtureStore(object):
+    """
+    This class defines a directory of recorded API responses. Fixtures
+    are keyed by method, host, path, and canonicalised params and body,
+    with credentials excluded, so they replay for any token.
+
+    """
+
+    CREDENTIAL_PARAMS = [
+        'apiKey',
+        'contenttoken',
+        'password',
+        'token',
+        'userName'
+    ]
+
+    def __init__(self, root):
+        """
+        Initializes store with fixture directory.
+
+        :param root: directory in which to store fixtures
+        :type root: str
+
+        """
+
+        self.root = root
+
+    def get_key(self, request):
+        """
+        Returns fixture key of request.
+
+        :param request: fake API request
+        :type request: FakeApiRequest
+
+        :return: fixture key
+        :rtype: str
+
+        """
+
+        params = {
+            key: value for key, value in request.params.items()
+            if key not in self.CREDENTIAL_PARAMS
+        }
+        canonical = (
+            f'{request.method} {urlsplit(request.url).hostname}'
+            f'{request.path}?{ApiResponseCache.canonicalize(params)}'
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.root, key[:2], f'{key}.json')
+
+    def get(self, request):
+        """
+        Returns recorded status code, content type, and content of
+        request, if recorded.
+
+        :param request: fake API request
+        :type request: FakeApiRequest
+
+        :return: status code, content type, and content or None
+        :rtype: tuple
+
+        """
+
+        try:
+            with open(self.get_path(self.get_key(request))) as fixture_file:
+                fixture = json.load(fixture_file)
+            return (
+                fixture['status_code'],
+                fixture['content_type'],
+                fixture['content'].encode('utf-8')
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, request, status_code, content_type, content):
+        """
+        Records response of request.
+
+        :param request: fake API request
+        :type request: FakeApiRequest
+        :param status_code: response status code
+        :type status_code: int
+        :param content_type: response content type
+        :type content_type: str
+        :param content: response content
+        :type content: bytes
+
+        """
+
+        path = self.get_path(self.get_key(request))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as fixture_file:
+            json.dump(
+                {
+                    'method': request.method,
+                    'path': request.path,
+                    'status_code': status_code,
+                    'content_type': content_type,
+                    'content': content.decode('utf-8', 'replace')
+                },
+                fixture_file
+            )
+        os.replace(temp_path, path)
+
+
+class FakeApiAdapter(BaseAdapter):
+    """
+    This class defines a `requests` transport adapter that serves fake
+    APIs in process, with simulated latency and rate limiting.
+
+    In `replay` mode, recorded fixtures are served when they exist and
+    fake API responses otherwise. In `record` mode, requests are sent
+    to the real APIs and their responses are recorded as fixtures.
+
+    Rate limit rejections are injected either at a fixed ratio of
+    requests (decided per request, independent of request order and
+    timing) or whenever a host receives more than `max_rate` requests
+    in a second.
+
+    """
+
+    def __init__(self, apis, latency=0.0, jitter=0.0, rate_limit_ratio=0.0,
+                 max_rate=None, seed=0, fixtures_root=None, mode='replay'):
+        """
+        Initializes adapter with fake APIs and simulation options.
+
+        :param apis: fake APIs to serve
+        :type apis: list
+        :param latency: seconds added to each response
+        :type latency: float
+        :param jitter: maximum random seconds added to latency
+        :type jitter: float
+        :param rate_limit_ratio: ratio of requests rejected as rate
+            limited (0 to 1)
+        :type rate_limit_ratio: float
+        :param max_rate: requests per second per host above which
+            requests are rejected as rate limited
+        :type max_rate: float
+        :param seed: seed of latency jitter and rejections
+        :type seed: int
+        :param fixtures_root: directory of recorded fixtures
+        :type fixtures_root: str
+        :param mode: `replay` or `record`
+        :type mode: str
+
+        :raises Exception: invalid mode
+
+        """
+
+        if mode not in ['replay', 'record']:
+            raise Exception('Invalid mode')
+
+        super().__init__()
+        self.apis = {api.host: api for api in apis}
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.max_rate = max_rate
+        self.seed = seed
+        self.fixtures = (
+            ApiFixtureStore(fixtures_root) if fixtures_root else None
+        )
+        self.mode = mode
+        self.real_adapter = HTTPAdapter() if mode == 'record' else None
+        self._attempts = defaultdict(int)
+        self._sent = defaultdict(deque)
+        self._lock = Lock()
+        self._metrics = defaultdict(
+            lambda: {
+                'requests': 0,
+                'rate_limited': 0,
+                'replayed': 0,
+                'recorded': 0,
+                'bytes': 0
+            }
+        )
+
+    def get_api(self, host):
+        """
+        Returns fake API of host.
+
+        :param host: request host
+        :type host: str
+
+        :return: fake API
+        :rtype: FakeApi
+
+        :raises Exception: no fake API for host
+
+        """
+
+        try:
+            return self.apis[host]
+        except KeyError:
+            raise Exception(f'No fake API for {host}')
+
+    def is_rate_limited(self, host, key):
+        """
+        Returns whether or not request is rejected as rate limited.
+        Retries of a request are numbered, so each attempt has its own
+        (deterministic) outcome.
+
+        :param host: request host
+        :type host: str
+        :param key: request key
+        :type key: str
+
+        :return: whether or not request is rate limited
+        :rtype: bool
+
+        """
+
+        now = time.time()
+        with self._lock:
+            attempt = self._attempts[key]
+            self._attempts[key] += 1
+            sent = self._sent[host]
+            sent.append(now)
+            while sent and sent[0] <= now - 1:
+                sent.popleft()
+            if self.max_rate and len(sent) > self.max_rate:
+                return True
+
+        if self.rate_limit_ratio:
+            draw = random.Random(f'{self.seed}:{key}:{attempt}').random()
+            return draw < self.rate_limit_ratio
+        return False
+
+    def get_delay(self, key):
+        jitter = 0.0
+        if self.jitter:
+            jitter = random.Random(f'{self.seed}:{key}').uniform(
+                0, self.jitter
+            )
+        return self.latency + jitter
+
+    def build_response(self, request, status_code, content_type, content):
+        """
+        Returns `requests` response of content.
+
+        :param request: requests PreparedRequest object
+        :type request: object
+        :param status_code: response status code
+        :type status_code: int
+        :param content_type: response content type
+        :type content_type: str
+        :param content: response content
+        :type content: bytes
+
+        :return: requests Response object
+        :rtype: object
+
+        """
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.reason = status_reasons.get(status_code, '')
+        response.headers = CaseInsensitiveDict(
+            {
+                'Content-Type': content_type,
+                'Content-Length': str(len(content))
+            }
+        )
+        response.raw = BytesIO(content)
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        """
+        Serves request from fixtures or fake API (or real API if
+        recording).
+
+        :param request: requests PreparedRequest object
+        :type request: object
+
+        :return: requests Response object
+        :rtype: object
+
+        """
+
+        host = urlsplit(request.url).hostname
+        fake_request = FakeApiRequest(
+            method=request.method,
+            url=request.url,
+            headers=request.headers,
+            body=request.body
+        )
+
+        if self.mode == 'record':
+            response = self.real_adapter.send(
+                request, stream=False, timeout=timeout, verify=verify,
+                cert=cert, proxies=proxies
+            )
+            self.fixtures.set(
+                fake_request,
+                status_code=response.status_code,
+                content_type=response.headers.get('Content-Type', ''),
+                content=response.content
+            )
+            with self._lock:
+                self._metrics[host]['requests'] += 1
+                self._metrics[host]['recorded'] += 1
+                self._metrics[host]['bytes'] += len(response.content)
+            return response
+
+        api = self.get_api(host)
+        key = f'{request.method} {request.url} {fake_request.body!r}'
+        time.sleep(self.get_delay(key))
+
+        replayed = False
+        rate_limited = (
+            api.rate_limit_status_code
+            and self.is_rate_limited(host, key)
+        )
+        if rate_limited:
+            status_code = api.rate_limit_status_code
+            content_type = 'application/json'
+            content = json.dumps({'errors': 'Rate limit exceeded'})
+            content = content.encode('utf-8')
+        else:
+            fixture = None
+            if self.fixtures:
+                fixture = self.fixtures.get(fake_request)
+            if fixture:
+                status_code, content_type, content = fixture
+                replayed = True
+            else:
+                status_code, body = api.handle(fake_request)
+                if isinstance(body, str):
+                    content_type = 'text/html; charset=utf-8'
+                    content = body.encode('utf-8')
+                else:
+                    content_type = 'application/json; charset=utf-8'
+                    content = json.dumps(body).encode('utf-8')
+
+        with self._lock:
+            metrics = self._metrics[host]
+            metrics['requests'] += 1
+            metrics['rate_limited'] += int(bool(rate_limited))
+            metrics['replayed'] += int(replayed)
+            metrics['bytes'] += len(content)
+        return self.build_response(
+            request, status_code, content_type, content
+        )
+
+    def close(self):
+        if self.real_adapter:
+            self.real_adapter.close()
+
+    @contextmanager
+    def mounted(self, transport=None):
+        """
+        Mounts adapter on transport while in context, so all API
+        clients send requests to it.
+
+        :param transport: HTTP transport (defaults to shared transport)
+        :type transport: HttpTransport
+
+        """
+
+        transport = transport or http_transport
+        transport.mount(self)
+        try:
+            yield self
+        finally:
+            transport.mount(None)
+
+    @property
+    def stats(self):
+        """
+        Returns per-host request counts.
+
+        :return: counts by host
+        :rtype: dict
+
+        **-Return Format-**
+        ::
+            ret = {
+                <str>: {
+                    "requests": <int>,
+                    "rate_limited": <int>,
+                    "replayed": <int>,
+                    "recorded": <int>,
+                    "bytes": <int>
+                },
+                {...}
+            }
+
+        """
+
+        with self._lock:
+            return {
+                host: dict(values)
+                for host, values in self._metrics.items()
+            }
+
+    def reset_stats(self):
+        """
+        Resets per-host request counts, e.g. after seeding data that
+        should not count towards a benchmark.
+
+        """
+
+        with self._lock:
+            self._metrics.clear()
+
+
+class FakeApiServer(object):
+    """
+    This class defines a local `aiohttp` server that serves fake APIs
+    to asyncio clients through a fake API adapter, so they share its
+    fixtures, simulation options, and stats with `requests` clients.
+
+    While mounted, clients send requests for fake API hosts to the
+    server, with the host in their Host header. Adapter calls block (on
+    simulated latency), so they are run in a thread pool of their own,
+    large enough to keep many requests in flight.
+
+    """
+
+    def __init__(self, adapter, max_workers=64):
+        """
+        Initializes server with fake API adapter.
+
+        :param adapter: fake API adapter serving requests
+        :type adapter: FakeApiAdapter
+        :param max_workers: maximum number of requests served at once
+        :type max_workers: int
+
+        """
+
+        self.adapter = adapter
+        self.max_workers = max_workers
+
+    async def handle(self, request, executor):
+        """
+        Serves request through adapter.
+
+        :param request: server request
+        :type request: aiohttp.web.BaseRequest
+        :param executor: thread pool in which adapter is called
+        :type executor: concurrent.futures.ThreadPoolExecutor
+
+        :return: server response
+        :rtype: aiohttp.web.Response
+
+        """
+
+        prepared = requests.Request(
+            method=request.method,
+            url=f'https://{request.host}{request.path_qs}',
+            headers=dict(request.headers),
+            data=await request.read() or None
+        ).prepare()
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            executor,
+            self.adapter.send,
+            prepared
+        )
+        return web.Response(
+            status=response.status_code,
+            body=response.content,
+            headers={'Content-Type': response.headers.get('Content-Type', '')}
+        )
+
+    @asynccontextmanager
+    async def mounted(self, *clients):
+        """
+        Starts server, and redirects requests of asyncio clients to
+        fake API hosts to it, while in context.
+
+        :param clients: asyncio API clients
+        :type clients: AsyncBaseApiClient
+
+        """
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            server = RawTestServer(
+                lambda request: self.handle(request, executor)
+            )
+            await server.start_server()
+            base_url = str(server.make_url(''))
+            try:
+                for client in clients:
+                    client.redirects.update(
+                        dict.fromkeys(self.adapter.apis, base_url)
+                    )
+                yield self
+            finally:
+                for client in clients:
+                    for host in self.adapter.apis:
+                        client.redirects.pop(host, None)
+                await server.close()
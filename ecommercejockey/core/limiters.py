@@ -0,0 +1,257 @@
+"""
+This module defines rate limiters used by API clients.
+
+"""
+
+
+import fcntl
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from threading import Lock
+
+from django.conf import settings
+
+
+class TokenBucketRateLimiter(object):
+    """
+    This class defines an adaptive token bucket rate limiter. Requests
+    are paced before they are sent, and each endpoint has its own
+    bucket. The sustainable rate is learned AIMD-style: it grows
+    additively on success and is cut multiplicatively when the API
+    reports the rate was exceeded.
+
+    Bucket state is kept in lock-guarded files so all threads and
+    processes on the host share one budget.
+
+    """
+
+    def __init__(self, name, rate, min_rate, max_rate, burst=1,
+                 increase=0.1, decrease=0.5, root=None):
+        """
+        Initializes limiter with rate bounds and AIMD factors.
+
+        :param name: limiter name, used to namespace bucket files
+        :type name: str
+        :param rate: initial requests per second
+        :type rate: float
+        :param min_rate: lowest requests per second
+        :type min_rate: float
+        :param max_rate: highest requests per second
+        :type max_rate: float
+        :param burst: maximum number of requests sent without pacing
+        :type burst: float
+        :param increase: requests per second added per second's worth
+            of successful requests
+        :type increase: float
+        :param decrease: factor applied to rate when rate exceeded
+        :type decrease: float
+        :param root: directory in which to store bucket state
+        :type root: str
+
+        """
+
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.root = os.path.join(
+            root or settings.API_RATE_LIMIT_ROOT,
+            name
+        )
+        self._lock = Lock()
+        self._metrics = defaultdict(
+            lambda: {
+                'requests': 0,
+                'rate_limited': 0,
+                'wait_time': 0.0
+            }
+        )
+
+    def get_path(self, endpoint):
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', endpoint).strip('_')
+        return os.path.join(self.root, f'{slug or "default"}.json')
+
+    def update_state(self, endpoint, update):
+        """
+        Reads, updates, and writes endpoint bucket state while holding
+        exclusive lock on it.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+        :param update: callable that receives and modifies state
+            dictionary and returns a value
+        :type update: callable
+
+        :return: value returned by update
+        :rtype: object
+
+        """
+
+        os.makedirs(self.root, exist_ok=True)
+        path = self.get_path(endpoint)
+        with open(path, 'a+') as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state_file.seek(0)
+                try:
+                    state = json.loads(state_file.read())
+                except ValueError:
+                    state = {}
+                state.setdefault('rate', self.rate)
+                state.setdefault('tokens', self.burst)
+                state.setdefault('updated', time.time())
+                state.setdefault('decreased', 0)
+                value = update(state)
+                state_file.seek(0)
+                state_file.truncate()
+                state_file.write(json.dumps(state))
+                state_file.flush()
+                return value
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+    def reserve(self, endpoint):
+        """
+        Reserves a request slot for endpoint without waiting.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+
+        :return: seconds to wait before sending request
+        :rtype: float
+
+        """
+
+        def _reserve(state):
+            now = time.time()
+            elapsed = max(now - state['updated'], 0)
+            tokens = min(
+                self.burst,
+                state['tokens'] + elapsed * state['rate']
+            )
+            tokens -= 1
+            state['tokens'] = tokens
+            state['updated'] = now
+            if tokens >= 0:
+                return 0.0
+            return -tokens / state['rate']
+
+        wait = self.update_state(endpoint, _reserve)
+        with self._lock:
+            metrics = self._metrics[endpoint]
+            metrics['requests'] += 1
+            metrics['wait_time'] += wait
+        return wait
+
+    def acquire(self, endpoint):
+        """
+        Waits until a request may be sent to endpoint.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+
+        :return: seconds waited
+        :rtype: float
+
+        """
+
+        wait = self.reserve(endpoint)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_success(self, endpoint):
+        """
+        Additively increases endpoint rate.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+
+        """
+
+        def _increase(state):
+            state['rate'] = min(
+                self.max_rate,
+                state['rate'] + self.increase / max(state['rate'], 1)
+            )
+
+        self.update_state(endpoint, _increase)
+
+    def record_rate_limited(self, endpoint):
+        """
+        Multiplicatively decreases endpoint rate and drains bucket.
+        Rate is decreased at most once per paced interval, so a burst
+        of rejections counts as one congestion event.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+
+        """
+
+        def _decrease(state):
+            now = time.time()
+            if now - state['decreased'] >= 1 / state['rate']:
+                state['rate'] = max(
+                    self.min_rate,
+                    state['rate'] * self.decrease
+                )
+                state['decreased'] = now
+            state['tokens'] = min(state['tokens'], 0)
+
+        self.update_state(endpoint, _decrease)
+        with self._lock:
+            self._metrics[endpoint]['rate_limited'] += 1
+
+    def get_rate(self, endpoint):
+        """
+        Returns current requests per second of endpoint.
+
+        :param endpoint: endpoint name
+        :type endpoint: str
+
+        :return: requests per second
+        :rtype: float
+
+        """
+
+        return self.update_state(endpoint, lambda state: state['rate'])
+
+    @property
+    def stats(self):
+        """
+        Returns per-endpoint metrics. Rate is shared by all processes;
+        counts and wait time are for this process.
+
+        :return: metrics by endpoint
+        :rtype: dict
+
+        **-Return Format-**
+        ::
+            ret = {
+                <str>: {
+                    "rate": <float>,
+                    "requests": <int>,
+                    "rate_limited": <int>,
+                    "wait_time": <float>
+                },
+                {...}
+            }
+
+        """
+
+        with self._lock:
+            metrics = {
+                endpoint: dict(values)
+                for endpoint, values in self._metrics.items()
+            }
+
+        for endpoint, values in metrics.items():
+            values['rate'] = round(self.get_rate(endpoint), 3)
+            values['wait_time'] = round(values['wait_time'], 3)
+        return metrics
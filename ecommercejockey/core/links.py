@@ -0,0 +1,237 @@
+"""
+This module defines the checker of link reachability.
+
+"""
+
+
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from threading import BoundedSemaphore, Lock
+
+import requests
+
+from django.conf import settings
+from django.utils import timezone
+
+from .clients import http_transport
+from .models import LinkStatus
+from .utils import chunkify_list, map_concurrently
+
+
+class LinkChecker(object):
+    """
+    This class checks whether or not links are broken, with concurrent
+    HEAD requests (falling back to a one byte ranged GET for servers
+    that do not answer HEAD), so bodies are never downloaded.
+
+    Requests are bounded overall and per host, and are sent through a
+    session of their own, closed when a check finishes (links have too
+    many hosts to keep a pooled session per host). Results are stored
+    as link statuses, and are reused until they are older than the
+    TTL, so only new and stale links are requested again.
+
+    Only links answering with a status that they are gone (e.g. 404)
+    are broken. Links that cannot be requested, or answer with another
+    error status (e.g. 503), are unknown: their results are not
+    stored, so they are requested again by the next check.
+
+    """
+
+    FALLBACK_STATUS_CODES = (403, 405, 501)
+    BROKEN_STATUS_CODES = (404, 410)
+
+    def __init__(self, ttl, max_workers, max_per_host, timeout):
+        """
+        Initializes checker with TTL, concurrency limits, and timeout.
+
+        :param ttl: seconds link statuses are fresh
+        :type ttl: int
+        :param max_workers: maximum number of requests in flight
+        :type max_workers: int
+        :param max_per_host: maximum number of requests in flight per
+            host
+        :type max_per_host: int
+        :param timeout: (connect, read) timeout in seconds
+        :type timeout: tuple
+
+        """
+
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._host_semaphores = defaultdict(
+            lambda: BoundedSemaphore(self.max_per_host)
+        )
+        self._lock = Lock()
+
+    def get_host_semaphore(self, url):
+        """
+        Returns semaphore bounding requests to URL host.
+
+        :param url: link URL
+        :type url: str
+
+        :return: host semaphore
+        :rtype: threading.BoundedSemaphore
+
+        """
+
+        with self._lock:
+            return self._host_semaphores[http_transport.get_host(url)]
+
+    def request_status_code(self, session, url):
+        """
+        Returns status code of link, from a HEAD request, or a one byte
+        ranged GET request if HEAD is not allowed.
+
+        :param session: session through which to send requests
+        :type session: requests.Session
+        :param url: link URL
+        :type url: str
+
+        :return: status code
+        :rtype: int
+
+        :raises Exception: on request exception
+
+        """
+
+        try:
+            with self.get_host_semaphore(url):
+                response = session.request(
+                    'HEAD',
+                    url,
+                    allow_redirects=True,
+                    timeout=self.timeout
+                )
+                response.close()
+                if response.status_code not in self.FALLBACK_STATUS_CODES:
+                    return response.status_code
+
+                response = session.request(
+                    'GET',
+                    url,
+                    headers={'Range': 'bytes=0-0'},
+                    allow_redirects=True,
+                    stream=True,
+                    timeout=self.timeout
+                )
+                response.close()
+                return response.status_code
+        except Exception:
+            raise
+
+    def check_url(self, session, url):
+        """
+        Returns status code, whether or not link is broken (None if
+        unknown), and error of link.
+
+        :param session: session through which to send requests
+        :type session: requests.Session
+        :param url: link URL
+        :type url: str
+
+        :return: status code, broken, and error
+        :rtype: tuple
+
+        """
+
+        try:
+            status_code = self.request_status_code(session, url)
+        except requests.RequestException as err:
+            return None, None, str(err)[:255]
+        if status_code in self.BROKEN_STATUS_CODES:
+            return status_code, True, ''
+        if status_code >= 400:
+            return status_code, None, f'HTTP {status_code}'
+        return status_code, False, ''
+
+    def check(self, urls, refresh=False):
+        """
+        Returns link statuses of URLs, requesting only links without
+        a fresh status (or all links if refreshing), and storing their
+        statuses. Links whose status is unknown keep their last stored
+        status, and are left out if they have none.
+
+        :param urls: link URLs
+        :type urls: iterable
+        :param refresh: whether or not to request links with a fresh
+            status
+        :type refresh: bool
+
+        :return: link statuses by URL
+        :rtype: dict
+
+        :raises Exception: on general exception
+
+        """
+
+        urls = list(dict.fromkeys(url for url in urls if url))
+        session = http_transport.create_session()
+        try:
+            statuses = {}
+            for chunk in chunkify_list(urls, settings.LINK_CHECK_BATCH_SIZE):
+                statuses.update(
+                    (status.url, status)
+                    for status in LinkStatus.objects.filter(url__in=chunk)
+                )
+
+            fresh = timezone.now() - timedelta(seconds=self.ttl)
+            stale_urls = [
+                url for url in urls
+                if refresh
+                or url not in statuses
+                or statuses[url].checked < fresh
+            ]
+            for chunk in chunkify_list(
+                    stale_urls, settings.LINK_CHECK_BATCH_SIZE):
+                results = map_concurrently(
+                    partial(self.check_url, session),
+                    chunk,
+                    max_workers=self.max_workers
+                )
+
+                checked = timezone.now()
+                new_statuses = []
+                updated_statuses = []
+                for url, result, err in results:
+                    status_code, is_broken, error = result or (
+                        None, None, str(err)[:255]
+                    )
+                    if is_broken is None:
+                        continue
+                    if url in statuses:
+                        status = statuses[url]
+                        updated_statuses.append(status)
+                    else:
+                        status = LinkStatus(url=url)
+                        new_statuses.append(status)
+                    status.status_code = status_code
+                    status.is_broken = is_broken
+                    status.error = error
+                    status.checked = checked
+                    statuses[url] = status
+
+                LinkStatus.objects.bulk_create(
+                    new_statuses,
+                    ignore_conflicts=True
+                )
+                LinkStatus.objects.bulk_update(
+                    updated_statuses,
+                    fields=['status_code', 'is_broken', 'error', 'checked']
+                )
+            return statuses
+        except Exception:
+            raise
+        finally:
+            session.close()
+
+
+link_checker = LinkChecker(
+    ttl=settings.LINK_CHECK_TTL,
+    max_workers=settings.LINK_CHECK_MAX_WORKERS,
+    max_per_host=settings.LINK_CHECK_MAX_PER_HOST,
+    timeout=(settings.API_CONNECT_TIMEOUT, settings.LINK_CHECK_TIMEOUT)
+)
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.5 on 2026-10-16 20:27
+
+import core.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkStatus',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True, verbose_name='URL')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('is_broken', models.BooleanField(default=False)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('checked', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'link status',
+                'verbose_name_plural': 'link statuses',
+            },
+            bases=(models.Model, core.mixins.MessagesMixin),
+        ),
+    ]
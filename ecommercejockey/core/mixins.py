@@ -20,6 +20,10 @@ class MessagesMixin(object):
             "nothing new"
         )
 
+    @classmethod
+    def get_class_success_msg(cls, message):
+        return f"Success: {cls._meta.verbose_name.title()}, {message}"
+
     @classmethod
     def get_class_error_msg(cls, error):
         return f"Error: {cls._meta.verbose_name.title()}, {error}"
@@ -2,7 +2,10 @@ from django.db.models import (
     Model,
     BooleanField,
     CharField,
-    TextField
+    DateTimeField,
+    PositiveSmallIntegerField,
+    TextField,
+    URLField
 )
 
 from .mixins import MessagesMixin
@@ -43,3 +46,32 @@ class NotesBaseModel(Model, MessagesMixin):
 
     class Meta:
         abstract = True
+
+
+class LinkStatus(Model, MessagesMixin):
+    url = URLField(
+        max_length=500,
+        unique=True,
+        verbose_name='URL'
+    )
+    status_code = PositiveSmallIntegerField(
+        blank=True,
+        null=True
+    )
+    is_broken = BooleanField(
+        default=False
+    )
+    error = CharField(
+        blank=True,
+        max_length=255
+    )
+    checked = DateTimeField(
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'link status'
+        verbose_name_plural = 'link statuses'
+
+    def __str__(self):
+        return self.url
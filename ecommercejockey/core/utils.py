@@ -1,9 +1,14 @@
 import base64
+import contextvars
 import hmac
 import hashlib
-from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import reduce, wraps
 from math import floor
 
+from django.db import connection, transaction
+
 
 def chunkify_list(lst, chunk_size=100):
     chunk_count = floor(len(lst) / chunk_size)
@@ -17,6 +22,198 @@ def chunkify_list(lst, chunk_size=100):
     return chunkified
 
 
+def map_concurrently(func, items, max_workers=8):
+    """
+    Calls function for each item in a bounded thread pool. Each call
+    runs in a copy of the caller's context, so context variables (such
+    as response cache refreshing) apply to it.
+
+    :param func: function to call with each item
+    :type func: callable
+    :param items: items on which to call function
+    :type items: iterable
+    :param max_workers: maximum number of calls in flight
+    :type max_workers: int
+
+    :return: (item, result, error) tuples in item order
+    :rtype: list
+
+    """
+
+    def call(item):
+        try:
+            return item, func(item), None
+        except Exception as err:
+            return item, None, err
+        finally:
+            if not is_inline:
+                connection.close()
+
+    items = list(items)
+    is_inline = len(items) <= 1 or max_workers <= 1
+    if is_inline:
+        return [call(item) for item in items]
+
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(
+            lambda item: context.copy().run(call, item),
+            items
+        ))
+
+
+@contextmanager
+def staged_values(values, db_type, name='staged_values', batch_size=500):
+    """
+    Stages values in a temporary table with a single `value` column,
+    so that they can be joined against in one statement, instead of
+    being sent as a long `IN` list. Table is dropped on exit. Must be
+    used in a transaction.
+
+    :param values: values to stage (duplicates and None are skipped)
+    :type values: iterable
+    :param db_type: database column type of values
+    :type db_type: str
+    :param name: temporary table name
+    :type name: str
+    :param batch_size: number of values per insert statement
+    :type batch_size: int
+
+    :return: quoted temporary table name
+    :rtype: str
+
+    """
+
+    table = connection.ops.quote_name(name)
+    values = list({value for value in values if value is not None})
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {table} (value {db_type} PRIMARY KEY)'
+        )
+        for batch in chunkify_list(values, chunk_size=batch_size):
+            placeholders = ', '.join(['(%s)'] * len(batch))
+            cursor.execute(
+                f'INSERT INTO {table} (value) VALUES {placeholders}',
+                batch
+            )
+        try:
+            yield table
+        finally:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def reconcile_m2m(obj, attr, pks, remove=False, batch_size=1000):
+    """
+    Reconciles many-to-many relation of object with desired related
+    PKs. Current PKs are read from the through table in one query, adds
+    (and removes, if full sync) are computed in memory, and applied with
+    one bulk create and one delete. PKs of related objects that do not
+    exist are not added.
+
+    :param obj: object of which to reconcile relation
+    :type obj: django.db.models.Model
+    :param attr: many-to-many field (or reverse relation) name
+    :type attr: str
+    :param pks: desired related PKs
+    :type pks: iterable
+    :param remove: whether or not to remove related PKs not desired
+        (full sync), or only add (add only)
+    :type remove: bool
+    :param batch_size: number of rows per insert statement
+    :type batch_size: int
+
+    :return: added, already related, removed, and missing PKs
+    :rtype: tuple
+
+    :raises Exception: on general exception
+
+    **-Return Format-**
+    ::
+        ret = (
+            {<added PK>, ...},
+            {<already related PK>, ...},
+            {<removed PK>, ...},
+            {<missing PK>, ...}
+        )
+
+    """
+
+    field = obj._meta.get_field(attr)
+    if field.concrete:
+        source = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+    else:
+        source = f'{field.field.m2m_reverse_field_name()}_id'
+        target = f'{field.field.m2m_field_name()}_id'
+        field = field.field
+    through = field.remote_field.through
+    related_model = obj._meta.get_field(attr).related_model
+
+    try:
+        pks = set(pks)
+        with transaction.atomic():
+            current = set(
+                through.objects.filter(
+                    **{source: obj.pk}
+                ).values_list(target, flat=True)
+            )
+            new = pks - current
+            existing = set()
+            for chunk in chunkify_list(list(new), chunk_size=batch_size):
+                existing.update(
+                    related_model._default_manager.filter(
+                        pk__in=chunk
+                    ).values_list('pk', flat=True)
+                )
+            missing = new - existing
+            added = new - missing
+            through.objects.bulk_create(
+                [through(**{source: obj.pk, target: pk}) for pk in added],
+                batch_size=batch_size,
+                ignore_conflicts=True
+            )
+
+            removed = current - pks if remove else set()
+            if removed:
+                through.objects.filter(
+                    **{source: obj.pk, f'{target}__in': removed}
+                ).delete()
+        return added, pks & current, removed, missing
+    except Exception:
+        raise
+
+
+def async_retry(exceptions=Exception, tries=-1):
+    """
+    Returns decorator that retries coroutine function on exceptions,
+    like `retry.retry` does for regular functions.
+
+    :param exceptions: exception or tuple of exceptions to catch
+    :type exceptions: Exception
+    :param tries: maximum number of attempts (-1 is infinite)
+    :type tries: int
+
+    :return: decorator
+    :rtype: callable
+
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            remaining = tries
+            while True:
+                try:
+                    return await func(*args, **kwargs)
+                except exceptions:
+                    remaining -= 1
+                    if not remaining:
+                        raise
+        return wrapper
+    return decorator
+
+
 def rgetattr(obj, attr, *args):
     # noinspection PyShadowingNames
     def _getattr(obj, attr):
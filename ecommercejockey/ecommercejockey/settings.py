@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 COMPANY_NAME = os.environ['COMPANY_NAME']
@@ -10,10 +11,69 @@ GOOGLE_DRIVE_API_KEY = os.environ['GOOGLE_DRIVE_API_KEY']
 
 PREMIER_BASE_URL = 'https://api.premierwd.com/api/v5'
 PREMIER_API_KEY = os.environ['PREMIER_API_KEY']
+PREMIER_TOKEN_TIMEOUT = int(os.environ.get('PREMIER_TOKEN_TIMEOUT', 3600))
+PREMIER_CHUNK_SIZE = int(os.environ.get('PREMIER_CHUNK_SIZE', 50))
+PREMIER_MAX_WORKERS = int(os.environ.get('PREMIER_MAX_WORKERS', 4))
+PREMIER_MAX_TRIES = int(os.environ.get('PREMIER_MAX_TRIES', 5))
+PREMIER_BACKOFF = float(os.environ.get('PREMIER_BACKOFF', 1))
+PREMIER_MAX_BACKOFF = float(os.environ.get('PREMIER_MAX_BACKOFF', 60))
+PREMIER_INVENTORY_HISTORY_RETENTION_DAYS = int(
+    os.environ.get('PREMIER_INVENTORY_HISTORY_RETENTION_DAYS', 365)
+)
+PREMIER_IMPORT_BATCH_SIZE = int(
+    os.environ.get('PREMIER_IMPORT_BATCH_SIZE', 1000)
+)
+PREMIER_IMPORT_ROOT = os.environ.get(
+    'PREMIER_IMPORT_ROOT',
+    os.path.join(tempfile.gettempdir(), 'ecommercejockey', 'premier_imports')
+)
 
 SEMA_BASE_URL = 'https://sdc.semadatacoop.org/sdcapi'
 SEMA_USERNAME = os.environ['SEMA_USERNAME']
 SEMA_PASSWORD = os.environ['SEMA_PASSWORD']
+SEMA_TOKEN_TIMEOUT = int(os.environ.get('SEMA_TOKEN_TIMEOUT', 3600))
+SEMA_RATE_LIMIT = float(os.environ.get('SEMA_RATE_LIMIT', 5))
+SEMA_RATE_LIMIT_MIN = float(os.environ.get('SEMA_RATE_LIMIT_MIN', 0.2))
+SEMA_RATE_LIMIT_MAX = float(os.environ.get('SEMA_RATE_LIMIT_MAX', 20))
+SEMA_MAX_WORKERS = int(os.environ.get('SEMA_MAX_WORKERS', 8))
+SEMA_BULK_IMPORT = (
+    os.environ.get('SEMA_BULK_IMPORT', 'true').lower() == 'true'
+)
+SEMA_IMPORT_CHUNK_SIZE = int(os.environ.get('SEMA_IMPORT_CHUNK_SIZE', 1000))
+SEMA_VEHICLE_RESOLVER_TTL = int(
+    os.environ.get('SEMA_VEHICLE_RESOLVER_TTL', 60 * 60)
+)
+SEMA_LOCAL_ID_BLOCK_SIZE = int(
+    os.environ.get('SEMA_LOCAL_ID_BLOCK_SIZE', 1000)
+)
+SEMA_HTML_SYNC_BATCH_SIZE = int(
+    os.environ.get('SEMA_HTML_SYNC_BATCH_SIZE', 200)
+)
+SEMA_CRAWL_STATE_PATH = os.environ.get(
+    'SEMA_CRAWL_STATE_PATH',
+    os.path.join(tempfile.gettempdir(), 'ecommercejockey', 'sema_crawl.json')
+)
+SEMA_CRAWL_BATCH_SIZE = int(os.environ.get('SEMA_CRAWL_BATCH_SIZE', 500))
+SEMA_CACHE_ROOT = os.environ.get(
+    'SEMA_CACHE_ROOT',
+    os.path.join(tempfile.gettempdir(), 'ecommercejockey', 'sema_cache')
+)
+SEMA_CACHE_MAX_SIZE = int(
+    os.environ.get('SEMA_CACHE_MAX_SIZE', 256 * 1024 * 1024)
+)
+SEMA_CACHE_TTLS = {
+    endpoint: int(
+        os.environ.get(f'SEMA_CACHE_TTL_{endpoint.upper()}', default)
+    )
+    for endpoint, default in (
+        ('years', 7 * 24 * 60 * 60),
+        ('makes', 7 * 24 * 60 * 60),
+        ('models', 7 * 24 * 60 * 60),
+        ('submodels', 7 * 24 * 60 * 60),
+        ('engines', 7 * 24 * 60 * 60),
+        ('categories', 24 * 60 * 60)
+    )
+}
 
 SHOPIFY_VERSION = '2019-10'
 SHOPIFY_SHOP_NAME = os.environ['SHOPIFY_SHOP_NAME']
@@ -27,6 +87,29 @@ SHOPIFY_BASE_URL = (
 )
 
 
+API_POOL_CONNECTIONS = int(os.environ.get('API_POOL_CONNECTIONS', 10))
+API_POOL_MAXSIZE = int(os.environ.get('API_POOL_MAXSIZE', 20))
+API_ASYNC_MAX_CONNECTIONS = int(
+    os.environ.get('API_ASYNC_MAX_CONNECTIONS', 100)
+)
+API_CONNECT_TIMEOUT = float(os.environ.get('API_CONNECT_TIMEOUT', 10))
+API_READ_TIMEOUT = float(os.environ.get('API_READ_TIMEOUT', 300))
+API_STREAM_CHUNK_SIZE = int(os.environ.get('API_STREAM_CHUNK_SIZE', 65536))
+API_TOKEN_ROOT = os.environ.get(
+    'API_TOKEN_ROOT',
+    os.path.join(tempfile.gettempdir(), 'ecommercejockey', 'tokens')
+)
+API_RATE_LIMIT_ROOT = os.environ.get(
+    'API_RATE_LIMIT_ROOT',
+    os.path.join(tempfile.gettempdir(), 'ecommercejockey', 'rate_limits')
+)
+LINK_CHECK_TTL = int(os.environ.get('LINK_CHECK_TTL', 7 * 24 * 60 * 60))
+LINK_CHECK_MAX_WORKERS = int(os.environ.get('LINK_CHECK_MAX_WORKERS', 32))
+LINK_CHECK_MAX_PER_HOST = int(os.environ.get('LINK_CHECK_MAX_PER_HOST', 4))
+LINK_CHECK_TIMEOUT = float(os.environ.get('LINK_CHECK_TIMEOUT', 30))
+LINK_CHECK_BATCH_SIZE = int(os.environ.get('LINK_CHECK_BATCH_SIZE', 1000))
+
+
 SUPERUSER_EMAIL_ADDRESS = os.environ['SUPERUSER_EMAIL_ADDRESS']
 SUPERUSER_PASSWORD = os.environ['SUPERUSER_PASSWORD']
 
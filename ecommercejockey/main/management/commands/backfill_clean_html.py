@@ -0,0 +1,91 @@
+"""
+This module contains a class that backfills the clean HTML of SEMA
+products, cleaning their HTML in a process pool, and sets their HTML
+hashes with it (so saves and HTML syncs skip unchanged HTML). By
+default, only products with HTML but no clean HTML are processed; with
+`--all`, the clean HTML of every product is rebuilt (after sanitizer
+changes). Run it once after migrating to 0059.
+------------------------------------------------------------------------
+"""
+
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from sema.models import SemaProduct
+from sema.sanitizers import SemaHtmlSanitizer, html_sanitizer
+
+
+class Command(BaseCommand):
+    help = 'Backfills clean HTML of SEMA products.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='rebuild clean HTML of all products'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='products per query and bulk update'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='processes cleaning HTML'
+        )
+
+    def handle(self, *args, **options):
+        products = SemaProduct.objects.order_by('pk')
+        if not options['all']:
+            products = products.exclude(html='').filter(
+                clean_html=SemaHtmlSanitizer.EMPTY_HTML
+            )
+        batch_size = options['batch_size']
+
+        count = 0
+        last_pk = None
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            # Workers are forked on first submit, and must not share the
+            # database connection, so they are started before any query
+            # reopens it.
+            connection.close()
+            pool.submit(os.getpid).result()
+
+            while True:
+                batch = products
+                if last_pk is not None:
+                    batch = batch.filter(pk__gt=last_pk)
+                batch = list(batch.only('pk', 'html')[:batch_size])
+                if not batch:
+                    break
+
+                clean_htmls = pool.map(
+                    html_sanitizer.clean,
+                    [product.html for product in batch],
+                    chunksize=max(1, len(batch) // (options['workers'] * 4))
+                )
+                for product, clean_html in zip(batch, clean_htmls):
+                    product.clean_html = clean_html
+                    product.html_hash = SemaProduct.get_html_hash(
+                        product.html
+                    )
+                SemaProduct.objects.bulk_update(
+                    batch,
+                    fields=['clean_html', 'html_hash']
+                )
+
+                count += len(batch)
+                last_pk = batch[-1].pk
+                print(f'{count} products cleaned...')
+
+        elapsed = time.perf_counter() - start
+        print(f'Clean HTML of {count} products backfilled in {elapsed:.2f}s.')
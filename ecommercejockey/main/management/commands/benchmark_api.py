@@ -0,0 +1,353 @@
+"""
+This module contains a class that benchmarks API pipelines against
+fake SEMA, Premier, and Shopify APIs, so their performance can be
+measured offline and repeatably. Pipelines run in a throwaway test
+database, created (and migrated) before and destroyed after them, so
+the configured database is never written to; with `--keepdb`, the test
+database is kept and reused by later runs.
+
+Before pipelines run, and untimed, the test database is seeded from the
+fake catalogues (so sized by `--scale`): SEMA brands, datasets,
+categories, and products are imported and marked relevant, and each
+SEMA brand gets a relevant Premier manufacturer, vendor, and Shopify
+vendor, and each SEMA product a relevant Premier product, item, and
+unsynced Shopify product. Seeding is skipped for what a kept database
+already holds, so `sema_import` measures a re-import of seeded data.
+
+Responses are synthetic (sized by `--scale`) unless `--fixtures` is
+given, in which case recorded responses are replayed where they exist.
+With `--record`, pipelines run against the real APIs and their
+responses are recorded to `--fixtures`. Pipelines that write to an
+API cannot be recorded.
+
+The `sema_async_retrieve` pipeline retrieves SEMA products and their
+HTML with the asyncio SEMA client, served the same fake APIs by a
+local server in front of the adapter.
+
+Pipelines are configured by the usual settings, e.g. run
+`premier_update` with different `PREMIER_MAX_WORKERS` and
+`PREMIER_CHUNK_SIZE` environment variables to compare concurrency.
+Seeding creates 80 * scale ** 2 Premier products, so the default chunk
+size dispatches 2 chunks at `--scale 1` and 15 at `--scale 3`; the
+number dispatched is printed before `premier_update` runs.
+------------------------------------------------------------------------
+"""
+
+
+import asyncio
+import math
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from core.fakes import FakeApiAdapter, FakeApiServer
+from main.models import Item, Vendor
+from main.tasks import (
+    perform_premier_api_update,
+    perform_sema_api_import_and_unauthorize,
+    perform_sema_api_update
+)
+from premier.fakes import FakePremierApi
+from premier.models import PremierManufacturer, PremierProduct
+from sema.clients import AsyncSemaApiClient, sema_client
+from sema.fakes import FakeSemaApi
+from sema.models import SemaBrand, SemaCategory, SemaDataset, SemaProduct
+from shopify.fakes import FakeShopifyApi
+from shopify.models import ShopifyProduct
+
+
+def seed_database():
+    """
+    Seeds database from fake catalogues with relevant SEMA products,
+    each linked through an item to a relevant Premier product and an
+    unsynced Shopify product. Existing data is kept.
+
+    """
+
+    if not SemaProduct.objects.exists():
+        perform_sema_api_import_and_unauthorize(
+            models=[SemaBrand, SemaDataset, SemaCategory, SemaProduct]
+        )
+    SemaBrand.objects.update(is_relevant=True)
+    SemaDataset.objects.update(is_relevant=True)
+    SemaProduct.objects.update(is_relevant=True)
+
+    for brand in SemaBrand.objects.filter(vendor__isnull=True):
+        manufacturer, _ = PremierManufacturer.objects.get_or_create(
+            name=brand.name,
+            defaults={'slug': f'fake-{brand.pk}'[:20], 'is_relevant': True}
+        )
+        Vendor.objects.create(
+            premier_manufacturer=manufacturer,
+            sema_brand=brand
+        )
+    Vendor.objects.filter(shopify_vendor__isnull=True).create_shopify_vendors()
+
+    sema_products = SemaProduct.objects.filter(
+        item__isnull=True
+    ).select_related('dataset__brand__vendor__premier_manufacturer')
+    PremierProduct.objects.bulk_create(
+        [
+            PremierProduct(
+                premier_part_number=f'FAKE-{sema_product.part_number}'[:30],
+                vendor_part_number=sema_product.part_number,
+                description=f'Fake {sema_product.part_number}',
+                manufacturer=(
+                    sema_product.dataset.brand.vendor.premier_manufacturer
+                ),
+                cost=0,
+                jobber=0,
+                msrp=0,
+                map=0,
+                part_status='Active',
+                is_relevant=True
+            )
+            for sema_product in sema_products
+        ],
+        ignore_conflicts=True
+    )
+    Item.objects.create_and_link()
+    Item.objects.filter(
+        premier_product__isnull=False,
+        sema_product__isnull=False,
+        shopify_product__isnull=True
+    ).create_shopify_products()
+
+
+def perform_premier_update():
+    count = PremierProduct.objects.filter(
+        manufacturer__is_relevant=True
+    ).count()
+    print(
+        f'{count} Premier products in '
+        f'{math.ceil(count / settings.PREMIER_CHUNK_SIZE)} chunks '
+        f'of {settings.PREMIER_CHUNK_SIZE}, '
+        f'{settings.PREMIER_MAX_WORKERS} workers'
+    )
+    return perform_premier_api_update(
+        tasks=['product_inventory', 'product_pricing']
+    )
+
+
+def perform_shopify_product_create():
+    products = ShopifyProduct.objects.filter(product_id__isnull=True)
+    msgs = products.perform_create_to_api()
+    error = [
+        msg for msg in msgs
+        if not msg[:4] == 'Info'
+        and not msg[:7] == 'Success'
+    ]
+    return msgs, [], [], error
+
+
+async def retrieve_sema_api_data_async(adapter):
+    msgs = []
+    async with AsyncSemaApiClient(token_client=sema_client) as client:
+        async with FakeApiServer(adapter).mounted(client):
+            datasets = await client.retrieve_brand_datasets()
+            results = await asyncio.gather(
+                *[
+                    client.retrieve_products_by_brand(
+                        dataset_ids=[dataset['DatasetId']]
+                    )
+                    for dataset in datasets
+                ],
+                return_exceptions=True
+            )
+
+            product_ids = []
+            for dataset, result in zip(datasets, results):
+                if isinstance(result, Exception):
+                    msgs.append(
+                        SemaDataset.get_class_error_msg(
+                            f"{dataset['DatasetId']}: {result}"
+                        )
+                    )
+                    continue
+                product_ids += [product['ProductId'] for product in result]
+
+            results = await asyncio.gather(
+                *[
+                    client.retrieve_product_html(product_id)
+                    for product_id in product_ids
+                ],
+                return_exceptions=True
+            )
+            for product_id, result in zip(product_ids, results):
+                if isinstance(result, Exception):
+                    msgs.append(
+                        SemaProduct.get_class_error_msg(
+                            f'{product_id}: {result}'
+                        )
+                    )
+                else:
+                    msgs.append(
+                        SemaProduct.get_class_success_msg(
+                            f'{product_id} HTML retrieved'
+                        )
+                    )
+    return msgs
+
+
+def perform_sema_async_retrieve(adapter):
+    msgs = asyncio.run(retrieve_sema_api_data_async(adapter))
+    error = [msg for msg in msgs if not msg[:7] == 'Success']
+    return msgs, [], [], error
+
+
+PIPELINES = {
+    'sema_import': lambda adapter: perform_sema_api_import_and_unauthorize(),
+    'sema_update': lambda adapter: perform_sema_api_update(),
+    'sema_async_retrieve': perform_sema_async_retrieve,
+    'premier_update': lambda adapter: perform_premier_update(),
+    'shopify_create': lambda adapter: perform_shopify_product_create()
+}
+API_WRITING_PIPELINES = {'shopify_create'}
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks API pipelines against fake APIs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'pipelines',
+            nargs='+',
+            choices=list(PIPELINES.keys()),
+            help='pipelines to run, in order'
+        )
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1,
+            help='factor applied to fake catalogue sizes'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='seed of fake data, latency jitter, and rejections'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.05,
+            help='seconds added to each response'
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.0,
+            help='maximum random seconds added to latency'
+        )
+        parser.add_argument(
+            '--rate-limit-ratio',
+            type=float,
+            default=0.0,
+            help='ratio of requests rejected as rate limited (0 to 1)'
+        )
+        parser.add_argument(
+            '--max-rate',
+            type=float,
+            default=None,
+            help='requests per second per host above which requests '
+                 'are rejected as rate limited'
+        )
+        parser.add_argument(
+            '--fixtures',
+            default=None,
+            help='directory of recorded responses'
+        )
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help='record real API responses to fixtures directory'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='keep test database between runs'
+        )
+
+    def handle(self, *args, **options):
+        if options['record'] and not options['fixtures']:
+            raise CommandError('Recording requires a fixtures directory')
+        if options['record']:
+            writing = API_WRITING_PIPELINES & set(options['pipelines'])
+            if writing:
+                raise CommandError(
+                    f"Recording would write to real APIs: "
+                    f"{', '.join(sorted(writing))}"
+                )
+
+        # Tokens, rate limits, and cached responses of the fake APIs
+        # must not leak into (or be read from) the real ones.
+        with tempfile.TemporaryDirectory(
+                prefix='benchmark_api_') as state_root:
+            sema_client.token_store.root = os.path.join(state_root, 'tokens')
+            sema_client.rate_limiter.root = os.path.join(
+                state_root, 'rate_limits', sema_client.rate_limiter.name
+            )
+            sema_client.response_cache.root = os.path.join(state_root, 'cache')
+            sema_client.response_cache.clear()
+
+            apis = [
+                FakeSemaApi(scale=options['scale'], seed=options['seed']),
+                FakePremierApi(scale=options['scale'], seed=options['seed']),
+                FakeShopifyApi(scale=options['scale'], seed=options['seed'])
+            ]
+            adapter = FakeApiAdapter(
+                apis=apis,
+                latency=options['latency'],
+                jitter=options['jitter'],
+                rate_limit_ratio=options['rate_limit_ratio'],
+                max_rate=options['max_rate'],
+                seed=options['seed'],
+                fixtures_root=options['fixtures'],
+                mode='record' if options['record'] else 'replay'
+            )
+
+            results = []
+            old_config = setup_databases(
+                verbosity=options['verbosity'],
+                interactive=False,
+                keepdb=options['keepdb']
+            )
+            try:
+                with adapter.mounted():
+                    print('Seeding...')
+                    seed_database()
+                    adapter.reset_stats()
+                    for name in options['pipelines']:
+                        print(f'Running {name}...')
+                        start = time.perf_counter()
+                        msgs, _, _, error = PIPELINES[name](adapter)
+                        elapsed = time.perf_counter() - start
+                        results.append(
+                            (name, elapsed, len(msgs), len(error))
+                        )
+            finally:
+                teardown_databases(
+                    old_config,
+                    verbosity=options['verbosity'],
+                    keepdb=options['keepdb']
+                )
+
+        print('Requests:')
+        for host, stats in adapter.stats.items():
+            print(
+                f"{host}: {stats['requests']} requests, "
+                f"{stats['rate_limited']} rate limited, "
+                f"{stats['replayed']} replayed, "
+                f"{stats['recorded']} recorded, "
+                f"{stats['bytes']} bytes"
+            )
+        print('Results:')
+        for name, elapsed, msg_count, error_count in results:
+            print(
+                f'{name}: {elapsed:.2f}s, '
+                f'{msg_count} messages, {error_count} errors'
+            )
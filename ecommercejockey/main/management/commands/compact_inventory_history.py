@@ -0,0 +1,39 @@
+"""
+This module contains a class that compacts the inventory history of
+Premier products: history older than the retention period is rolled up
+into one row per product, and rows that repeat the previous row of
+their product are removed. Run it daily.
+------------------------------------------------------------------------
+"""
+
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from premier.models import PremierProductInventoryHistory
+
+
+class Command(BaseCommand):
+    help = 'Compacts inventory history of Premier products.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=settings.PREMIER_INVENTORY_HISTORY_RETENTION_DAYS,
+            help='days of history kept in full'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='products per query and delete'
+        )
+
+    def handle(self, *args, **options):
+        msgs = PremierProductInventoryHistory.objects.perform_compaction(
+            retention_days=options['retention_days'],
+            batch_size=options['batch_size']
+        )
+        for msg in msgs:
+            print(msg)
@@ -0,0 +1,44 @@
+"""
+This module contains a class that imports a Premier manufacturer
+product CSV (with the columns of the admin import resource) as a
+stream, creating new products and updating changed ones in batches.
+Progress and throughput are printed after each batch.
+------------------------------------------------------------------------
+"""
+
+
+from django.core.management.base import BaseCommand
+
+from premier.importers import PremierProductCsvImporter
+
+
+class Command(BaseCommand):
+    help = 'Imports Premier products from a manufacturer CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='path of CSV file'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='rows per bulk write'
+        )
+        parser.add_argument(
+            '--encoding',
+            default='utf-8-sig',
+            help='encoding of CSV file'
+        )
+
+    def handle(self, *args, **options):
+        importer = PremierProductCsvImporter(
+            batch_size=options['batch_size'],
+            progress=print
+        )
+        with open(options['path'], newline='',
+                  encoding=options['encoding']) as f:
+            msgs = importer.perform_import(f)
+        for msg in msgs:
+            print(msg)
@@ -1,7 +1,57 @@
 from django.db.models import Q
 
+from core.clients import http_transport
+from sema.clients import sema_client
 from premier.models import *
 from sema.models import *
+from shopify.models import ShopifyProduct
+
+
+def print_connection_stats():
+    for host, stats in http_transport.stats.items():
+        print(
+            f"{host}: {stats['requests']} requests, "
+            f"{stats['connections']} connections, "
+            f"{stats['reused']} reused"
+        )
+
+
+def print_sema_rate_limit_stats():
+    for endpoint, stats in sema_client.rate_limit_stats.items():
+        print(
+            f"{endpoint}: {stats['rate']} requests/s, "
+            f"{stats['requests']} requests, "
+            f"{stats['rate_limited']} rate limited, "
+            f"{stats['wait_time']}s waited"
+        )
+
+
+def print_sema_cache_stats():
+    for endpoint, stats in sema_client.cache_stats.items():
+        print(
+            f"{endpoint}: {stats['hits']} cache hits, "
+            f"{stats['misses']} misses, "
+            f"{stats['stores']} stored"
+        )
+
+
+def print_sema_coalesce_stats():
+    for endpoint, stats in sema_client.coalesce_stats.items():
+        print(
+            f"{endpoint}: {stats['calls']} requests, "
+            f"{stats['coalesced']} coalesced"
+        )
+
+
+def perform_shopify_variant_update(premier_products):
+    products = ShopifyProduct.objects.filter(
+        item__premier_product__in=premier_products
+    ).select_related('calculator')
+    msgs = products.perform_calculated_fields_update()
+    msgs += products.filter(
+        product_id__isnull=False
+    ).perform_update_to_api()
+    return msgs
 
 
 def perform_premier_api_update(tasks=None):
@@ -9,6 +59,8 @@ def perform_premier_api_update(tasks=None):
         tasks = [
             'product_inventory',
             'product_pricing',
+            'product_relevancy',
+            'shopify_variant',
             'product_primary_image'
         ]
 
@@ -34,6 +86,32 @@ def perform_premier_api_update(tasks=None):
             except Exception as err:
                 msgs.append(f'Internal Error: {err}')
                 print('--- errored')
+        elif task == 'product_relevancy':
+            print(f'{index}. Checking changed product relevancy...')
+            try:
+                cursors = PremierProductChangeCursor.objects
+                msgs += cursors.perform_since_cursor(
+                    name='product_relevancy',
+                    perform=lambda qs: qs.perform_relevancy_check(),
+                    fields=['inventory_ab']
+                )
+                print('--- complete')
+            except Exception as err:
+                msgs.append(f'Internal Error: {err}')
+                print('--- errored')
+        elif task == 'shopify_variant':
+            print(f'{index}. Updating changed Shopify variants...')
+            try:
+                cursors = PremierProductChangeCursor.objects
+                msgs += cursors.perform_since_cursor(
+                    name='shopify_variant',
+                    perform=perform_shopify_variant_update,
+                    fields=PremierProduct.PRICING_FIELDS
+                )
+                print('--- complete')
+            except Exception as err:
+                msgs.append(f'Internal Error: {err}')
+                print('--- errored')
         elif task == 'product_primary_image':
             print(f'{index}. Updating product primary image...')
             try:
@@ -52,6 +130,8 @@ def perform_premier_api_update(tasks=None):
         else:
             msgs.append('Internal Error: Invalid task')
 
+    print_connection_stats()
+
     info = [msg for msg in msgs if msg[:4] == 'Info']
     success = [msg for msg in msgs if msg[:7] == 'Success']
     error = [
@@ -92,6 +172,8 @@ def retrieve_sema_api_data(models=None):
             continue
         print('--- complete')
 
+    print_sema_cache_stats()
+
     return all_data, errors
 
 
@@ -123,6 +205,8 @@ def perform_sema_api_import_and_unauthorize(models=None):
             continue
         print('--- complete')
 
+    print_sema_cache_stats()
+
     info = [msg for msg in msgs if msg[:4] == 'Info']
     success = [msg for msg in msgs if msg[:7] == 'Success']
     error = [
@@ -140,8 +224,7 @@ def perform_sema_api_update(tasks=None):
             'dataset_vehicles',
             'category_products',
             'product_vehicles',
-            'product_descriptions',
-            'product_digital_assets',
+            'product_pies_attributes',
             'product_html',
         ]
 
@@ -207,6 +290,15 @@ def perform_sema_api_update(tasks=None):
             except Exception as err:
                 msgs.append(f'Internal Error: {err}')
                 print('--- errored')
+        elif task == 'product_pies_attributes':
+            print(f'{index}. Updating product descriptions & assets...')
+            try:
+                qs = SemaProduct.objects.filter(is_relevant=True)
+                msgs += qs.perform_pies_attributes_update_from_api()
+                print('--- complete')
+            except Exception as err:
+                msgs.append(f'Internal Error: {err}')
+                print('--- errored')
         elif task == 'product_html':
             print(f'{index}. Updating product HTML...')
             try:
@@ -219,6 +311,11 @@ def perform_sema_api_update(tasks=None):
         else:
             msgs.append('Internal Error: Invalid task')
 
+    print_connection_stats()
+    print_sema_rate_limit_stats()
+    print_sema_cache_stats()
+    print_sema_coalesce_stats()
+
     info = [msg for msg in msgs if msg[:4] == 'Info']
     success = [msg for msg in msgs if msg[:7] == 'Success']
     error = [
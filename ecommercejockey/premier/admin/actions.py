@@ -1,6 +1,12 @@
+import os
+from uuid import uuid4
+
+from django.conf import settings
 from django.contrib import messages
+from django.template.response import TemplateResponse
 
 from core.admin.actions import RelevancyActions
+from ..importers import PremierProductCsvImporter
 
 
 class PremierManufacturerActions(RelevancyActions):
@@ -8,6 +14,59 @@ class PremierManufacturerActions(RelevancyActions):
 
 
 class PremierProductActions(RelevancyActions):
+    def import_csv_class_action(self, request, queryset):
+        importer = PremierProductCsvImporter()
+        if request.method == 'POST':
+            upload = request.FILES.get('csv_file')
+            if not upload:
+                messages.error(request, 'No file selected')
+                return None
+
+            path = os.path.join(
+                settings.PREMIER_IMPORT_ROOT,
+                f'{uuid4().hex}.csv'
+            )
+            try:
+                os.makedirs(settings.PREMIER_IMPORT_ROOT, exist_ok=True)
+                with open(path, 'wb') as f:
+                    for chunk in upload.chunks():
+                        f.write(chunk)
+                importer.perform_import_in_background(path, name=upload.name)
+                messages.success(
+                    request,
+                    self.model.get_class_success_msg(
+                        f"import of {upload.name} started in background"
+                    )
+                )
+            except Exception as err:
+                if os.path.exists(path):
+                    os.remove(path)
+                messages.error(request, str(err))
+            return None
+
+        status = importer.load_status()
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import CSV in Background',
+            'columns': [column for column, _ in importer.COLUMNS],
+            'status': status,
+            'progress_msg': (
+                importer.get_progress_msg(status) if status else None
+            )
+        }
+        return TemplateResponse(
+            request,
+            'admin/premier/premierproduct/import_csv.html',
+            context
+        )
+    import_csv_class_action.allowed_permissions = ('view',)
+    import_csv_class_action.label = 'Import CSV in Background'
+    import_csv_class_action.short_description = (
+        'Create or update products from a manufacturer CSV, in batches, '
+        'in the background'
+    )
+
     def update_inventory_queryset_action(self, request, queryset):
         try:
             msgs = queryset.perform_inventory_update_from_api()
@@ -254,6 +254,10 @@ class PremierProductModelAdmin(ImportMixin, ObjectActions,
         HasPrimaryImage
     )
 
+    changelist_actions = (
+        'import_csv_class_action',
+    )
+
     change_actions = (
         'update_inventory_object_action',
         'update_pricing_object_action',
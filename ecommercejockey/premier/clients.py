@@ -3,13 +3,28 @@ import json
 from retry import retry
 
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
+from core.clients import BaseApiClient
 from core.exceptions import ApiInvalidToken
 
 
-class PremierApiClient(object):
-    def __init__(self):
-        self.token = self.retrieve_token()
+class PremierApiClient(BaseApiClient):
+    @property
+    def token(self):
+        return self.token_store.get_or_retrieve(
+            'premier_token',
+            self.retrieve_token,
+            timeout=settings.PREMIER_TOKEN_TIMEOUT
+        )
+
+    def refresh_token(self, rejected_token=None):
+        return self.token_store.refresh(
+            'premier_token',
+            self.retrieve_token,
+            timeout=settings.PREMIER_TOKEN_TIMEOUT,
+            rejected_token=rejected_token
+        )
 
     def get_headers(self):
         return {
@@ -20,7 +35,13 @@ class PremierApiClient(object):
     def get_json_body(self, response):
         try:
             if response.status_code == requests.codes.unauthorized:
-                self.token = self.retrieve_token()
+                authorization = response.request.headers.get(
+                    'Authorization',
+                    ''
+                )
+                self.refresh_token(
+                    rejected_token=authorization.replace('Bearer ', '', 1)
+                )
                 raise ApiInvalidToken
             response.raise_for_status()
             return json.loads(response.text)
@@ -34,9 +55,10 @@ class PremierApiClient(object):
         }
 
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['sessionToken']
-        except Exception as err:
+            response = self.get(url=url, params=params)
+            response.raise_for_status()
+            return json.loads(response.text)['sessionToken']
+        except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
@@ -46,7 +68,7 @@ class PremierApiClient(object):
         headers = self.get_headers()
 
         try:
-            response = requests.get(url=url, headers=headers, params=params)
+            response = self.get(url=url, headers=headers, params=params)
             return self.get_json_body(response)
         except Exception:
             raise
@@ -58,10 +80,10 @@ class PremierApiClient(object):
         headers = self.get_headers()
 
         try:
-            response = requests.get(url=url, headers=headers, params=params)
+            response = self.get(url=url, headers=headers, params=params)
             return self.get_json_body(response)
         except Exception:
             raise
 
 
-premier_client = PremierApiClient()
+premier_client = SimpleLazyObject(PremierApiClient)
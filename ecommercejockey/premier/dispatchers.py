@@ -0,0 +1,223 @@
+"""
+This module defines the dispatcher of Premier API chunk requests.
+
+"""
+
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from threading import Lock
+
+import requests
+
+from django.conf import settings
+
+
+class PremierChunkDispatcher(object):
+    """
+    This class dispatches Premier API requests of part number chunks to
+    a bounded worker pool, and yields their responses as they complete,
+    so the caller (the single writer of the database) applies a chunk
+    while the next chunks are in flight. Workers make no queries.
+
+    Requests that may succeed later (connection errors, timeouts, and
+    429 and 5xx responses) are retried; others (e.g. a 400 response to
+    a bad part number) fail at once. Each retried failure backs off all
+    workers (the delay doubles per consecutive failure, up to a
+    maximum, and is at least the `Retry-After` of the response) and a
+    success resets the delay.
+
+    """
+
+    RETRY_STATUS_CODES = (429,)
+
+    def __init__(self, max_workers=None, max_tries=None, backoff=None,
+                 max_backoff=None):
+        """
+        Initializes dispatcher with concurrency and backoff options.
+
+        :param max_workers: maximum number of requests in flight
+            (defaults to `PREMIER_MAX_WORKERS` setting)
+        :type max_workers: int
+        :param max_tries: maximum number of tries per chunk (defaults
+            to `PREMIER_MAX_TRIES` setting)
+        :type max_tries: int
+        :param backoff: seconds of first backoff (defaults to
+            `PREMIER_BACKOFF` setting)
+        :type backoff: float
+        :param max_backoff: maximum seconds of backoff (defaults to
+            `PREMIER_MAX_BACKOFF` setting)
+        :type max_backoff: float
+
+        """
+
+        self.max_workers = max(
+            1, max_workers or settings.PREMIER_MAX_WORKERS
+        )
+        self.max_tries = max(1, max_tries or settings.PREMIER_MAX_TRIES)
+        self.backoff = backoff or settings.PREMIER_BACKOFF
+        self.max_backoff = max_backoff or settings.PREMIER_MAX_BACKOFF
+        self._delay = 0.0
+        self._resume_at = 0.0
+        self._lock = Lock()
+
+    # <editor-fold desc="backoff properties ...">
+    def wait(self):
+        """
+        Sleeps until backoff is over.
+
+        """
+
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def back_off(self, retry_after=None):
+        """
+        Doubles backoff delay (up to maximum), and delays all workers
+        by it, or by `Retry-After` seconds if longer.
+
+        :param retry_after: seconds server asked to wait
+        :type retry_after: float
+
+        """
+
+        with self._lock:
+            if self._delay:
+                self._delay = min(self.max_backoff, self._delay * 2)
+            else:
+                self._delay = self.backoff
+            self._resume_at = max(
+                self._resume_at,
+                time.monotonic() + max(self._delay, retry_after or 0.0)
+            )
+
+    def recover(self):
+        """
+        Resets backoff delay.
+
+        """
+
+        with self._lock:
+            self._delay = 0.0
+    # </editor-fold>
+
+    def is_retryable(self, err):
+        """
+        Returns whether or not request exception may not recur.
+
+        :param err: request exception
+        :type err: requests.RequestException
+
+        :rtype: bool
+
+        """
+
+        if isinstance(err, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if isinstance(err, requests.HTTPError) and err.response is not None:
+            status_code = err.response.status_code
+            return status_code in self.RETRY_STATUS_CODES or status_code >= 500
+        return False
+
+    @staticmethod
+    def get_retry_after(err):
+        """
+        Returns seconds to wait from `Retry-After` header (seconds or
+        HTTP date) of response of request exception, if any.
+
+        :param err: request exception
+        :type err: requests.RequestException
+
+        :return: seconds or None
+        :rtype: float
+
+        """
+
+        headers = getattr(getattr(err, 'response', None), 'headers', None)
+        value = headers.get('Retry-After') if headers else None
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def retrieve(self, retrieve, chunk):
+        """
+        Returns response of chunk, retrying requests that may succeed
+        later after backing off.
+
+        :param retrieve: function retrieving data of part numbers
+        :type retrieve: callable
+        :param chunk: part numbers
+        :type chunk: list
+
+        :return: response data
+        :rtype: list
+
+        :raises Exception: on last failed try, or exception that is
+            not retried
+
+        """
+
+        for attempt in range(1, self.max_tries + 1):
+            self.wait()
+            try:
+                response = retrieve(chunk)
+            except requests.RequestException as err:
+                if attempt == self.max_tries or not self.is_retryable(err):
+                    raise
+                self.back_off(retry_after=self.get_retry_after(err))
+                continue
+            except Exception:
+                raise
+
+            self.recover()
+            return response
+
+    def dispatch(self, retrieve, chunks):
+        """
+        Retrieves data of chunks concurrently, keeping at most twice as
+        many chunks pending as workers.
+
+        :param retrieve: function retrieving data of part numbers
+        :type retrieve: callable
+        :param chunks: part number chunks
+        :type chunks: iterable
+
+        :return: (chunk, response, error) tuples, in completion order
+        :rtype: generator
+
+        """
+
+        chunks = iter(chunks)
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                while len(pending) < self.max_workers * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    future = pool.submit(self.retrieve, retrieve, chunk)
+                    pending[future] = chunk
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    err = future.exception()
+                    if err:
+                        yield chunk, None, err
+                    else:
+                        yield chunk, future.result(), None
+
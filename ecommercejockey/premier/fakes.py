@@ -0,0 +1,79 @@
+"""
+This module defines the fake Premier API used to benchmark Premier
+pipelines offline.
+
+"""
+
+
+from django.conf import settings
+
+from core.fakes import FakeApi
+
+
+class FakePremierApi(FakeApi):
+    """
+    This class defines a fake Premier API. Inventory and pricing are
+    generated for any requested item number, deterministically by seed,
+    so a change of seed simulates a day of inventory and price changes.
+
+    """
+
+    base_url = settings.PREMIER_BASE_URL
+    rate_limit_status_code = 429
+    routes = (
+        ('GET', r'/authenticate', 'get_token'),
+        ('GET', r'/inventory', 'get_inventory'),
+        ('GET', r'/pricing', 'get_pricing')
+    )
+
+    WAREHOUSE_CODES = [
+        'AB-1', 'CA-1', 'CO-1', 'KY-1', 'PO-1', 'TX-1', 'UT-1', 'WA-1'
+    ]
+    CURRENCY_RATES = [('USD', 1.0), ('CAD', 1.32)]
+
+    # <editor-fold desc="route properties ...">
+    def get_token(self, request):
+        return 200, {'sessionToken': 'fake-session-token'}
+
+    def get_inventory(self, request):
+        data = []
+        for item_number in request.get_list('itemNumbers'):
+            rand = self.get_random('inventory', item_number)
+            data.append(
+                {
+                    'itemNumber': item_number,
+                    'inventory': [
+                        {
+                            'warehouseCode': warehouse_code,
+                            'quantityAvailable': float(
+                                rand.choice([0, 0, 1, 2, 5, 10, 25])
+                            )
+                        }
+                        for warehouse_code in self.WAREHOUSE_CODES
+                    ]
+                }
+            )
+        return 200, data
+
+    def get_pricing(self, request):
+        data = []
+        for item_number in request.get_list('itemNumbers'):
+            rand = self.get_random('pricing', item_number)
+            cost = round(rand.uniform(5, 500), 2)
+            data.append(
+                {
+                    'itemNumber': item_number,
+                    'pricing': [
+                        {
+                            'currency': currency,
+                            'cost': round(cost * rate, 2),
+                            'jobber': round(cost * rate * 1.2, 2),
+                            'retail': round(cost * rate * 1.5, 2),
+                            'map': round(cost * rate * 1.4, 2)
+                        }
+                        for currency, rate in self.CURRENCY_RATES
+                    ]
+                }
+            )
+        return 200, data
+    # </editor-fold>
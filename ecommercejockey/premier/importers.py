@@ -0,0 +1,433 @@
+"""
+This module defines the streaming importer of Premier product CSVs.
+
+"""
+
+
+import csv
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+from threading import Thread
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import DecimalField, ForeignKey
+from django.utils import timezone
+
+from .models import PremierManufacturer, PremierProduct
+
+
+class PremierProductCsvImporter(object):
+    """
+    This class imports Premier manufacturer product CSVs (with the
+    columns of the admin import resource) as a stream. Rows are parsed
+    one at a time, manufacturers are resolved from a map of names loaded
+    once, and rows are diffed against an index of existing products
+    loaded once, so unchanged rows are skipped without queries. New and
+    changed products are written in batches, with one bulk create and
+    one bulk update per batch, in a transaction.
+
+    Progress is reported after each batch, and written to a status
+    file, so an import running in the background can be followed.
+
+    """
+
+    COLUMNS = (
+        ('PremierPartNumber', 'premier_part_number'),
+        ('VendorPartNumber', 'vendor_part_number'),
+        ('Description', 'description'),
+        ('Manufacturer', 'manufacturer'),
+        ('MSRP', 'msrp'),
+        ('MAP', 'map'),
+        ('Jobber', 'jobber'),
+        ('Your Cost', 'cost'),
+        ('Status', 'part_status'),
+        ('Weight (lbs)', 'weight'),
+        ('Length (in)', 'length'),
+        ('Width (in)', 'width'),
+        ('Height (in)', 'height'),
+        ('UPC', 'upc')
+    )
+    STALE_AFTER = 15 * 60
+
+    def __init__(self, batch_size=None, status_path=None, progress=None):
+        """
+        Initializes importer with batch size, status path, and progress
+        callback.
+
+        :param batch_size: number of rows per batch (defaults to
+            `PREMIER_IMPORT_BATCH_SIZE` setting)
+        :type batch_size: int
+        :param status_path: path of status file (defaults to
+            `status.json` in `PREMIER_IMPORT_ROOT` setting)
+        :type status_path: str
+        :param progress: function called with progress message after
+            each batch
+        :type progress: callable
+
+        """
+
+        self.batch_size = batch_size or settings.PREMIER_IMPORT_BATCH_SIZE
+        self.status_path = status_path or os.path.join(
+            settings.PREMIER_IMPORT_ROOT,
+            'status.json'
+        )
+        self.progress = progress
+        self.fields = [
+            PremierProduct._meta.get_field(attr)
+            for _, attr in self.COLUMNS
+        ]
+        self.update_fields = [
+            field.name for field in self.fields if not field.primary_key
+        ]
+
+    # <editor-fold desc="status properties ...">
+    def get_initial_status(self, name):
+        """
+        Returns status of import not yet started.
+
+        :param name: name of import
+        :type name: str
+
+        :return: import status
+        :rtype: dict
+
+        **-Return Format-**
+        ::
+            ret = {
+                "name": <str>,
+                "started": <str>,
+                "updated": <float>,
+                "is_finished": <bool>,
+                "rows": <int>,
+                "created": <int>,
+                "changed": <int>,
+                "unchanged": <int>,
+                "errors": <int>,
+                "rate": <float>,
+                "msgs": <list>
+            }
+
+        """
+
+        return {
+            'name': name,
+            'started': timezone.now().isoformat(),
+            'updated': time.time(),
+            'is_finished': False,
+            'rows': 0,
+            'created': 0,
+            'changed': 0,
+            'unchanged': 0,
+            'errors': 0,
+            'rate': 0.0,
+            'msgs': []
+        }
+
+    def load_status(self):
+        """
+        Returns status of last import, or None if there is none.
+
+        :return: import status (see `get_initial_status`)
+        :rtype: dict
+
+        """
+
+        try:
+            with open(self.status_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_status(self, status):
+        """
+        Writes status of import. Status is written to a temporary file
+        first, so a reader never sees a partial status.
+
+        :param status: import status
+        :type status: dict
+
+        :raises Exception: on general exception
+
+        """
+
+        try:
+            os.makedirs(os.path.dirname(self.status_path), exist_ok=True)
+            temp_path = f'{self.status_path}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(status, f)
+            os.replace(temp_path, self.status_path)
+        except Exception:
+            raise
+
+    def is_running(self):
+        """
+        Returns whether or not an import is running (one that has not
+        reported progress for a while is assumed dead).
+
+        :rtype: bool
+
+        """
+
+        status = self.load_status()
+        return bool(
+            status
+            and not status['is_finished']
+            and time.time() - status['updated'] < self.STALE_AFTER
+        )
+
+    def get_progress_msg(self, status):
+        return (
+            f"{status['name']}: {status['rows']} rows, "
+            f"{status['created']} created, "
+            f"{status['changed']} updated, "
+            f"{status['unchanged']} unchanged, "
+            f"{status['errors']} errored, "
+            f"{status['rate']:.0f} rows/s"
+        )
+    # </editor-fold>
+
+    # <editor-fold desc="row properties ...">
+    def get_manufacturer_map(self):
+        return dict(PremierManufacturer.objects.values_list('name', 'pk'))
+
+    def get_product_index(self):
+        """
+        Returns import values of existing products by part number.
+
+        :return: import values (in field order, with manufacturer PK)
+            by part number
+        :rtype: dict
+
+        """
+
+        attnames = [field.attname for field in self.fields]
+        return {
+            values[0]: values
+            for values in PremierProduct.objects.order_by().values_list(
+                *attnames
+            ).iterator()
+        }
+
+    def read_rows(self, f):
+        """
+        Yields rows of CSV file as they are read.
+
+        :param f: CSV text file
+        :type f: file
+
+        :return: (line number, row) tuples
+        :rtype: generator
+
+        :raises Exception: on missing columns
+
+        """
+
+        reader = csv.DictReader(f)
+        missing = [
+            column for column, _ in self.COLUMNS
+            if column not in (reader.fieldnames or [])
+        ]
+        if missing:
+            raise Exception(f"missing columns {', '.join(missing)}")
+
+        for row in reader:
+            yield reader.line_num, row
+
+    def parse_row(self, row, manufacturers):
+        """
+        Returns import values of row, cleaned as the admin import
+        resource cleans them (decimals are rounded to two places).
+
+        :param row: CSV row
+        :type row: dict
+        :param manufacturers: manufacturer PKs by name
+        :type manufacturers: dict
+
+        :return: import values (in field order, with manufacturer PK)
+        :rtype: tuple
+
+        :raises ValueError: on invalid value
+
+        """
+
+        values = []
+        for (column, _), field in zip(self.COLUMNS, self.fields):
+            value = row[column]
+            if isinstance(field, ForeignKey):
+                try:
+                    value = manufacturers[value]
+                except KeyError:
+                    raise ValueError(f"{column} {value} does not exist")
+            elif isinstance(field, DecimalField):
+                if value is None or value.strip() == '':
+                    value = None
+                else:
+                    try:
+                        value = round(Decimal(value), 2)
+                    except InvalidOperation:
+                        raise ValueError(f"{column} {value} is not a number")
+            elif value is not None and len(value) > field.max_length:
+                raise ValueError(
+                    f"{column} longer than {field.max_length} characters"
+                )
+
+            if value is None and not field.null:
+                raise ValueError(f"{column} is required")
+            values.append(value)
+
+        if not values[0]:
+            raise ValueError(f"{self.COLUMNS[0][0]} is required")
+        return tuple(values)
+    # </editor-fold>
+
+    def write_batch(self, new_values, changed_values):
+        attnames = [field.attname for field in self.fields]
+        new_objs = [
+            PremierProduct(**dict(zip(attnames, values)))
+            for values in new_values
+        ]
+        changed_objs = [
+            PremierProduct(**dict(zip(attnames, values)))
+            for values in changed_values
+        ]
+        with transaction.atomic():
+            PremierProduct.objects.bulk_create(new_objs)
+            PremierProduct.objects.bulk_update(
+                changed_objs,
+                fields=self.update_fields
+            )
+
+    def perform_import(self, f, name=None):
+        """
+        Imports products of CSV file.
+
+        :param f: CSV text file
+        :type f: file
+        :param name: name of import (defaults to file name)
+        :type name: str
+
+        :return: info, success, and error messages
+        :rtype: list
+
+        """
+
+        msgs = []
+        start = time.perf_counter()
+        status = self.get_initial_status(
+            name or getattr(f, 'name', 'CSV')
+        )
+
+        def measure():
+            elapsed = time.perf_counter() - start
+            status['updated'] = time.time()
+            status['rate'] = status['rows'] / elapsed if elapsed else 0.0
+
+        def report():
+            measure()
+            status['msgs'] = msgs[:100]
+            self.save_status(status)
+            if self.progress:
+                self.progress(self.get_progress_msg(status))
+
+        try:
+            self.save_status(status)
+            manufacturers = self.get_manufacturer_map()
+            index = self.get_product_index()
+
+            new_values = {}
+            changed_values = {}
+            for line_num, row in self.read_rows(f):
+                status['rows'] += 1
+                try:
+                    values = self.parse_row(row, manufacturers)
+                except ValueError as err:
+                    status['errors'] += 1
+                    msgs.append(
+                        PremierProduct.get_class_error_msg(
+                            f"line {line_num}, {err}"
+                        )
+                    )
+                    continue
+
+                part_number = values[0]
+                if part_number in new_values:
+                    new_values[part_number] = values
+                elif part_number not in index:
+                    new_values[part_number] = values
+                    status['created'] += 1
+                elif index[part_number] == values:
+                    status['unchanged'] += 1
+                else:
+                    if part_number not in changed_values:
+                        status['changed'] += 1
+                    changed_values[part_number] = values
+                index[part_number] = values
+
+                if len(new_values) + len(changed_values) >= self.batch_size:
+                    self.write_batch(
+                        new_values.values(),
+                        changed_values.values()
+                    )
+                    new_values = {}
+                    changed_values = {}
+                    report()
+
+            self.write_batch(new_values.values(), changed_values.values())
+            measure()
+            if status['created'] or status['changed']:
+                msgs.insert(
+                    0,
+                    PremierProduct.get_class_success_msg(
+                        self.get_progress_msg(status)
+                    )
+                )
+            else:
+                msgs.insert(
+                    0,
+                    PremierProduct.get_class_up_to_date_msg(
+                        self.get_progress_msg(status)
+                    )
+                )
+        except Exception as err:
+            msgs.insert(
+                0,
+                PremierProduct.get_class_error_msg(
+                    f"import stopped at row {status['rows']}, {err}"
+                )
+            )
+
+        status['is_finished'] = True
+        report()
+        return msgs
+
+    def perform_import_in_background(self, path, name=None):
+        """
+        Starts import of CSV file in a background thread. The file is
+        removed once imported.
+
+        :param path: path of CSV file
+        :type path: str
+        :param name: name of import (defaults to file name)
+        :type name: str
+
+        :raises Exception: if an import is already running
+
+        """
+
+        if self.is_running():
+            raise Exception('An import is already running')
+
+        def perform_import():
+            try:
+                with open(path, newline='', encoding='utf-8-sig') as f:
+                    self.perform_import(f, name=name)
+            finally:
+                connection.close()
+                os.remove(path)
+
+        name = name or os.path.basename(path)
+        self.save_status(self.get_initial_status(name))
+        Thread(target=perform_import, daemon=True).start()
@@ -1,12 +1,23 @@
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connection, transaction
 from django.db.models import (
     Manager,
     QuerySet,
     Count,
-    Q
+    Max,
+    OuterRef,
+    Q,
+    Subquery
 )
+from django.utils import timezone
 
 from core.utils import chunkify_list
 from .clients import premier_client
+from .dispatchers import PremierChunkDispatcher
 
 
 class PremierManufacturerQuerySet(QuerySet):
@@ -80,53 +91,218 @@ class PremierProductQuerySet(QuerySet):
             map_usd__isnull=False
         )
 
-    # <editor-fold desc="perform properties ...">
-    def perform_inventory_update_from_api(self):
+    def changed_since(self, timestamp, fields=None):
+        from .models import PremierProductChange
+
+        changes = PremierProductChange.objects.since(timestamp)
+        if fields:
+            changes = changes.filter(field__in=fields)
+        return self.filter(
+            premier_part_number__in=changes.values('part_number')
+        )
+
+    def changed_since_id(self, pk, fields=None, until_pk=None):
+        from .models import PremierProductChange
+
+        changes = PremierProductChange.objects.since_id(pk)
+        if until_pk is not None:
+            changes = changes.filter(pk__lte=until_pk)
+        if fields:
+            changes = changes.filter(field__in=fields)
+        return self.filter(
+            premier_part_number__in=changes.values('part_number')
+        )
+
+    # <editor-fold desc="update properties ...">
+    def apply_inventory_data_from_api(self, chunk, response):
+        from .models import (
+            PremierProductChange,
+            PremierProductInventoryHistory
+        )
+
         msgs = []
 
-        queryset = self.all()
-        part_numbers = [obj.premier_part_number for obj in queryset]
+        objs = self.select_related('manufacturer').in_bulk(chunk)
+        changed_objs = []
+        changed_values = {}
+        changes = []
+        created = timezone.now()
+        for items in response:
+            obj = objs.get(items['itemNumber'])
+            if not obj:
+                msgs.append(
+                    self.model.get_class_error_msg(
+                        f"{items['itemNumber']} does not exist"
+                    )
+                )
+                continue
 
-        chunks = chunkify_list(part_numbers, chunk_size=50)
-        for chunk in chunks:
+            previous_values = {
+                attr: getattr(obj, attr)
+                for attr in self.model.INVENTORY_FIELDS
+            }
+            update_fields = {}
             try:
-                response = self.model.objects.retrieve_inventory_data_from_api(chunk)
-                for items in response:
-                    obj = queryset.get(premier_part_number=items['itemNumber'])
-                    data = items['inventory']
-                    update_fields = self.model.objects.parse_api_inventory_data(
-                        data
-                    )
-                    msgs.append(
-                        obj.perform_inventory_update_from_api_data(**update_fields)
+                update_fields = self.model.objects.parse_api_inventory_data(
+                    items['inventory']
+                )
+                prev = obj.set_inventory_fields_from_api_data(
+                    **update_fields
+                )
+            except Exception as err:
+                msgs.append(
+                    obj.get_instance_error_msg(f"{update_fields}, {err}")
+                )
+                continue
+
+            new = obj.inventory_state
+            if not new == prev:
+                changed_objs.append(obj)
+                changed_values[obj.pk] = previous_values
+                changes += PremierProductChange.objects.get_changes(
+                    product=obj,
+                    previous_values=previous_values,
+                    created=created
+                )
+            msgs.append(
+                obj.get_update_success_msg(
+                    previous_data=prev,
+                    new_data=new
+                )
+            )
+
+        with transaction.atomic():
+            PremierProductChange.objects.lock_writes()
+            self.model.objects.bulk_update(
+                changed_objs,
+                fields=self.model.INVENTORY_FIELDS
+            )
+            PremierProductChange.objects.bulk_create(changes)
+            PremierProductInventoryHistory.objects.record(
+                changed_objs,
+                previous_values=changed_values
+            )
+        return msgs
+
+    def apply_pricing_data_from_api(self, chunk, response):
+        from .models import PremierProductChange
+
+        msgs = []
+
+        objs = self.select_related('manufacturer').in_bulk(chunk)
+        changed_objs = []
+        changes = []
+        created = timezone.now()
+        for items in response:
+            obj = objs.get(items['itemNumber'])
+            if not obj:
+                msgs.append(
+                    self.model.get_class_error_msg(
+                        f"{items['itemNumber']} does not exist"
                     )
+                )
+                continue
+
+            previous_values = {
+                attr: getattr(obj, attr)
+                for attr in self.model.PRICING_FIELDS
+            }
+            update_fields = {}
+            try:
+                update_fields = self.model.objects.parse_api_pricing_data(
+                    items['pricing']
+                )
+                prev = obj.set_pricing_fields_from_api_data(
+                    **update_fields
+                )
             except Exception as err:
-                msgs.append(f'Chunk Error: {chunk}, {err}')
+                msgs.append(
+                    obj.get_instance_error_msg(f"{update_fields}, {err}")
+                )
                 continue
+
+            new = obj.pricing_state
+            if not new == prev:
+                changed_objs.append(obj)
+                changes += PremierProductChange.objects.get_changes(
+                    product=obj,
+                    previous_values=previous_values,
+                    created=created
+                )
+            msgs.append(
+                obj.get_update_success_msg(
+                    previous_data=prev,
+                    new_data=new
+                )
+            )
+
+        with transaction.atomic():
+            PremierProductChange.objects.lock_writes()
+            self.model.objects.bulk_update(
+                changed_objs,
+                fields=self.model.PRICING_FIELDS
+            )
+            PremierProductChange.objects.bulk_create(changes)
         return msgs
+    # </editor-fold>
 
-    def perform_pricing_update_from_api(self):
+    # <editor-fold desc="perform properties ...">
+    def perform_update_from_api(self, retrieve, apply):
         msgs = []
 
-        queryset = self.all()
-        part_numbers = [obj.premier_part_number for obj in queryset]
+        part_numbers = list(
+            self.values_list('premier_part_number', flat=True)
+        )
+
+        chunks = chunkify_list(
+            part_numbers,
+            chunk_size=settings.PREMIER_CHUNK_SIZE
+        )
+        dispatcher = PremierChunkDispatcher()
+        for chunk, response, err in dispatcher.dispatch(retrieve, chunks):
+            if err:
+                msgs.append(f'Chunk Error: {chunk}, {err}')
+                continue
+            try:
+                msgs += apply(chunk, response)
+            except Exception as err:
+                msgs.append(f'Chunk Error: {chunk}, {err}')
+                continue
+        return msgs
+
+    def perform_inventory_update_from_api(self):
+        return self.perform_update_from_api(
+            retrieve=self.model.objects.retrieve_inventory_data_from_api,
+            apply=self.apply_inventory_data_from_api
+        )
+
+    def perform_pricing_update_from_api(self):
+        return self.perform_update_from_api(
+            retrieve=self.model.objects.retrieve_pricing_data_from_api,
+            apply=self.apply_pricing_data_from_api
+        )
 
-        chunks = chunkify_list(part_numbers, chunk_size=50)
-        for chunk in chunks:
+    def perform_relevancy_check(self):
+        msgs = []
+        for obj in self.select_related('manufacturer'):
             try:
-                response = self.model.objects.retrieve_pricing_data_from_api(chunk)
-                for items in response:
-                    obj = queryset.get(premier_part_number=items['itemNumber'])
-                    data = items['pricing']
-                    update_fields = self.model.objects.parse_api_pricing_data(
-                        data
+                if obj.may_be_relevant and not obj.is_relevant:
+                    msgs.append(
+                        obj.get_instance_up_to_date_msg(
+                            message="may be relevant"
+                        )
                     )
+                elif obj.is_relevant and not obj.may_be_relevant:
                     msgs.append(
-                        obj.perform_pricing_update_from_api_data(**update_fields)
+                        obj.get_instance_up_to_date_msg(
+                            message="may not be relevant"
+                        )
                     )
             except Exception as err:
-                msgs.append(f'Chunk Error: {chunk}, {err}')
+                msgs.append(obj.get_instance_error_msg(str(err)))
                 continue
+        if not msgs:
+            msgs.append(self.model.get_class_up_to_date_msg())
         return msgs
 
     def perform_primary_image_update_from_media_root(self):
@@ -143,6 +319,18 @@ class PremierProductQuerySet(QuerySet):
     # </editor-fold>
 
 
+class PremierProductChangeQuerySet(QuerySet):
+    def since(self, timestamp):
+        return self.filter(created__gt=timestamp)
+
+    def since_id(self, pk):
+        # Writers of changes (scheduled updates and admin actions) are
+        # serialized by PremierProductChangeManager.lock_writes, so PKs
+        # follow commit order (unlike created, which is when a chunk
+        # was started).
+        return self.filter(pk__gt=pk)
+
+
 class PremierManufacturerManager(Manager):
     def get_queryset(self):
         return PremierManufacturerQuerySet(
@@ -176,6 +364,16 @@ class PremierProductManager(Manager):
     def has_missing_pricing_data(self):
         return self.get_queryset().has_missing_pricing_data()
 
+    def changed_since(self, timestamp, fields=None):
+        return self.get_queryset().changed_since(timestamp, fields=fields)
+
+    def changed_since_id(self, pk, fields=None, until_pk=None):
+        return self.get_queryset().changed_since_id(
+            pk,
+            fields=fields,
+            until_pk=until_pk
+        )
+
     # <editor-fold desc="retrieve properties ...">
     @staticmethod
     def retrieve_inventory_data_from_api(part_numbers):
@@ -226,6 +424,9 @@ class PremierProductManager(Manager):
     def perform_pricing_update_from_api(self):
         return self.get_queryset().perform_pricing_update_from_api()
 
+    def perform_relevancy_check(self):
+        return self.get_queryset().perform_relevancy_check()
+
     def perform_primary_image_update_from_media_root(self):
         msgs = []
         try:
@@ -234,3 +435,272 @@ class PremierProductManager(Manager):
             msgs.append(self.model.get_class_error_msg(str(err)))
         return msgs
     # </editor-fold>
+
+
+class PremierProductChangeManager(Manager):
+    # Key of PostgreSQL advisory lock held by writers of changes
+    WRITE_LOCK_ID = 4101
+
+    def get_queryset(self):
+        return PremierProductChangeQuerySet(
+            self.model,
+            using=self._db
+        )
+
+    def since(self, timestamp):
+        return self.get_queryset().since(timestamp)
+
+    def since_id(self, pk):
+        return self.get_queryset().since_id(pk)
+
+    def lock_writes(self):
+        # Called first in each transaction that writes changes, so they
+        # commit in the order their PKs are assigned (the lock is held
+        # until commit).
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(%s)',
+                    [self.WRITE_LOCK_ID]
+                )
+
+    def get_changes(self, product, previous_values, created=None):
+        created = created or timezone.now()
+        return [
+            self.model(
+                product=product,
+                part_number=product.premier_part_number,
+                field=attr,
+                previous_value=value,
+                new_value=getattr(product, attr),
+                created=created
+            )
+            for attr, value in previous_values.items()
+            if not getattr(product, attr) == value
+        ]
+
+
+class PremierProductChangeCursorManager(Manager):
+    def perform_since_cursor(self, name, perform, fields=None):
+        # Calls perform, in chunks, with the products changed (in
+        # fields) since the named cursor and those that failed before,
+        # then advances the cursor past the changes seen. Products of
+        # chunks for which perform returned errors are recorded as
+        # failed, and processed again by the next call, so they do not
+        # hold back the cursor.
+        from .models import PremierProduct, PremierProductChange
+
+        cursor, _ = self.get_or_create(name=name)
+        failed = cursor.failed.split()
+        last_id = PremierProductChange.objects.aggregate(
+            last_id=Max('pk')
+        )['last_id'] or 0
+        if last_id <= cursor.last_id and not failed:
+            return [PremierProductChange.get_class_nothing_new_msg()]
+
+        changed = PremierProduct.objects.changed_since_id(
+            cursor.last_id,
+            fields=fields,
+            until_pk=last_id
+        )
+        products = PremierProduct.objects.filter(
+            Q(pk__in=failed) | Q(pk__in=changed.values('pk'))
+        )
+        part_numbers = list(
+            products.order_by('pk').values_list('pk', flat=True)
+        )
+
+        msgs = []
+        still_failed = []
+        for chunk in chunkify_list(part_numbers, settings.PREMIER_CHUNK_SIZE):
+            chunk_msgs = perform(
+                PremierProduct.objects.filter(premier_part_number__in=chunk)
+            )
+            msgs += chunk_msgs
+            if any(
+                msg for msg in chunk_msgs
+                if not msg[:4] == 'Info'
+                and not msg[:7] == 'Success'
+            ):
+                still_failed += chunk
+
+        cursor.last_id = max(cursor.last_id, last_id)
+        cursor.failed = '\n'.join(still_failed)
+        cursor.save()
+
+        if not msgs:
+            msgs.append(PremierProductChange.get_class_nothing_new_msg())
+        return msgs
+
+
+class PremierProductInventoryHistoryManager(Manager):
+    def record(self, products, date=None, previous_values=None):
+        # Products with no history yet also get a baseline row of their
+        # previous values ({product PK: {field: value}}) on the day
+        # before, so history does not start at their first change.
+        products = list(products)
+        if not products:
+            return
+
+        date = date or timezone.localdate()
+        existing = {
+            obj.product_id: obj
+            for obj in self.filter(product__in=products, date=date)
+        }
+        recorded_ids = set(
+            self.filter(product__in=products).order_by().values_list(
+                'product',
+                flat=True
+            ).distinct()
+        )
+
+        new_objs = []
+        updated_objs = []
+        for product in products:
+            if (previous_values and product.pk in previous_values
+                    and product.pk not in recorded_ids):
+                new_objs.append(
+                    self.model(
+                        product=product,
+                        date=date - timedelta(days=1),
+                        quantities=self.model.pack_quantities([
+                            previous_values[product.pk].get(attr)
+                            for attr in product.INVENTORY_FIELDS
+                        ])
+                    )
+                )
+            quantities = self.model.pack_quantities(
+                [getattr(product, attr) for attr in product.INVENTORY_FIELDS]
+            )
+            obj = existing.get(product.pk)
+            if obj:
+                obj.quantities = quantities
+                updated_objs.append(obj)
+            else:
+                new_objs.append(
+                    self.model(
+                        product=product,
+                        date=date,
+                        quantities=quantities
+                    )
+                )
+
+        self.bulk_create(new_objs)
+        self.bulk_update(updated_objs, fields=['quantities'])
+
+    def get_history(self, part_numbers, days):
+        # Rows are only recorded on change, so each product's last row
+        # on or before the first day is selected too, and carried
+        # forward. Returns {part number: [quantities of each day]},
+        # oldest day first, with quantities ordered as INVENTORY_FIELDS
+        # (None before the first row of product).
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+        dates = [start + timedelta(days=day) for day in range(days)]
+
+        baseline = self.filter(
+            product=OuterRef('product'),
+            date__lte=start
+        ).order_by('-date').values('date')[:1]
+        rows = self.filter(
+            Q(date__gte=start) | Q(date=Subquery(baseline)),
+            product__in=part_numbers,
+            date__lte=end
+        ).order_by('product', 'date').values_list(
+            'product',
+            'date',
+            'quantities'
+        )
+
+        history = {}
+        for product_id, product_rows in groupby(rows, key=itemgetter(0)):
+            product_rows = list(product_rows)
+            index = 0
+            quantities = None
+            series = []
+            for date in dates:
+                while (index < len(product_rows)
+                       and product_rows[index][1] <= date):
+                    quantities = self.model.unpack_quantities(
+                        product_rows[index][2]
+                    )
+                    index += 1
+                series.append(quantities)
+            history[product_id] = series
+        return history
+
+    def perform_compaction(self, retention_days=None, batch_size=1000):
+        # Rows older than retention are rolled up into one row per
+        # product on the cutoff date (the quantities then in effect),
+        # and rows equal to their previous row are removed.
+        msgs = []
+
+        retention_days = (
+            retention_days
+            or settings.PREMIER_INVENTORY_HISTORY_RETENTION_DAYS
+        )
+        cutoff = timezone.localdate() - timedelta(days=retention_days)
+
+        try:
+            product_ids = list(
+                self.order_by('product').values_list(
+                    'product',
+                    flat=True
+                ).distinct()
+            )
+
+            removed_count = 0
+            rolled_count = 0
+            for chunk in chunkify_list(product_ids, chunk_size=batch_size):
+                rows = self.filter(product__in=chunk).order_by(
+                    'product',
+                    'date'
+                ).values_list('pk', 'product', 'date', 'quantities')
+
+                removed_pks = []
+                rolled_objs = []
+                for _, product_rows in groupby(rows, key=itemgetter(1)):
+                    expired_rows = []
+                    kept_rows = []
+                    for row in product_rows:
+                        if row[2] < cutoff:
+                            expired_rows.append(row)
+                        else:
+                            kept_rows.append(row)
+
+                    if expired_rows:
+                        last_row = expired_rows.pop()
+                        removed_pks += [row[0] for row in expired_rows]
+                        if kept_rows and kept_rows[0][2] == cutoff:
+                            removed_pks.append(last_row[0])
+                        else:
+                            rolled_objs.append(
+                                self.model(pk=last_row[0], date=cutoff)
+                            )
+                            kept_rows.insert(0, last_row)
+
+                    previous_quantities = None
+                    for row in kept_rows:
+                        quantities = bytes(row[3])
+                        if quantities == previous_quantities:
+                            removed_pks.append(row[0])
+                        previous_quantities = quantities
+
+                with transaction.atomic():
+                    self.filter(pk__in=removed_pks).delete()
+                    self.bulk_update(rolled_objs, fields=['date'])
+                removed_count += len(removed_pks)
+                rolled_count += len(rolled_objs)
+
+            if removed_count or rolled_count:
+                msgs.append(
+                    self.model.get_class_success_msg(
+                        f"{removed_count} rows removed, "
+                        f"{rolled_count} rows rolled up to {cutoff}"
+                    )
+                )
+            else:
+                msgs.append(self.model.get_class_up_to_date_msg())
+        except Exception as err:
+            msgs.append(self.model.get_class_error_msg(str(err)))
+        return msgs
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.5 on 2026-10-16 20:31
+
+import core.mixins
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier', '0011_relevancy_exception'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PremierProductChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=20)),
+                ('previous_value', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('new_value', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('created', models.DateTimeField(db_index=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='premier.PremierProduct')),
+            ],
+            options={
+                'ordering': ['created', 'pk'],
+            },
+            bases=(models.Model, core.mixins.MessagesMixin),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.5 on 2026-10-16 20:34
+
+import core.mixins
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier', '0012_premierproductchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PremierProductInventoryHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('quantities', models.BinaryField(help_text='packed warehouse quantities')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_history', to='premier.PremierProduct')),
+            ],
+            options={
+                'verbose_name_plural': 'Premier product inventory history',
+                'ordering': ['product', 'date'],
+                'unique_together': {('product', 'date')},
+            },
+            bases=(models.Model, core.mixins.MessagesMixin),
+        ),
+    ]
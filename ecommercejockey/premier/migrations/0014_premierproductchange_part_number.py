@@ -0,0 +1,31 @@
+# Generated by Django 2.2.5 on 2026-10-16 21:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_part_numbers(apps, schema_editor):
+    PremierProductChange = apps.get_model('premier', 'PremierProductChange')
+    PremierProductChange.objects.update(part_number=models.F('product_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier', '0013_premierproductinventoryhistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='premierproductchange',
+            name='part_number',
+            field=models.CharField(db_index=True, default='', max_length=30),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_part_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='premierproductchange',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='changes', to='premier.PremierProduct'),
+        ),
+    ]
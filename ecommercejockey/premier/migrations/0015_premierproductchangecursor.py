@@ -0,0 +1,23 @@
+# Generated by Django 2.2.5 on 2026-10-16 21:50
+
+import core.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier', '0014_premierproductchange_part_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PremierProductChangeCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.PositiveIntegerField(default=0, help_text='last change processed')),
+            ],
+            bases=(models.Model, core.mixins.MessagesMixin),
+        ),
+    ]
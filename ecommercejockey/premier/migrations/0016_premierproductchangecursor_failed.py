@@ -0,0 +1,18 @@
+# Generated by Django 2.2.5 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier', '0015_premierproductchangecursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='premierproductchangecursor',
+            name='failed',
+            field=models.TextField(blank=True, help_text='part numbers of failed products, one per line'),
+        ),
+    ]
@@ -1,24 +1,36 @@
 import os
+from decimal import Decimal
 from shutil import move
+from struct import Struct
 
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
 
 from django.conf import settings
+from django.db import transaction
 from django.db.models import (
     Model,
+    BinaryField,
     CharField,
+    DateField,
+    DateTimeField,
     DecimalField,
     ForeignKey,
     ImageField,
     IntegerField,
-    CASCADE
+    PositiveIntegerField,
+    TextField,
+    CASCADE,
+    SET_NULL
 )
 
 from core.mixins import MessagesMixin
 from core.models import RelevancyBaseModel
 from .managers import (
     PremierManufacturerManager,
+    PremierProductChangeCursorManager,
+    PremierProductChangeManager,
+    PremierProductInventoryHistoryManager,
     PremierProductManager
 )
 from .utils import (
@@ -129,6 +141,17 @@ class PremierProductInventoryBaseModel(Model, MessagesMixin):
         verbose_name='Colorado inventory'
     )
 
+    INVENTORY_FIELDS = [
+        'inventory_ab',
+        'inventory_po',
+        'inventory_ut',
+        'inventory_ky',
+        'inventory_tx',
+        'inventory_ca',
+        'inventory_wa',
+        'inventory_co'
+    ]
+
     # <editor-fold desc="update properties ...">
     @property
     def inventory_state(self):
@@ -153,17 +176,34 @@ class PremierProductInventoryBaseModel(Model, MessagesMixin):
         self.inventory_wa = None
         self.inventory_co = None
         self.save()
-        
+
+    def set_inventory_fields_from_api_data(self, **update_fields):
+        prev = self.inventory_state
+        for attr in self.INVENTORY_FIELDS:
+            field = self._meta.get_field(attr)
+            setattr(self, attr, field.to_python(update_fields.get(attr)))
+        return prev
+
     def perform_inventory_update_from_api_data(self, **update_fields):
         try:
-            prev = self.inventory_state
-            self.clear_inventory_fields()
-            for attr, value in update_fields.items():
-                if not getattr(self, attr) == value:
-                    setattr(self, attr, value)
-                    self.save()
-            self.refresh_from_db()
+            previous_values = {
+                attr: getattr(self, attr) for attr in self.INVENTORY_FIELDS
+            }
+            prev = self.set_inventory_fields_from_api_data(**update_fields)
             new = self.inventory_state
+            if not new == prev:
+                changes = PremierProductChange.objects.get_changes(
+                    product=self,
+                    previous_values=previous_values
+                )
+                with transaction.atomic():
+                    PremierProductChange.objects.lock_writes()
+                    self.save(update_fields=self.INVENTORY_FIELDS)
+                    PremierProductChange.objects.bulk_create(changes)
+                    PremierProductInventoryHistory.objects.record(
+                        [self],
+                        previous_values={self.pk: previous_values}
+                    )
             msg = self.get_update_success_msg(previous_data=prev, new_data=new)
         except Exception as err:
             msg = self.get_instance_error_msg(f"{update_fields}, {err}")
@@ -256,6 +296,17 @@ class PremierProductPricingBaseModel(Model, MessagesMixin):
         verbose_name='MAP USD'
     )
 
+    PRICING_FIELDS = [
+        'cost_cad',
+        'cost_usd',
+        'jobber_cad',
+        'jobber_usd',
+        'msrp_cad',
+        'msrp_usd',
+        'map_cad',
+        'map_usd'
+    ]
+
     # <editor-fold desc="update properties ...">
     @property
     def pricing_state(self):
@@ -280,17 +331,34 @@ class PremierProductPricingBaseModel(Model, MessagesMixin):
         self.map_cad = None
         self.map_usd = None
         self.save()
-        
+
+    def set_pricing_fields_from_api_data(self, **update_fields):
+        prev = self.pricing_state
+        for attr in self.PRICING_FIELDS:
+            field = self._meta.get_field(attr)
+            value = field.to_python(update_fields.get(attr))
+            if value is not None:
+                places = Decimal(1).scaleb(-field.decimal_places)
+                value = value.quantize(places)
+            setattr(self, attr, value)
+        return prev
+
     def perform_pricing_update_from_api_data(self, **update_fields):
         try:
-            prev = self.pricing_state
-            self.clear_pricing_fields()
-            for attr, value in update_fields.items():
-                if not getattr(self, attr) == value:
-                    setattr(self, attr, value)
-                    self.save()
-            self.refresh_from_db()
+            previous_values = {
+                attr: getattr(self, attr) for attr in self.PRICING_FIELDS
+            }
+            prev = self.set_pricing_fields_from_api_data(**update_fields)
             new = self.pricing_state
+            if not new == prev:
+                changes = PremierProductChange.objects.get_changes(
+                    product=self,
+                    previous_values=previous_values
+                )
+                with transaction.atomic():
+                    PremierProductChange.objects.lock_writes()
+                    self.save(update_fields=self.PRICING_FIELDS)
+                    PremierProductChange.objects.bulk_create(changes)
             msg = self.get_update_success_msg(previous_data=prev, new_data=new)
         except Exception as err:
             msg = self.get_instance_error_msg(f"{update_fields}, {err}")
@@ -470,3 +538,120 @@ class PremierProduct(PremierProductInventoryBaseModel,
 
     def __str__(self):
         return f'{self.vendor_part_number} :: {self.manufacturer.name}'
+
+
+class PremierProductChange(Model, MessagesMixin):
+    product = ForeignKey(
+        PremierProduct,
+        blank=True,
+        null=True,
+        on_delete=SET_NULL,
+        related_name='changes'
+    )
+    part_number = CharField(
+        db_index=True,
+        max_length=30
+    )
+    field = CharField(
+        max_length=20
+    )
+    previous_value = DecimalField(
+        blank=True,
+        decimal_places=2,
+        max_digits=12,
+        null=True
+    )
+    new_value = DecimalField(
+        blank=True,
+        decimal_places=2,
+        max_digits=12,
+        null=True
+    )
+    created = DateTimeField(
+        db_index=True
+    )
+
+    objects = PremierProductChangeManager()
+
+    class Meta:
+        ordering = ['created', 'pk']
+
+    def __str__(self):
+        return (
+            f'{self.part_number} :: {self.field}: '
+            f'{self.previous_value} -> {self.new_value}'
+        )
+
+
+class PremierProductChangeCursor(Model, MessagesMixin):
+    name = CharField(
+        max_length=50,
+        unique=True
+    )
+    last_id = PositiveIntegerField(
+        default=0,
+        help_text='last change processed'
+    )
+    failed = TextField(
+        blank=True,
+        help_text='part numbers of failed products, one per line'
+    )
+
+    objects = PremierProductChangeCursorManager()
+
+    def __str__(self):
+        return f'{self.name} :: {self.last_id}'
+
+
+class PremierProductInventoryHistory(Model, MessagesMixin):
+    product = ForeignKey(
+        PremierProduct,
+        on_delete=CASCADE,
+        related_name='inventory_history'
+    )
+    date = DateField(
+        db_index=True
+    )
+    quantities = BinaryField(
+        help_text='packed warehouse quantities'
+    )
+
+    QUANTITIES_STRUCT = Struct(
+        f'<{len(PremierProduct.INVENTORY_FIELDS)}i'
+    )
+    NULL_QUANTITY = -2 ** 31
+
+    # <editor-fold desc="format properties ...">
+    @classmethod
+    def pack_quantities(cls, quantities):
+        return cls.QUANTITIES_STRUCT.pack(*[
+            cls.NULL_QUANTITY if quantity is None else quantity
+            for quantity in quantities
+        ])
+
+    @classmethod
+    def unpack_quantities(cls, data):
+        return tuple(
+            None if quantity == cls.NULL_QUANTITY else quantity
+            for quantity in cls.QUANTITIES_STRUCT.unpack(bytes(data))
+        )
+
+    @property
+    def inventory_state(self):
+        return dict(
+            zip(
+                PremierProduct.INVENTORY_FIELDS,
+                self.unpack_quantities(self.quantities)
+            )
+        )
+    # </editor-fold>
+
+    objects = PremierProductInventoryHistoryManager()
+
+    class Meta:
+        ordering = ['product', 'date']
+        unique_together = ['product', 'date']
+        verbose_name_plural = 'Premier product inventory history'
+
+    def __str__(self):
+        return f'{self.product_id} :: {self.date}'
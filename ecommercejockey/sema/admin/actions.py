@@ -6,7 +6,10 @@ from core.admin.actions import RelevancyActions
 class SemaBaseActions(RelevancyActions):
     def import_new_class_action(self, request, queryset):
         try:
-            msgs = self.model.objects.perform_import_from_api(new_only=True)
+            msgs = self.model.objects.perform_import_from_api(
+                new_only=True,
+                refresh_cache=True
+            )
             self.display_messages(request, msgs, include_info=False)
         except Exception as err:
             messages.error(request, str(err))
@@ -19,7 +22,10 @@ class SemaBaseActions(RelevancyActions):
 
     def import_class_action(self, request, queryset):
         try:
-            msgs = self.model.objects.perform_import_from_api(new_only=False)
+            msgs = self.model.objects.perform_import_from_api(
+                new_only=False,
+                refresh_cache=True
+            )
             self.display_messages(request, msgs, include_info=False)
         except Exception as err:
             messages.error(request, str(err))
@@ -32,7 +38,9 @@ class SemaBaseActions(RelevancyActions):
 
     def unauthorize_class_action(self, request, queryset):
         try:
-            msgs = self.model.objects.perform_unauthorize_from_api()
+            msgs = self.model.objects.perform_unauthorize_from_api(
+                refresh_cache=True
+            )
             self.display_messages(request, msgs, include_info=False)
         except Exception as err:
             messages.error(request, str(err))
@@ -45,7 +53,7 @@ class SemaBaseActions(RelevancyActions):
 
     def sync_class_action(self, request, queryset):
         try:
-            msgs = self.model.objects.perform_api_sync()
+            msgs = self.model.objects.perform_api_sync(refresh_cache=True)
             self.display_messages(request, msgs, include_info=False)
         except Exception as err:
             messages.error(request, str(err))
@@ -0,0 +1,123 @@
+"""
+This module defines the allocator of PKs of SEMA objects created
+locally.
+
+"""
+
+
+from threading import Lock
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+
+
+class SemaLocalIdAllocator(object):
+    """
+    This class allocates PKs for SEMA objects created locally (objects
+    needed by API data, but not returned by their own endpoint), from a
+    range reserved above SEMA IDs.
+
+    On PostgreSQL, PKs come from a database sequence shared by all SEMA
+    models, so concurrent workers never collide. PKs are fetched in
+    blocks: a bulk create takes all it needs in one round trip, and
+    single creates are served from the rest of the last block. On other
+    databases (development only), PKs follow the highest PK of the
+    model in the range.
+
+    """
+
+    SEQUENCE_NAME = 'sema_local_id_seq'
+    RANGE_START = 900000000
+    RANGE_END = 999999999
+
+    def __init__(self, block_size):
+        """
+        Initializes allocator with block size.
+
+        :param block_size: minimum number of PKs fetched per round trip
+        :type block_size: int
+
+        """
+
+        self.block_size = block_size
+        self._block = []
+        self._lock = Lock()
+
+    @property
+    def uses_sequence(self):
+        """
+        Returns whether or not database has sequences.
+
+        :rtype: bool
+
+        """
+
+        return connection.vendor == 'postgresql'
+
+    def fetch(self, count):
+        """
+        Returns next PKs of sequence, in one round trip.
+
+        :param count: number of PKs
+        :type count: int
+
+        :return: PKs
+        :rtype: list
+
+        :raises Exception: on general exception
+
+        """
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT nextval(%s) FROM generate_series(1, %s)',
+                    [self.SEQUENCE_NAME, count]
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except Exception:
+            raise
+
+    def allocate(self, model, count=1):
+        """
+        Returns unused PKs for locally created objects of model.
+
+        :param model: model of objects
+        :type model: django.db.models.Model
+        :param count: number of PKs
+        :type count: int
+
+        :return: PKs
+        :rtype: list
+
+        :raises Exception: on general exception
+
+        """
+
+        if count < 1:
+            return []
+
+        try:
+            if not self.uses_sequence:
+                last = model._default_manager.filter(
+                    pk__gte=self.RANGE_START
+                ).aggregate(last=Max('pk'))['last']
+                start = (last or self.RANGE_START - 1) + 1
+                return list(range(start, start + count))
+
+            with self._lock:
+                if len(self._block) < count:
+                    self._block += self.fetch(
+                        max(count - len(self._block), self.block_size)
+                    )
+                pks = self._block[:count]
+                del self._block[:count]
+                return pks
+        except Exception:
+            raise
+
+
+local_id_allocator = SemaLocalIdAllocator(
+    block_size=settings.SEMA_LOCAL_ID_BLOCK_SIZE
+)
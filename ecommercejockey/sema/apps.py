@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SemaAppConfig(AppConfig):
     name = 'sema'
     verbose_name = 'SEMA'
+
+    def ready(self):
+        # noinspection PyUnresolvedReferences
+        from .signals import invalidate_vehicle_resolver
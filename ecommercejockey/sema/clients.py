@@ -9,30 +9,348 @@ import json
 from retry import retry
 
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
+from core.caches import ApiResponseCache, SingleFlight
+from core.clients import (
+    AsyncBaseApiClient,
+    BaseApiClient,
+    StreamingJsonBody
+)
 from core.exceptions import (
     ApiInvalidContentToken,
     ApiInvalidToken,
     ApiRateLimitExceeded
 )
+from core.limiters import TokenBucketRateLimiter
+from core.utils import async_retry
+
+
+class SemaApiParamsMixin(object):
+    """
+    This mixin class defines the parameter checks and request parameter
+    builders shared by the SEMA API clients. Parameters are built
+    without token.
+
+    """
+
+    @staticmethod
+    def check_brand_ids(brand_ids, dataset_ids, required=False):
+        """
+        Checks brand IDs and dataset IDs filters.
+
+        :param brand_ids: brand IDs to on which to filter
+        :type brand_ids: list
+        :param dataset_ids: dataset IDs to on which to filter
+        :type dataset_ids: list
+        :param required: whether or not one of them is required
+        :type required: bool
+
+        :raises Exception: parameter misuse
+
+        """
+
+        if required and not (brand_ids or dataset_ids):
+            raise Exception("Brand IDs or dataset IDs required")
+
+        if brand_ids and dataset_ids:
+            raise Exception("Only one of brand IDs or dataset IDs allowed")
+
+    @staticmethod
+    def check_vehicle_filters(base_vehicle_ids, vehicle_ids, year,
+                              make_name, model_name, submodel_name):
+        """
+        Checks vehicle filters.
+
+        :param base_vehicle_ids: base vehicle IDs to on which to filter
+        :type base_vehicle_ids: list
+        :param vehicle_ids: vehicle IDs to on which to filter
+        :type vehicle_ids: list
+        :param year: year on which to filter
+        :type year: int
+        :param make_name: make name on which to filter
+        :type make_name: str
+        :param model_name: model name on which to filter
+        :type model_name: str
+        :param submodel_name: submodel name on which to filter
+        :type submodel_name: str
+
+        :raises Exception: parameter misuse
+
+        """
+
+        if base_vehicle_ids and vehicle_ids:
+            raise Exception(
+                "Only one of base vehicle IDs or vehicle IDs allowed"
+            )
+
+        if ((year or make_name or model_name or submodel_name)
+                and (not (year and make_name and model_name))):
+            raise Exception(
+                "Year, make name, model name, and submodel name "
+                "must be used in a year/make/model group"
+            )
+
+        if ((base_vehicle_ids or vehicle_ids)
+                and (year or make_name or model_name or submodel_name)):
+            raise Exception(
+                "Only one of base vehicle IDs, vehicle IDs, "
+                "or named year/make/model group allowed"
+            )
+
+    def get_lookup_params(self, brand_ids=None, dataset_ids=None,
+                          required=False, **filters):
+        """
+        Returns lookup request parameters.
+
+        :param brand_ids: brand IDs to on which to filter
+        :type brand_ids: list
+        :param dataset_ids: dataset IDs to on which to filter
+        :type dataset_ids: list
+        :param required: whether or not brand IDs or dataset IDs are
+            required
+        :type required: bool
+        :param filters: other request parameters
+
+        :return: request parameters
+        :rtype: dict
+
+        :raises Exception: parameter misuse
+
+        """
+
+        self.check_brand_ids(brand_ids, dataset_ids, required=required)
+        return {
+            'aaia_brandids': brand_ids,
+            'branddatasetids': dataset_ids,
+            **filters
+        }
+
+    @staticmethod
+    def get_vehicle_info_params(base_vehicle_id=None, vehicle_id=None):
+        """
+        Returns vehicle info request parameters.
+
+        :param base_vehicle_id: base vehicle ID to on which to filter
+        :type base_vehicle_id: int
+        :param vehicle_id: vehicle ID to on which to filter
+        :type vehicle_id: int
+
+        :return: request parameters
+        :rtype: dict
+
+        :raises Exception: parameter misuse
+
+        """
+
+        if not (base_vehicle_id or vehicle_id):
+            raise Exception("Base vehicle ID or vehicle ID required")
+
+        if base_vehicle_id and vehicle_id:
+            raise Exception(
+                "Only one of base vehicle ID or vehicle ID allowed"
+            )
+
+        return {
+            'baseVehicleID': base_vehicle_id,
+            'vehicleID': vehicle_id
+        }
+
+    def get_filter_data(self, brand_ids=None, dataset_ids=None,
+                        base_vehicle_ids=None, vehicle_ids=None,
+                        year=None, make_name=None,
+                        model_name=None, submodel_name=None):
+        """
+        Returns brand and vehicle filter request data.
+
+        See :meth:`SemaApiClient.retrieve_categories` for parameters.
+
+        :return: request data
+        :rtype: dict
+
+        :raises Exception: parameter misuse
+
+        """
+
+        self.check_brand_ids(brand_ids, dataset_ids, required=True)
+        self.check_vehicle_filters(
+            base_vehicle_ids=base_vehicle_ids,
+            vehicle_ids=vehicle_ids,
+            year=year,
+            make_name=make_name,
+            model_name=model_name,
+            submodel_name=submodel_name
+        )
+        return {
+            'aaia_brandids': brand_ids,
+            'branddatasetids': dataset_ids,
+            'baseVehicleIds': base_vehicle_ids,
+            'vehicleIds': vehicle_ids,
+            'Year': year,
+            'MakeName': make_name,
+            'ModelName': model_name,
+            'SubmodelName': submodel_name
+        }
+
+    def get_products_data(self, part_numbers=None, pies_segments=None,
+                          **filters):
+        """
+        Returns products request data.
+
+        See :meth:`SemaApiClient.retrieve_products_by_brand` for
+        parameters.
+
+        :return: request data
+        :rtype: dict
+
+        :raises Exception: parameter misuse
+
+        """
+
+        return {
+            **self.get_filter_data(**filters),
+            'partNumbers': part_numbers,
+            'piesSegments': pies_segments
+        }
+
+    @staticmethod
+    def get_vehicles_by_product_data(brand_id=None, dataset_id=None,
+                                     part_numbers=None, group_by_part=True):
+        """
+        Returns vehicles by product request data.
+
+        See :meth:`SemaApiClient.retrieve_vehicles_by_product` for
+        parameters.
+
+        :return: request data
+        :rtype: dict
+
+        :raises Exception: parameter misuse
+
+        """
+
+        if not (brand_id or dataset_id):
+            raise Exception("Brand ID or dataset ID required")
+
+        if brand_id and dataset_id:
+            raise Exception("Only one of brand ID or dataset ID allowed")
+
+        return {
+            'aaia_brandid': brand_id,
+            'branddatasetid': dataset_id,
+            'partNumbers': part_numbers,
+            'groupByPart': (
+                str(group_by_part).lower()
+                if group_by_part else None
+            )
+        }
 
 
-class SemaApiClient(object):
+class SemaApiClient(BaseApiClient, SemaApiParamsMixin):
     """
     This class defines the client used to perform calls to the SEMA API.
 
     """
 
-    def __init__(self):
+    rate_limit_status_code = requests.codes.conflict
+
+    def __init__(self, base_url=None):
+        """
+        Initializes class by setting base url, rate limiter, response
+        cache, and in-flight request group. Token and content token are
+        retrieved lazily on first use.
+
+        :param base_url: API base URL (defaults to setting)
+        :type base_url: str
+
+        """
+
+        self.base_url = base_url or settings.SEMA_BASE_URL
+        self.rate_limiter = TokenBucketRateLimiter(
+            name='sema',
+            rate=settings.SEMA_RATE_LIMIT,
+            min_rate=settings.SEMA_RATE_LIMIT_MIN,
+            max_rate=settings.SEMA_RATE_LIMIT_MAX
+        )
+        self.response_cache = ApiResponseCache(
+            root=settings.SEMA_CACHE_ROOT,
+            ttls=settings.SEMA_CACHE_TTLS,
+            max_size=settings.SEMA_CACHE_MAX_SIZE
+        )
+        self.single_flight = SingleFlight()
+
+    @property
+    def token(self):
+        """
+        Returns cached token, retrieving it if not cached or expired.
+
+        :return: token
+        :rtype: str
+
+        """
+
+        return self.token_store.get_or_retrieve(
+            'sema_token',
+            self.retrieve_token,
+            timeout=settings.SEMA_TOKEN_TIMEOUT
+        )
+
+    @property
+    def content_token(self):
+        """
+        Returns cached content token, retrieving it if not cached or
+        expired.
+
+        :return: content token
+        :rtype: str
+
+        """
+
+        return self.token_store.get_or_retrieve(
+            'sema_content_token',
+            self.retrieve_content_token,
+            timeout=settings.SEMA_TOKEN_TIMEOUT
+        )
+
+    def refresh_token(self, rejected_token=None):
+        """
+        Retrieves and caches new token, unless rejected token has
+        already been replaced.
+
+        :param rejected_token: token rejected by API
+        :type rejected_token: str
+
+        :return: token
+        :rtype: str
+
         """
-        Initializes class by setting base url and retrieving token and
-        content token.
+
+        return self.token_store.refresh(
+            'sema_token',
+            self.retrieve_token,
+            timeout=settings.SEMA_TOKEN_TIMEOUT,
+            rejected_token=rejected_token
+        )
+
+    def refresh_content_token(self, rejected_token=None):
+        """
+        Retrieves and caches new content token, unless rejected content
+        token has already been replaced.
+
+        :param rejected_token: content token rejected by API
+        :type rejected_token: str
+
+        :return: content token
+        :rtype: str
 
         """
 
-        self.base_url = settings.SEMA_BASE_URL
-        self.token = self.retrieve_token()
-        self.content_token = self.retrieve_content_token()
+        return self.token_store.refresh(
+            'sema_content_token',
+            self.retrieve_content_token,
+            timeout=settings.SEMA_TOKEN_TIMEOUT,
+            rejected_token=rejected_token
+        )
 
     def get_json_body(self, response):
         """
@@ -59,16 +377,93 @@ class SemaApiClient(object):
                 raise ApiRateLimitExceeded
             response.raise_for_status()
             body = json.loads(response.text)
-            if body.get('success'):
-                if body.get('message') == 'Invalid token':
-                    self.token = self.retrieve_token()
-                    raise ApiInvalidToken
-            else:
-                raise Exception(body.get('message', 'Bad request'))
+            self.check_json_body(body, response)
             return body
         except Exception:
             raise
 
+    def check_json_body(self, body, response):
+        """
+        Checks json response body.
+
+        :param body: response body as dictionary
+        :type body: dict
+        :param response: requests Response object
+        :type response: object
+
+        :raises ApiInvalidToken: response body 'message' is "Invalid
+        token" (after refreshing token)
+        :raises Exception: response body 'success' not True
+
+        """
+
+        if body.get('success'):
+            if body.get('message') == 'Invalid token':
+                self.refresh_token(
+                    rejected_token=self.get_request_token(response, 'token')
+                )
+                raise ApiInvalidToken
+        else:
+            raise Exception(body.get('message', 'Bad request'))
+
+    def get_json_stream(self, response, key):
+        """
+        Checks streamed response and returns iterator of items of json
+        response body array `key`, decoded one at a time as they are
+        consumed.
+
+        The body is checked as soon as its 'success' value is decoded:
+        before the iterator is returned if it precedes the array (so
+        retries apply), otherwise once the array is exhausted.
+
+        :param response: requests Response object (sent with stream)
+        :type response: object
+        :param key: key of response body array
+        :type key: str
+
+        :return: array items
+        :rtype: generator
+
+        :raises ApiRateLimitExceeded: response status code is 409
+        :raises HTTPError: response status code not in 200s
+        :raises ApiInvalidToken: response body 'message' is "Invalid
+        token" (after refreshing token)
+        :raises Exception: response body 'success' not True or on
+        general exception
+
+        """
+
+        try:
+            if response.status_code == requests.codes.conflict:
+                print("Waiting on SEMA API (rate exceeded)")
+                response.close()
+                raise ApiRateLimitExceeded
+            response.raise_for_status()
+            body = StreamingJsonBody(
+                chunks=response.iter_content(
+                    chunk_size=settings.API_STREAM_CHUNK_SIZE
+                ),
+                key=key
+            )
+            if 'success' in body.head or not body.is_streaming:
+                self.check_json_body(body.head, response)
+                checked = True
+            else:
+                checked = False
+        except Exception:
+            response.close()
+            raise
+
+        def stream():
+            try:
+                yield from body
+                if not checked:
+                    self.check_json_body(body.body, response)
+            finally:
+                response.close()
+
+        return stream()
+
     def get_html_body(self, response):
         """
         Checks response, then strips and returns HTML response body.
@@ -93,49 +488,127 @@ class SemaApiClient(object):
             response.raise_for_status()
             body = str(response.text).strip()
             if 'Invalid token' in body:
-                self.content_token = self.retrieve_content_token()
+                self.refresh_content_token(
+                    rejected_token=self.get_request_token(
+                        response,
+                        'contenttoken'
+                    )
+                )
                 raise ApiInvalidContentToken
             return body
         except Exception:
             raise
 
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
-    def retrieve_token(self):
+    def get_cached_json_body(self, endpoint, method, url, **kwargs):
         """
-        Retrieves token data from SEMA API.
-
-        :return: token
-        :rtype: str
-
-        :raises Exception: on general exception
-
-        .. Topic:: **-Retries-**
-
-            Retries on `ApiRateLimitExceeded` exception
+        Returns json response body from response cache. If not cached,
+        expired, or cache is refreshing, sends request, checks response,
+        and caches body. Token is not part of cache key.
+
+        Identical requests are coalesced: if the same request is
+        already in flight in another thread, its body (or error) is
+        shared instead of sending another request.
+
+        :param endpoint: cache endpoint name
+        :type endpoint: str
+        :param method: HTTP method
+        :type method: str
+        :param url: request URL
+        :type url: str
+        :param kwargs: `requests` request kwargs (params or json)
 
-            (up to 13 times in 5 second delays)
+        :return: response body as dictionary
+        :rtype: dict
 
         """
 
-        url = f'{self.base_url}/token/get'
         params = {
-            'userName': settings.SEMA_USERNAME,
-            'password': settings.SEMA_PASSWORD
+            key: value
+            for key, value in (
+                kwargs.get('params') or kwargs.get('json') or {}
+            ).items()
+            if not key == 'token'
         }
 
+        def retrieve():
+            response = self.request(method, url, **kwargs)
+            body = self.get_json_body(response)
+            self.response_cache.set(endpoint, params, body)
+            return body
+
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['token']
-        except Exception as err:
+            body = self.response_cache.get(endpoint, params)
+            if body is None:
+                body = self.single_flight.do(
+                    endpoint=endpoint,
+                    key=self.response_cache.get_key(endpoint, params),
+                    func=retrieve
+                )
+            return body
+        except Exception:
             raise
 
-    @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
-    def retrieve_content_token(self):
+    @property
+    def cache_stats(self):
         """
-        Retrieves content token data from SEMA API.
+        Returns response cache per-endpoint hit, miss, and store counts.
 
-        :return: content token
+        :return: counts by endpoint
+        :rtype: dict
+
+        """
+
+        return self.response_cache.stats
+
+    @property
+    def coalesce_stats(self):
+        """
+        Returns per-endpoint request and coalesced request counts.
+
+        :return: counts by endpoint
+        :rtype: dict
+
+        """
+
+        return self.single_flight.stats
+
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
+    def retrieve_token(self):
+        """
+        Retrieves token data from SEMA API.
+
+        :return: token
+        :rtype: str
+
+        :raises Exception: on general exception
+
+        .. Topic:: **-Retries-**
+
+            Retries on `ApiRateLimitExceeded` exception
+
+            (up to 13 times, paced by rate limiter)
+
+        """
+
+        url = f'{self.base_url}/token/get'
+        params = {
+            'userName': settings.SEMA_USERNAME,
+            'password': settings.SEMA_PASSWORD
+        }
+
+        try:
+            response = self.get(url=url, params=params)
+            return self.get_json_body(response)['token']
+        except Exception as err:
+            raise
+
+    @retry(exceptions=ApiInvalidToken, tries=2)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
+    def retrieve_content_token(self):
+        """
+        Retrieves content token data from SEMA API.
+
+        :return: content token
         :rtype: str
 
         :raises Exception: on general exception
@@ -146,7 +619,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         """
 
@@ -154,13 +627,13 @@ class SemaApiClient(object):
         params = {'token': self.token}
 
         try:
-            response = requests.get(url=url, params=params)
+            response = self.get(url=url, params=params)
             return self.get_json_body(response)['contenttoken']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_brand_datasets(self):
         """
         Retrieves brand datasets data from SEMA API.
@@ -176,7 +649,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         **-Return Format-**
         ::
@@ -198,13 +671,13 @@ class SemaApiClient(object):
         }
 
         try:
-            response = requests.get(url=url, params=params)
+            response = self.get(url=url, params=params)
             return self.get_json_body(response)['BrandDatasets']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_years(self, brand_ids=None, dataset_ids=None):
         """
         Retrieves years data from SEMA API.
@@ -229,7 +702,11 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
+
+        .. Topic:: **-Caching-**
+
+            Response is cached for `SEMA_CACHE_TTLS['years']` seconds
 
         **-Return Format-**
         ::
@@ -240,24 +717,20 @@ class SemaApiClient(object):
 
         """
 
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
+        params = self.get_lookup_params(brand_ids, dataset_ids)
         url = f'{self.base_url}/lookup/years'
-        params = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids
-        }
+        params = {'token': self.token, **params}
 
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['Years']
+            body = self.get_cached_json_body(
+                'years', 'GET', url=url, params=params
+            )
+            return body['Years']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_makes(self, brand_ids=None, dataset_ids=None, year=None):
         """
         Retrieves makes data from SEMA API.
@@ -284,7 +757,11 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
+
+        .. Topic:: **-Caching-**
+
+            Response is cached for `SEMA_CACHE_TTLS['makes']` seconds
 
         **-Return Format-**
         ::
@@ -298,25 +775,20 @@ class SemaApiClient(object):
 
         """
 
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
+        params = self.get_lookup_params(brand_ids, dataset_ids, year=year)
         url = f'{self.base_url}/lookup/makes'
-        params = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids,
-            'year': year
-        }
+        params = {'token': self.token, **params}
 
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['Makes']
+            body = self.get_cached_json_body(
+                'makes', 'GET', url=url, params=params
+            )
+            return body['Makes']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_models(self, brand_ids=None, dataset_ids=None,
                         year=None, make_id=None):
         """
@@ -346,7 +818,11 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
+
+        .. Topic:: **-Caching-**
+
+            Response is cached for `SEMA_CACHE_TTLS['models']` seconds
 
         **-Return Format-**
         ::
@@ -361,26 +837,25 @@ class SemaApiClient(object):
 
         """
 
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
+        params = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            year=year,
+            makeid=make_id
+        )
         url = f'{self.base_url}/lookup/models'
-        params = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids,
-            'year': year,
-            'makeid': make_id
-        }
+        params = {'token': self.token, **params}
 
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['Models']
+            body = self.get_cached_json_body(
+                'models', 'GET', url=url, params=params
+            )
+            return body['Models']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_submodels(self, brand_ids=None, dataset_ids=None,
                            year=None, make_id=None, model_id=None):
         """
@@ -412,7 +887,11 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
+
+        .. Topic:: **-Caching-**
+
+            Response is cached for `SEMA_CACHE_TTLS['submodels']` seconds
 
         **-Return Format-**
         ::
@@ -427,27 +906,26 @@ class SemaApiClient(object):
 
         """
 
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
+        params = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            year=year,
+            makeid=make_id,
+            modelid=model_id
+        )
         url = f'{self.base_url}/lookup/submodels'
-        params = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids,
-            'year': year,
-            'makeid': make_id,
-            'modelid': model_id
-        }
+        params = {'token': self.token, **params}
 
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['Submodels']
+            body = self.get_cached_json_body(
+                'submodels', 'GET', url=url, params=params
+            )
+            return body['Submodels']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_engines(self, brand_ids=None, dataset_ids=None,
                          year=None, make_id=None, model_id=None):
         """
@@ -479,7 +957,11 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
+
+        .. Topic:: **-Caching-**
+
+            Response is cached for `SEMA_CACHE_TTLS['engines']` seconds
 
         **-Return Format-**
         ::
@@ -510,27 +992,26 @@ class SemaApiClient(object):
 
         """
 
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
+        params = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            year=year,
+            makeid=make_id,
+            modelid=model_id
+        )
         url = f'{self.base_url}/lookup/engines'
-        params = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids,
-            'year': year,
-            'makeid': make_id,
-            'modelid': model_id
-        }
+        params = {'token': self.token, **params}
 
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['Engines']
+            body = self.get_cached_json_body(
+                'engines', 'GET', url=url, params=params
+            )
+            return body['Engines']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_vehicle_info(self, base_vehicle_id=None, vehicle_id=None):
         """
         Retrieves vehicle info data from SEMA API.
@@ -557,7 +1038,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         **-Return Format-**
         ::
@@ -619,29 +1100,20 @@ class SemaApiClient(object):
 
         """
 
-        if not (base_vehicle_id or vehicle_id):
-            raise Exception("Base vehicle ID or vehicle ID required")
-
-        if base_vehicle_id and vehicle_id:
-            raise Exception(
-                "Only one of base vehicle ID or vehicle ID allowed"
-            )
-
+        params = self.get_vehicle_info_params(base_vehicle_id, vehicle_id)
         url = f'{self.base_url}/lookup/expandedvehicleinfo'
-        params = {
-            'token': self.token,
-            'baseVehicleID': base_vehicle_id,
-            'vehicleID': vehicle_id
-        }
+        params = {'token': self.token, **params}
 
         try:
-            response = requests.get(url=url, params=params)
-            return self.get_json_body(response)['Vehicles']
+            body = self.get_cached_json_body(
+                'vehicle_info', 'GET', url=url, params=params
+            )
+            return body['Vehicles']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_categories(self, brand_ids=None, dataset_ids=None,
                             base_vehicle_ids=None, vehicle_ids=None,
                             year=None, make_name=None,
@@ -694,7 +1166,11 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
+
+        .. Topic:: **-Caching-**
+
+            Response is cached for `SEMA_CACHE_TTLS['categories']` seconds
 
         **-Return Format-**
         ::
@@ -726,58 +1202,36 @@ class SemaApiClient(object):
 
         """
 
-        if not (brand_ids or dataset_ids):
-            raise Exception("Brand IDs or dataset IDs required")
-
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
-        if base_vehicle_ids and vehicle_ids:
-            raise Exception(
-                "Only one of base vehicle IDs or vehicle IDs allowed"
-            )
-
-        if ((year or make_name or model_name or submodel_name)
-                and (not (year and make_name and model_name))):
-            raise Exception(
-                "Year, make name, model name, and submodel name "
-                "must be used in a year/make/model group"
-            )
-
-        if ((base_vehicle_ids or vehicle_ids)
-                and (year or make_name or model_name or submodel_name)):
-            raise Exception(
-                "Only one of base vehicle IDs, vehicle IDs, "
-                "or named year/make/model group allowed"
-            )
-
+        data = self.get_filter_data(
+            brand_ids=brand_ids,
+            dataset_ids=dataset_ids,
+            base_vehicle_ids=base_vehicle_ids,
+            vehicle_ids=vehicle_ids,
+            year=year,
+            make_name=make_name,
+            model_name=model_name,
+            submodel_name=submodel_name
+        )
         url = f'{self.base_url}/lookup/categories'
-        data = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids,
-            'baseVehicleIds': base_vehicle_ids,
-            'vehicleIds': vehicle_ids,
-            'Year': year,
-            'MakeName': make_name,
-            'ModelName': model_name,
-            'SubmodelName': submodel_name
-        }
+        data = {'token': self.token, **data}
 
         try:
-            response = requests.post(url=url, json=data)
-            return self.get_json_body(response)['Categories']
+            body = self.get_cached_json_body(
+                'categories', 'POST', url=url, json=data
+            )
+            return body['Categories']
         except Exception:
             raise
 
     # X Products PIES update
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_products_by_brand(self, brand_ids=None, dataset_ids=None,
                                    base_vehicle_ids=None, vehicle_ids=None,
                                    year=None, make_name=None,
                                    model_name=None, submodel_name=None,
-                                   part_numbers=None, pies_segments=None):
+                                   part_numbers=None, pies_segments=None,
+                                   stream=False):
         """
         Retrieves products by brand data from SEMA API.
 
@@ -801,9 +1255,13 @@ class SemaApiClient(object):
         :type part_numbers: list
         :param pies_segments: pies segments to include or ['all']
         :type pies_segments: list
+        :param stream: whether or not to return products as an
+            iterator that decodes them from the response stream one at
+            a time
+        :type stream: bool
 
         :return: products data
-        :rtype: list
+        :rtype: list (or generator if streamed)
 
         :raises Exception: parameter misuse and on general exception
 
@@ -830,7 +1288,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         **-Return Format-**
         ::
@@ -852,61 +1310,40 @@ class SemaApiClient(object):
 
         """
 
-        if not (brand_ids or dataset_ids):
-            raise Exception("Brand IDs or dataset IDs required")
-
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
-        if base_vehicle_ids and vehicle_ids:
-            raise Exception(
-                "Only one of base vehicle IDs or vehicle IDs allowed"
-            )
-
-        if ((year or make_name or model_name or submodel_name)
-                and (not (year and make_name and model_name))):
-            raise Exception(
-                "Year, make name, model name, and submodel name "
-                "must be used in a year/make/model group"
-            )
-
-        if ((base_vehicle_ids or vehicle_ids)
-                and (year or make_name or model_name or submodel_name)):
-            raise Exception(
-                "Only one of base vehicle IDs, vehicle IDs, "
-                "or named year/make/model group allowed"
-            )
-
+        data = self.get_products_data(
+            brand_ids=brand_ids,
+            dataset_ids=dataset_ids,
+            base_vehicle_ids=base_vehicle_ids,
+            vehicle_ids=vehicle_ids,
+            year=year,
+            make_name=make_name,
+            model_name=model_name,
+            submodel_name=submodel_name,
+            part_numbers=part_numbers,
+            pies_segments=pies_segments
+        )
         url = f'{self.base_url}/lookup/products'
-        data = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids,
-            'baseVehicleIds': base_vehicle_ids,
-            'vehicleIds': vehicle_ids,
-            'Year': year,
-            'MakeName': make_name,
-            'ModelName': model_name,
-            'SubmodelName': submodel_name,
-            'partNumbers': part_numbers,
-            'piesSegments': pies_segments
-        }
+        data = {'token': self.token, **data}
 
         try:
-            response = requests.post(url=url, json=data)
+            if stream:
+                response = self.post(url=url, json=data, stream=True)
+                return self.get_json_stream(response, key='Products')
+            response = self.post(url=url, json=data)
             return self.get_json_body(response)['Products']
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_products_by_category(self, category_id,
                                       include_child_categories=True,
                                       brand_ids=None, dataset_ids=None,
                                       base_vehicle_ids=None, vehicle_ids=None,
                                       year=None, make_name=None,
                                       model_name=None, submodel_name=None,
-                                      part_numbers=None, pies_segments=None):
+                                      part_numbers=None, pies_segments=None,
+                                      stream=False):
         """
         Retrieves products by category data from SEMA API.
 
@@ -935,9 +1372,13 @@ class SemaApiClient(object):
         :type part_numbers: list
         :param pies_segments: pies segments to include or ['all']
         :type pies_segments: list
+        :param stream: whether or not to return products as an
+            iterator that decodes them from the response stream one at
+            a time
+        :type stream: bool
 
         :return: products data
-        :rtype: list
+        :rtype: list (or generator if streamed)
 
         :raises Exception: parameter misuse and on general exception
 
@@ -964,7 +1405,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         **-Return Format-**
         ::
@@ -986,60 +1427,42 @@ class SemaApiClient(object):
 
         """
 
-        if not (brand_ids or dataset_ids):
-            raise Exception("Brand IDs or dataset IDs required")
-
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
-        if base_vehicle_ids and vehicle_ids:
-            raise Exception(
-                "Only one of base vehicle IDs or vehicle IDs allowed"
-            )
-
-        if ((year or make_name or model_name or submodel_name)
-                and (not (year and make_name and model_name))):
-            raise Exception(
-                "Year, make name, model name, and submodel name "
-                "must be used in a year/make/model group"
-            )
-
-        if ((base_vehicle_ids or vehicle_ids)
-                and (year or make_name or model_name or submodel_name)):
-            raise Exception(
-                "Only one of base vehicle IDs, vehicle IDs, "
-                "or named year/make/model group allowed"
-            )
-
-        url = f'{self.base_url}/lookup/productsbycategory'
         data = {
-            'token': self.token,
             'CategoryId': category_id,
             'includeChildCategoryParts': (
                 str(include_child_categories).lower()
                 if include_child_categories else None
             ),
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids,
-            'baseVehicleIds': base_vehicle_ids,
-            'vehicleIds': vehicle_ids,
-            'Year': year,
-            'MakeName': make_name,
-            'ModelName': model_name,
-            'SubmodelName': submodel_name,
-            'partNumbers': part_numbers,
-            'piesSegments': pies_segments
+            **self.get_products_data(
+                brand_ids=brand_ids,
+                dataset_ids=dataset_ids,
+                base_vehicle_ids=base_vehicle_ids,
+                vehicle_ids=vehicle_ids,
+                year=year,
+                make_name=make_name,
+                model_name=model_name,
+                submodel_name=submodel_name,
+                part_numbers=part_numbers,
+                pies_segments=pies_segments
+            )
         }
+        url = f'{self.base_url}/lookup/productsbycategory'
+        data = {'token': self.token, **data}
 
         try:
-            response = requests.post(url=url, json=data)
-            return self.get_json_body(response)['Products']
+            if stream:
+                response = self.post(url=url, json=data, stream=True)
+                return self.get_json_stream(response, key='Products')
+            body = self.get_cached_json_body(
+                'products_by_category', 'POST', url=url, json=data
+            )
+            return body['Products']
         except Exception:
             raise
 
     # X Product HTML update
     @retry(exceptions=ApiInvalidContentToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_product_html(self, product_id, include_header_footer=False):
         """
         Retrieves product HTML data from SEMA API.
@@ -1061,7 +1484,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         """
 
@@ -1073,13 +1496,13 @@ class SemaApiClient(object):
         }
 
         try:
-            response = requests.get(url=url, params=params)
+            response = self.get(url=url, params=params)
             return self.get_html_body(response)
         except Exception:
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_vehicles_by_product(self, brand_id=None, dataset_id=None,
                                      part_numbers=None, group_by_part=True):
         """
@@ -1111,7 +1534,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         **-Return Format-**
         ::
@@ -1144,26 +1567,17 @@ class SemaApiClient(object):
 
         """
 
-        if not (brand_id or dataset_id):
-            raise Exception("Brand ID or dataset ID required")
-
-        if brand_id and dataset_id:
-            raise Exception("Only one of brand ID or dataset ID allowed")
-
+        data = self.get_vehicles_by_product_data(
+            brand_id=brand_id,
+            dataset_id=dataset_id,
+            part_numbers=part_numbers,
+            group_by_part=group_by_part
+        )
         url = f'{self.base_url}/lookup/vehiclesbyproduct'
-        data = {
-            'token': self.token,
-            'aaia_brandid': brand_id,
-            'branddatasetid': dataset_id,
-            'partNumbers': part_numbers,
-            'groupByPart': (
-                str(group_by_part).lower()
-                if group_by_part else None
-            )
-        }
+        data = {'token': self.token, **data}
 
         try:
-            response = requests.post(url=url, json=data)
+            response = self.post(url=url, json=data)
             if group_by_part:
                 return self.get_json_body(response)['Parts']
             else:
@@ -1172,7 +1586,7 @@ class SemaApiClient(object):
             raise
 
     @retry(exceptions=ApiInvalidToken, tries=2)
-    @retry(exceptions=ApiRateLimitExceeded, tries=13, delay=5)
+    @retry(exceptions=ApiRateLimitExceeded, tries=13)
     def retrieve_vehicles_by_brand(self, brand_ids=None, dataset_ids=None):
         """
         Retrieves vehicles by brand data from SEMA API.
@@ -1199,7 +1613,7 @@ class SemaApiClient(object):
             (up to 2 times in 1 second delays)
 
             Retries on `ApiRateLimitExceeded` exception
-            (up to 13 times in 5 second delays)
+            (up to 13 times, paced by rate limiter)
 
         **-Return Format-**
         ::
@@ -1217,24 +1631,634 @@ class SemaApiClient(object):
 
         """
 
-        if not (brand_ids or dataset_ids):
-            raise Exception("Brand IDs or dataset IDs required")
-
-        if brand_ids and dataset_ids:
-            raise Exception("Only one of brand IDs or dataset IDs allowed")
-
+        data = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            required=True
+        )
         url = f'{self.base_url}/lookup/vehiclesbybrand'
-        data = {
-            'token': self.token,
-            'aaia_brandids': brand_ids,
-            'branddatasetids': dataset_ids
-        }
+        data = {'token': self.token, **data}
 
         try:
-            response = requests.post(url=url, json=data)
-            return self.get_json_body(response)['BrandVehicles']
+            body = self.get_cached_json_body(
+                'vehicles_by_brand', 'POST', url=url, json=data
+            )
+            return body['BrandVehicles']
         except Exception:
             raise
 
 
-sema_client = SemaApiClient()
+sema_client = SimpleLazyObject(SemaApiClient)
+
+
+class AsyncSemaApiClient(AsyncBaseApiClient, SemaApiParamsMixin):
+    """
+    This class defines the asyncio client used to perform calls to the
+    SEMA API. Every retrieve method of `SemaApiClient` is mirrored as a
+    coroutine with the same parameters, checks, retries, and return
+    format, so many requests can be kept in flight on one event loop.
+
+    Tokens are shared with `SemaApiClient` through the token store, and
+    requests are paced by the same rate limiter state.
+
+    """
+
+    rate_limit_status_code = requests.codes.conflict
+
+    def __init__(self, base_url=None, max_connections=None, timeout=None,
+                 token_client=None):
+        """
+        Initializes class by setting base url, token client, rate
+        limiter, and response cache (shared with token client).
+
+        :param base_url: API base URL (defaults to setting)
+        :type base_url: str
+        :param max_connections: maximum number of simultaneous
+            connections
+        :type max_connections: int
+        :param timeout: default (connect, read) timeout in seconds
+        :type timeout: tuple
+        :param token_client: synchronous client whose tokens, rate
+            limiter, and response cache are used (defaults to a new
+            client of base URL)
+        :type token_client: SemaApiClient
+
+        """
+
+        super().__init__(max_connections=max_connections, timeout=timeout)
+        self.base_url = base_url or settings.SEMA_BASE_URL
+        self.token_client = token_client or SemaApiClient(
+            base_url=self.base_url
+        )
+        self.rate_limiter = self.token_client.rate_limiter
+        self.response_cache = self.token_client.response_cache
+
+    async def get_token(self):
+        """
+        Returns cached token (read in executor), retrieving it if not
+        cached or expired.
+
+        :return: token
+        :rtype: str
+
+        """
+
+        return await self.run_sync(lambda: self.token_client.token)
+
+    async def get_content_token(self):
+        """
+        Returns cached content token (read in executor), retrieving it
+        if not cached or expired.
+
+        :return: content token
+        :rtype: str
+
+        """
+
+        return await self.run_sync(lambda: self.token_client.content_token)
+
+    async def refresh_token(self, rejected_token=None):
+        """
+        Retrieves (in executor) and caches new token, unless rejected
+        token has already been replaced.
+
+        :param rejected_token: token rejected by API
+        :type rejected_token: str
+
+        :return: token
+        :rtype: str
+
+        """
+
+        return await self.run_sync(
+            self.token_client.refresh_token,
+            rejected_token
+        )
+
+    async def refresh_content_token(self, rejected_token=None):
+        """
+        Retrieves (in executor) and caches new content token, unless
+        rejected content token has already been replaced.
+
+        :param rejected_token: content token rejected by API
+        :type rejected_token: str
+
+        :return: content token
+        :rtype: str
+
+        """
+
+        return await self.run_sync(
+            self.token_client.refresh_content_token,
+            rejected_token
+        )
+
+    async def get_json_body(self, response):
+        """
+        Checks response and returns json response body as dictionary.
+
+        See :meth:`SemaApiClient.get_json_body` for checks.
+
+        :param response: response
+        :type response: AsyncApiResponse
+
+        :return: response body as dictionary
+        :rtype: dict
+
+        """
+
+        try:
+            if response.status_code == requests.codes.conflict:
+                print("Waiting on SEMA API (rate exceeded)")
+                raise ApiRateLimitExceeded
+            response.raise_for_status()
+            body = json.loads(response.text)
+            if body.get('success'):
+                if body.get('message') == 'Invalid token':
+                    await self.refresh_token(
+                        rejected_token=self.get_request_token(
+                            response,
+                            'token'
+                        )
+                    )
+                    raise ApiInvalidToken
+            else:
+                raise Exception(body.get('message', 'Bad request'))
+            return body
+        except Exception:
+            raise
+
+    async def get_html_body(self, response):
+        """
+        Checks response, then strips and returns HTML response body.
+
+        See :meth:`SemaApiClient.get_html_body` for checks.
+
+        :param response: response
+        :type response: AsyncApiResponse
+
+        :return: response body as text
+        :rtype: str
+
+        """
+
+        try:
+            if response.status_code == requests.codes.conflict:
+                raise ApiRateLimitExceeded
+            response.raise_for_status()
+            body = str(response.text).strip()
+            if 'Invalid token' in body:
+                await self.refresh_content_token(
+                    rejected_token=self.get_request_token(
+                        response,
+                        'contenttoken'
+                    )
+                )
+                raise ApiInvalidContentToken
+            return body
+        except Exception:
+            raise
+
+    async def get_cached_json_body(self, endpoint, method, url, **kwargs):
+        """
+        Returns json response body from response cache. If not cached,
+        expired, or cache is refreshing, sends request, checks response,
+        and caches body. Token is not part of cache key.
+
+        :param endpoint: cache endpoint name
+        :type endpoint: str
+        :param method: HTTP method
+        :type method: str
+        :param url: request URL
+        :type url: str
+        :param kwargs: `aiohttp` request kwargs (params or json)
+
+        :return: response body as dictionary
+        :rtype: dict
+
+        """
+
+        params = {
+            key: value
+            for key, value in (
+                kwargs.get('params') or kwargs.get('json') or {}
+            ).items()
+            if not key == 'token'
+        }
+
+        try:
+            body = await self.run_sync(
+                self.response_cache.get,
+                endpoint,
+                params
+            )
+            if body is None:
+                response = await self.request(method, url, **kwargs)
+                body = await self.get_json_body(response)
+                await self.run_sync(
+                    self.response_cache.set,
+                    endpoint,
+                    params,
+                    body
+                )
+            return body
+        except Exception:
+            raise
+
+    @property
+    def cache_stats(self):
+        """
+        Returns response cache per-endpoint hit, miss, and store counts.
+
+        :return: counts by endpoint
+        :rtype: dict
+
+        """
+
+        return self.response_cache.stats
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_brand_datasets(self):
+        """
+        Retrieves brand datasets data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_brand_datasets` for
+        parameters, retries, and return format.
+
+        """
+
+        url = f'{self.base_url}/export/branddatasets'
+        params = {
+            'token': await self.get_token()
+        }
+
+        try:
+            response = await self.get(url=url, params=params)
+            return (await self.get_json_body(response))['BrandDatasets']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_years(self, brand_ids=None, dataset_ids=None):
+        """
+        Retrieves years data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_years` for
+        parameters, retries, and return format.
+
+        """
+
+        params = self.get_lookup_params(brand_ids, dataset_ids)
+        url = f'{self.base_url}/lookup/years'
+        params = {'token': await self.get_token(), **params}
+
+        try:
+            body = await self.get_cached_json_body(
+                'years', 'GET', url=url, params=params
+            )
+            return body['Years']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_makes(self, brand_ids=None, dataset_ids=None,
+                             year=None):
+        """
+        Retrieves makes data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_makes` for
+        parameters, retries, and return format.
+
+        """
+
+        params = self.get_lookup_params(brand_ids, dataset_ids, year=year)
+        url = f'{self.base_url}/lookup/makes'
+        params = {'token': await self.get_token(), **params}
+
+        try:
+            body = await self.get_cached_json_body(
+                'makes', 'GET', url=url, params=params
+            )
+            return body['Makes']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_models(self, brand_ids=None, dataset_ids=None,
+                              year=None, make_id=None):
+        """
+        Retrieves models data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_models` for
+        parameters, retries, and return format.
+
+        """
+
+        params = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            year=year,
+            makeid=make_id
+        )
+        url = f'{self.base_url}/lookup/models'
+        params = {'token': await self.get_token(), **params}
+
+        try:
+            body = await self.get_cached_json_body(
+                'models', 'GET', url=url, params=params
+            )
+            return body['Models']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_submodels(self, brand_ids=None, dataset_ids=None,
+                                 year=None, make_id=None, model_id=None):
+        """
+        Retrieves submodels data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_submodels` for
+        parameters, retries, and return format.
+
+        """
+
+        params = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            year=year,
+            makeid=make_id,
+            modelid=model_id
+        )
+        url = f'{self.base_url}/lookup/submodels'
+        params = {'token': await self.get_token(), **params}
+
+        try:
+            body = await self.get_cached_json_body(
+                'submodels', 'GET', url=url, params=params
+            )
+            return body['Submodels']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_engines(self, brand_ids=None, dataset_ids=None,
+                               year=None, make_id=None, model_id=None):
+        """
+        Retrieves engines data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_engines` for
+        parameters, retries, and return format.
+
+        """
+
+        params = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            year=year,
+            makeid=make_id,
+            modelid=model_id
+        )
+        url = f'{self.base_url}/lookup/engines'
+        params = {'token': await self.get_token(), **params}
+
+        try:
+            body = await self.get_cached_json_body(
+                'engines', 'GET', url=url, params=params
+            )
+            return body['Engines']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_vehicle_info(self, base_vehicle_id=None,
+                                    vehicle_id=None):
+        """
+        Retrieves vehicle info data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_vehicle_info` for
+        parameters, retries, and return format.
+
+        """
+
+        params = self.get_vehicle_info_params(base_vehicle_id, vehicle_id)
+        url = f'{self.base_url}/lookup/expandedvehicleinfo'
+        params = {'token': await self.get_token(), **params}
+
+        try:
+            response = await self.get(url=url, params=params)
+            return (await self.get_json_body(response))['Vehicles']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_categories(self, brand_ids=None, dataset_ids=None,
+                                  base_vehicle_ids=None, vehicle_ids=None,
+                                  year=None, make_name=None,
+                                  model_name=None, submodel_name=None):
+        """
+        Retrieves categories data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_categories` for
+        parameters, retries, and return format.
+
+        """
+
+        data = self.get_filter_data(
+            brand_ids=brand_ids,
+            dataset_ids=dataset_ids,
+            base_vehicle_ids=base_vehicle_ids,
+            vehicle_ids=vehicle_ids,
+            year=year,
+            make_name=make_name,
+            model_name=model_name,
+            submodel_name=submodel_name
+        )
+        url = f'{self.base_url}/lookup/categories'
+        data = {'token': await self.get_token(), **data}
+
+        try:
+            body = await self.get_cached_json_body(
+                'categories', 'POST', url=url, json=data
+            )
+            return body['Categories']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_products_by_brand(self, brand_ids=None,
+                                         dataset_ids=None,
+                                         base_vehicle_ids=None,
+                                         vehicle_ids=None, year=None,
+                                         make_name=None, model_name=None,
+                                         submodel_name=None,
+                                         part_numbers=None,
+                                         pies_segments=None):
+        """
+        Retrieves products by brand data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_products_by_brand` for
+        parameters, retries, and return format.
+
+        """
+
+        data = self.get_products_data(
+            brand_ids=brand_ids,
+            dataset_ids=dataset_ids,
+            base_vehicle_ids=base_vehicle_ids,
+            vehicle_ids=vehicle_ids,
+            year=year,
+            make_name=make_name,
+            model_name=model_name,
+            submodel_name=submodel_name,
+            part_numbers=part_numbers,
+            pies_segments=pies_segments
+        )
+        url = f'{self.base_url}/lookup/products'
+        data = {'token': await self.get_token(), **data}
+
+        try:
+            response = await self.post(url=url, json=data)
+            return (await self.get_json_body(response))['Products']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_products_by_category(self, category_id,
+                                            include_child_categories=True,
+                                            brand_ids=None,
+                                            dataset_ids=None,
+                                            base_vehicle_ids=None,
+                                            vehicle_ids=None, year=None,
+                                            make_name=None,
+                                            model_name=None,
+                                            submodel_name=None,
+                                            part_numbers=None,
+                                            pies_segments=None):
+        """
+        Retrieves products by category data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_products_by_category` for
+        parameters, retries, and return format.
+
+        """
+
+        data = {
+            'CategoryId': category_id,
+            'includeChildCategoryParts': (
+                str(include_child_categories).lower()
+                if include_child_categories else None
+            ),
+            **self.get_products_data(
+                brand_ids=brand_ids,
+                dataset_ids=dataset_ids,
+                base_vehicle_ids=base_vehicle_ids,
+                vehicle_ids=vehicle_ids,
+                year=year,
+                make_name=make_name,
+                model_name=model_name,
+                submodel_name=submodel_name,
+                part_numbers=part_numbers,
+                pies_segments=pies_segments
+            )
+        }
+        url = f'{self.base_url}/lookup/productsbycategory'
+        data = {'token': await self.get_token(), **data}
+
+        try:
+            response = await self.post(url=url, json=data)
+            return (await self.get_json_body(response))['Products']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidContentToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_product_html(self, product_id,
+                                    include_header_footer=False):
+        """
+        Retrieves product HTML data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_product_html` for
+        parameters, retries, and return format.
+
+        """
+
+        url = f'{self.base_url}/content/product'
+        url += f'?contenttoken={await self.get_content_token()}'
+        params = {
+            'productid': product_id,
+            'stripHeaderFooter': ~include_header_footer
+        }
+
+        try:
+            response = await self.get(url=url, params=params)
+            return await self.get_html_body(response)
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_vehicles_by_product(self, brand_id=None,
+                                           dataset_id=None,
+                                           part_numbers=None,
+                                           group_by_part=True):
+        """
+        Retrieves vehicles by product data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_vehicles_by_product` for
+        parameters, retries, and return format.
+
+        """
+
+        data = self.get_vehicles_by_product_data(
+            brand_id=brand_id,
+            dataset_id=dataset_id,
+            part_numbers=part_numbers,
+            group_by_part=group_by_part
+        )
+        url = f'{self.base_url}/lookup/vehiclesbyproduct'
+        data = {'token': await self.get_token(), **data}
+
+        try:
+            response = await self.post(url=url, json=data)
+            if group_by_part:
+                return (await self.get_json_body(response))['Parts']
+            else:
+                return (await self.get_json_body(response))['Vehicles']
+        except Exception:
+            raise
+
+    @async_retry(exceptions=ApiInvalidToken, tries=2)
+    @async_retry(exceptions=ApiRateLimitExceeded, tries=13)
+    async def retrieve_vehicles_by_brand(self, brand_ids=None,
+                                         dataset_ids=None):
+        """
+        Retrieves vehicles by brand data from SEMA API.
+
+        See :meth:`SemaApiClient.retrieve_vehicles_by_brand` for
+        parameters, retries, and return format.
+
+        """
+
+        data = self.get_lookup_params(
+            brand_ids,
+            dataset_ids,
+            required=True
+        )
+        url = f'{self.base_url}/lookup/vehiclesbybrand'
+        data = {'token': await self.get_token(), **data}
+
+        try:
+            response = await self.post(url=url, json=data)
+            return (await self.get_json_body(response))['BrandVehicles']
+        except Exception:
+            raise
@@ -0,0 +1,423 @@
+"""
+This module defines the crawler of the SEMA vehicle hierarchy.
+
+"""
+
+
+import json
+import os
+
+from django.conf import settings
+
+
+class SemaVehicleCrawler(object):
+    """
+    This class crawls the SEMA vehicle hierarchy (year -> make year ->
+    base vehicle -> vehicle -> engine), one level at a time, from
+    the authorized objects of the level above.
+
+    Parents are loaded in batches (keyset ordered by PK, with the
+    objects their requests need selected in the same query), child
+    requests of each batch are made concurrently, and each batch is
+    imported with one bulk write per model.
+
+    Progress is checkpointed to a state file after each batch. A crawl
+    that fails stops at the failed batch, and the next crawl resumes
+    from it, skipping levels already completed. Parents of batches
+    whose import returned errors are recorded in the state file, and
+    imported again once their level is crawled; those that still fail
+    are kept, and imported again by the next crawl. The state file is
+    removed once all levels are completed with no failed parents.
+
+    """
+
+    LEVELS = ('make_years', 'base_vehicles', 'vehicles', 'engines')
+
+    def __init__(self, state_path=None, batch_size=None, new_only=False):
+        """
+        Initializes crawler with state path, batch size, and import
+        options.
+
+        :param state_path: path of checkpoint state file (defaults to
+            `SEMA_CRAWL_STATE_PATH` setting)
+        :type state_path: str
+        :param batch_size: number of parents per batch (defaults to
+            `SEMA_CRAWL_BATCH_SIZE` setting)
+        :type batch_size: int
+        :param new_only: whether or not to skip updating existing
+            objects
+        :type new_only: bool
+
+        """
+
+        self.state_path = state_path or settings.SEMA_CRAWL_STATE_PATH
+        self.batch_size = batch_size or settings.SEMA_CRAWL_BATCH_SIZE
+        self.new_only = new_only
+
+    # <editor-fold desc="state properties ...">
+    def get_initial_state(self):
+        """
+        Returns state of crawl not yet started.
+
+        :return: crawl state
+        :rtype: dict
+
+        **-Return Format-**
+        ::
+            ret = {
+                "completed": <list>,
+                "level": <str>,
+                "last_pk": <int>,
+                "failed": {<level>: <list of parent PKs>}
+            }
+
+        """
+
+        return {
+            'completed': [],
+            'level': None,
+            'last_pk': None,
+            'failed': {}
+        }
+
+    def load_state(self):
+        """
+        Returns checkpointed state of crawl, or state of crawl not yet
+        started if there is no checkpoint.
+
+        :return: crawl state
+        :rtype: dict
+
+        :raises Exception: on general exception
+
+        """
+
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return self.get_initial_state()
+        except Exception:
+            raise
+
+        if state.get('level') not in self.LEVELS + (None,):
+            return self.get_initial_state()
+        state.setdefault('failed', {})
+        return state
+
+    def save_state(self, state):
+        """
+        Checkpoints state of crawl. State is written to a temporary
+        file first, so a crash mid-write never leaves a corrupt
+        checkpoint.
+
+        :param state: crawl state
+        :type state: dict
+
+        :raises Exception: on general exception
+
+        """
+
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            temp_path = f'{self.state_path}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+        except Exception:
+            raise
+
+    def clear_state(self):
+        """
+        Removes checkpointed state of crawl.
+
+        :raises Exception: on general exception
+
+        """
+
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            raise
+    # </editor-fold>
+
+    # <editor-fold desc="level properties ...">
+    def get_model(self, level):
+        """
+        Returns model of objects imported by level.
+
+        :param level: crawl level
+        :type level: str
+
+        :return: model
+        :rtype: django.db.models.Model
+
+        """
+
+        from sema.models import (
+            SemaBaseVehicle,
+            SemaEngine,
+            SemaMakeYear,
+            SemaVehicle
+        )
+
+        return {
+            'make_years': SemaMakeYear,
+            'base_vehicles': SemaBaseVehicle,
+            'vehicles': SemaVehicle,
+            'engines': SemaEngine
+        }[level]
+
+    def get_parents(self, level):
+        """
+        Returns queryset of authorized parents of level, with the
+        objects their API requests need selected.
+
+        :param level: crawl level
+        :type level: str
+
+        :return: parents queryset
+        :rtype: django.db.models.QuerySet
+
+        """
+
+        from sema.models import SemaBaseVehicle, SemaMakeYear, SemaYear
+
+        if level == 'make_years':
+            return SemaYear.objects.filter(is_authorized=True)
+        if level == 'base_vehicles':
+            return SemaMakeYear.objects.filter(
+                is_authorized=True
+            ).select_related('year', 'make')
+        return SemaBaseVehicle.objects.filter(
+            is_authorized=True
+        ).select_related(
+            'make_year__year',
+            'make_year__make',
+            'model'
+        )
+
+    def get_api_data(self, level, parents):
+        """
+        Retrieves and cleans API data of level for parents.
+
+        :param level: crawl level
+        :type level: str
+        :param parents: parents queryset
+        :type parents: django.db.models.QuerySet
+
+        :return: clean API data
+        :rtype: list
+
+        :raises Exception: on general exception
+
+        .. Topic:: **-Engines-**
+
+            Engines are retrieved per base vehicle (not per vehicle),
+            as the API filters engines by year, make, and model only.
+
+        """
+
+        manager = self.get_model(level).objects
+        try:
+            if level == 'engines':
+                data = parents.retrieve_engines_data_from_api()
+                return manager.clean_api_data(data=data)
+            return manager.get_api_data(**{
+                {
+                    'make_years': 'years',
+                    'base_vehicles': 'make_years',
+                    'vehicles': 'base_vehicles'
+                }[level]: parents
+            })
+        except Exception:
+            raise
+
+    @staticmethod
+    def has_errors(msgs):
+        """
+        Returns whether or not import messages include errors.
+
+        :param msgs: info, success, and error messages
+        :type msgs: list
+
+        :rtype: bool
+
+        """
+
+        return any(
+            not msg[:4] == 'Info' and not msg[:7] == 'Success'
+            for msg in msgs
+        )
+
+    def import_batch(self, level, pks):
+        """
+        Retrieves and imports API data of level for a batch of parents.
+
+        :param level: crawl level
+        :type level: str
+        :param pks: parent PKs
+        :type pks: list
+
+        :return: info, success, and error messages
+        :rtype: list
+
+        :raises Exception: on retrieve or import failure
+
+        """
+
+        data = self.get_api_data(
+            level=level,
+            parents=self.get_parents(level).filter(pk__in=pks)
+        )
+        return self.get_model(level).objects.import_from_api_data(
+            data=data,
+            new_only=self.new_only
+        )
+
+    def retry_failed(self, level, state):
+        """
+        Imports API data of level again for failed parents of state,
+        in batches, keeping those that fail again in state.
+
+        :param level: crawl level
+        :type level: str
+        :param state: crawl state
+        :type state: dict
+
+        :return: info, success, and error messages
+        :rtype: list
+
+        :raises Exception: on retrieve or import failure
+
+        """
+
+        failed = state['failed'].get(level, [])
+        msgs = []
+        still_failed = []
+        for i in range(0, len(failed), self.batch_size):
+            pks = failed[i:i + self.batch_size]
+            batch_msgs = self.import_batch(level=level, pks=pks)
+            msgs += batch_msgs
+            if self.has_errors(batch_msgs):
+                still_failed += pks
+
+        if still_failed:
+            state['failed'][level] = still_failed
+        else:
+            state['failed'].pop(level, None)
+        self.save_state(state)
+        return msgs
+
+    def crawl_level(self, level, state):
+        """
+        Retrieves and imports API data of level in batches of parents,
+        starting after last PK of state if state is at level, and
+        checkpoints state after each batch. Parents of batches whose
+        import returned errors are recorded in state, and imported
+        again once all batches are imported.
+
+        :param level: crawl level
+        :type level: str
+        :param state: crawl state
+        :type state: dict
+
+        :return: info, success, and error messages
+        :rtype: list
+
+        :raises Exception: on retrieve or import failure
+
+        """
+
+        parents = self.get_parents(level)
+        last_pk = state['last_pk'] if state['level'] == level else None
+        msgs = []
+
+        while True:
+            batch_parents = parents.order_by('pk')
+            if last_pk is not None:
+                batch_parents = batch_parents.filter(pk__gt=last_pk)
+            pks = list(
+                batch_parents.values_list('pk', flat=True)[:self.batch_size]
+            )
+            if not pks:
+                break
+
+            batch_msgs = self.import_batch(level=level, pks=pks)
+            msgs += batch_msgs
+            if self.has_errors(batch_msgs):
+                state['failed'].setdefault(level, []).extend(pks)
+
+            last_pk = pks[-1]
+            state.update(level=level, last_pk=last_pk)
+            self.save_state(state)
+
+        msgs += self.retry_failed(level=level, state=state)
+        return msgs
+    # </editor-fold>
+
+    def crawl(self, restart=False):
+        """
+        Crawls levels not yet completed, resuming from checkpoint.
+
+        :param restart: whether or not to discard checkpoint and crawl
+            all levels
+        :type restart: bool
+
+        :return: info, success, and error messages
+        :rtype: list
+
+        """
+
+        if restart:
+            self.clear_state()
+
+        msgs = []
+        try:
+            state = self.load_state()
+        except Exception as err:
+            msgs.append(self.get_model('make_years').get_class_error_msg(
+                f"crawl state unreadable, {err}"
+            ))
+            return msgs
+
+        for level in self.LEVELS:
+            model = self.get_model(level)
+            if level in state['completed']:
+                if not state['failed'].get(level):
+                    msgs.append(model.get_class_up_to_date_msg(
+                        message="already crawled"
+                    ))
+                    continue
+                try:
+                    msgs += self.retry_failed(level=level, state=state)
+                except Exception as err:
+                    msgs.append(model.get_class_error_msg(
+                        f"retry of failed parents stopped, {err}"
+                    ))
+                continue
+
+            try:
+                msgs += self.crawl_level(level=level, state=state)
+                state['completed'].append(level)
+                state.update(level=None, last_pk=None)
+                self.save_state(state)
+            except Exception as err:
+                if state['level'] == level:
+                    resume = f"resumes after {state['last_pk']}"
+                else:
+                    resume = "resumes at start"
+                msgs.append(model.get_class_error_msg(
+                    f"crawl stopped, {resume}, {err}"
+                ))
+                return msgs
+
+        for level, pks in state['failed'].items():
+            msgs.append(self.get_model(level).get_class_error_msg(
+                f"{len(pks)} parents failed, retried by next crawl"
+            ))
+        if not state['failed']:
+            self.clear_state()
+        return msgs
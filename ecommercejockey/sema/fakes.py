@@ -0,0 +1,545 @@
+"""
+This module defines the fake SEMA API used to benchmark SEMA pipelines
+offline.
+
+"""
+
+
+from django.conf import settings
+
+from core.fakes import FakeApi
+
+
+class FakeSemaApi(FakeApi):
+    """
+    This class defines a fake SEMA API serving a synthetic, consistent
+    catalogue: brands and their datasets, a year/make/model/submodel
+    vehicle tree, engines, a category tree, and products with PIES
+    attributes, vehicle fitments, and HTML.
+
+    Brand and product counts grow with `scale`. Rejections are sent
+    with the SEMA rate limit status code (409).
+
+    """
+
+    base_url = settings.SEMA_BASE_URL
+    rate_limit_status_code = 409
+    routes = (
+        ('GET', r'/token/get', 'get_token'),
+        ('GET', r'/token/getcontenttoken', 'get_content_token'),
+        ('GET', r'/export/branddatasets', 'get_brand_datasets'),
+        ('GET', r'/lookup/years', 'get_years'),
+        ('GET', r'/lookup/makes', 'get_makes'),
+        ('GET', r'/lookup/models', 'get_models'),
+        ('GET', r'/lookup/submodels', 'get_submodels'),
+        ('GET', r'/lookup/engines', 'get_engines'),
+        ('GET', r'/lookup/expandedvehicleinfo', 'get_vehicle_info'),
+        ('POST', r'/lookup/categories', 'get_categories'),
+        ('POST', r'/lookup/products', 'get_products_by_brand'),
+        ('POST', r'/lookup/productsbycategory', 'get_products_by_category'),
+        ('GET', r'/content/product', 'get_product_html'),
+        ('POST', r'/lookup/vehiclesbyproduct', 'get_vehicles_by_product'),
+        ('POST', r'/lookup/vehiclesbybrand', 'get_vehicles_by_brand')
+    )
+
+    YEARS = [2015, 2016, 2017, 2018, 2019]
+    MAKES = [(1, 'Chevrolet'), (2, 'Ford'), (3, 'Jeep')]
+    MODELS_PER_MAKE = 2
+    SUBMODELS = [(1, 'Base'), (2, 'Sport')]
+    DATASETS_PER_BRAND = 2
+    BRANDS_PER_SCALE = 2
+    PRODUCTS_PER_SCALE = 20
+    FITMENTS_PER_PRODUCT = 3
+    CATEGORY_BRANCHES = 2
+    ROOT_CATEGORIES = 3
+    PIES_SEGMENTS = [
+        ('Description - Long', 'C10_DES_01'),
+        ('Description - Marketing', 'C10_MKT_01'),
+        ('Digital Asset - URI', 'P05_URI_01'),
+        ('Digital Asset - File Name', 'P80_FNM_01')
+    ]
+
+    def __init__(self, scale=1, seed=0, base_url=None):
+        super().__init__(scale=scale, seed=seed, base_url=base_url)
+        self.brands = [
+            (f'F{index:03d}', f'Fake Brand {index}')
+            for index in range(1, self.BRANDS_PER_SCALE * self.scale + 1)
+        ]
+        self.datasets = [
+            (brand_index * 10 + index, brand_id, brand_name)
+            for brand_index, (brand_id, brand_name)
+            in enumerate(self.brands, start=1)
+            for index in range(1, self.DATASETS_PER_BRAND + 1)
+        ]
+        self.vehicles = [
+            {
+                'year': year,
+                'make_id': make_id,
+                'make_name': make_name,
+                'model_id': make_id * 100 + model_index,
+                'model_name': f'{make_name} {model_index}00',
+                'submodel_id': submodel_id,
+                'submodel_name': submodel_name,
+                'base_vehicle_id': (
+                    (year - 2000) * 1000 + make_id * 100 + model_index
+                ),
+                'vehicle_id': (
+                    ((year - 2000) * 1000 + make_id * 100 + model_index)
+                    * 10 + submodel_id
+                )
+            }
+            for year in self.YEARS
+            for make_id, make_name in self.MAKES
+            for model_index in range(1, self.MODELS_PER_MAKE + 1)
+            for submodel_id, submodel_name in self.SUBMODELS
+        ]
+        self.categories = self.get_category_tree()
+        self.leaf_category_ids = list(
+            self.iter_leaf_category_ids(self.categories)
+        )
+        self._products = {}
+
+    # <editor-fold desc="world properties ...">
+    def get_category_tree(self, parent_id=0, depth=0):
+        if depth == 3:
+            return []
+        count = self.ROOT_CATEGORIES if not depth else self.CATEGORY_BRANCHES
+        categories = []
+        for index in range(1, count + 1):
+            category_id = (parent_id or 100) * 10 + index
+            categories.append(
+                {
+                    'ParentId': parent_id,
+                    'CategoryId': category_id,
+                    'Name': f'Category {category_id}',
+                    'Categories': self.get_category_tree(
+                        category_id, depth + 1
+                    )
+                }
+            )
+        return categories
+
+    def iter_leaf_category_ids(self, categories):
+        for category in categories:
+            if category['Categories']:
+                yield from self.iter_leaf_category_ids(
+                    category['Categories']
+                )
+            else:
+                yield category['CategoryId']
+
+    def get_datasets(self, request, brand_key='aaia_brandids',
+                     dataset_key='branddatasetids'):
+        brand_ids = request.get_list(brand_key)
+        dataset_ids = [int(value) for value in request.get_list(dataset_key)]
+        return [
+            dataset for dataset in self.datasets
+            if (not brand_ids or dataset[1] in brand_ids)
+            and (not dataset_ids or dataset[0] in dataset_ids)
+        ]
+
+    def get_dataset_vehicles(self, dataset_id):
+        """
+        Returns vehicles of dataset (about two thirds of all vehicles,
+        varying by dataset).
+
+        """
+
+        return [
+            vehicle for vehicle in self.vehicles
+            if (vehicle['vehicle_id'] + dataset_id) % 3
+        ]
+
+    def get_vehicles(self, request):
+        vehicle_ids = set()
+        vehicles = []
+        for dataset in self.get_datasets(request):
+            for vehicle in self.get_dataset_vehicles(dataset[0]):
+                if vehicle['vehicle_id'] not in vehicle_ids:
+                    vehicle_ids.add(vehicle['vehicle_id'])
+                    vehicles.append(vehicle)
+
+        filters = {
+            'year': int(request.params.get('year') or 0),
+            'make_id': int(request.params.get('makeid') or 0),
+            'model_id': int(request.params.get('modelid') or 0)
+        }
+        return [
+            vehicle for vehicle in sorted(
+                vehicles, key=lambda vehicle: vehicle['vehicle_id']
+            )
+            if all(
+                not value or vehicle[key] == value
+                for key, value in filters.items()
+            )
+        ]
+
+    def get_dataset_products(self, dataset):
+        """
+        Returns products of dataset, each fitting a few of the dataset's
+        vehicles and belonging to one leaf category.
+
+        """
+
+        dataset_id, brand_id, brand_name = dataset
+        if dataset_id in self._products:
+            return self._products[dataset_id]
+
+        vehicles = self.get_dataset_vehicles(dataset_id)
+        products = []
+        for index in range(1, self.PRODUCTS_PER_SCALE * self.scale + 1):
+            product_id = dataset_id * 100000 + index
+            rand = self.get_random('product', product_id)
+            products.append(
+                {
+                    'product_id': product_id,
+                    'part_number': f'{brand_id}-{dataset_id}-{index:05d}',
+                    'brand_name': brand_name,
+                    'category_id': self.leaf_category_ids[
+                        index % len(self.leaf_category_ids)
+                    ],
+                    'vehicles': [
+                        vehicles[
+                            (index * 7 + offset) % len(vehicles)
+                        ]
+                        for offset in range(self.FITMENTS_PER_PRODUCT)
+                    ],
+                    'length': rand.randint(200, 2000)
+                }
+            )
+        self._products[dataset_id] = products
+        return products
+
+    def get_products(self, request):
+        part_numbers = request.get_list('partNumbers')
+        base_vehicle_ids = [
+            int(value) for value in request.get_list('baseVehicleIds')
+        ]
+        vehicle_ids = [
+            int(value) for value in request.get_list('vehicleIds')
+        ]
+        names = {
+            'year': int(request.params.get('Year') or 0),
+            'make_name': request.params.get('MakeName'),
+            'model_name': request.params.get('ModelName'),
+            'submodel_name': request.params.get('SubmodelName')
+        }
+
+        def fits(vehicle):
+            if base_vehicle_ids:
+                return vehicle['base_vehicle_id'] in base_vehicle_ids
+            if vehicle_ids:
+                return vehicle['vehicle_id'] in vehicle_ids
+            return all(
+                not value or vehicle[key] == value
+                for key, value in names.items()
+            )
+
+        products = []
+        for dataset in self.get_datasets(request):
+            for product in self.get_dataset_products(dataset):
+                if part_numbers and product['part_number'] not in part_numbers:
+                    continue
+                if not any(fits(vehicle) for vehicle in product['vehicles']):
+                    continue
+                products.append(product)
+        return products
+
+    def get_product_data(self, product, segments):
+        pies_attributes = []
+        for name, segment in self.PIES_SEGMENTS:
+            if segments and segment[:3] not in segments:
+                continue
+            if segment.startswith('C10'):
+                value = f'{name} of {product["part_number"]}. ' * (
+                    product['length'] // 100
+                )
+            elif segment.startswith('P05'):
+                value = (
+                    f'https://assets.example.com/{product["part_number"]}.jpg'
+                )
+            else:
+                value = f'{product["part_number"]}.jpg'
+            pies_attributes.append(
+                {
+                    'PiesName': name,
+                    'PiesSegment': segment,
+                    'Value': value.strip()
+                }
+            )
+        return {
+            'ProductId': product['product_id'],
+            'PartNumber': product['part_number'],
+            'PiesAttributes': pies_attributes
+        }
+
+    @staticmethod
+    def get_body(key, value):
+        return {
+            'success': True,
+            'message': '',
+            key: value
+        }
+    # </editor-fold>
+
+    # <editor-fold desc="route properties ...">
+    def get_token(self, request):
+        return 200, {'success': True, 'message': '', 'token': 'fake-token'}
+
+    def get_content_token(self, request):
+        return 200, {
+            'success': True,
+            'message': '',
+            'contenttoken': 'fake-content-token'
+        }
+
+    def get_brand_datasets(self, request):
+        data = [
+            {
+                'AAIABrandId': brand_id,
+                'BrandName': brand_name,
+                'DatasetId': dataset_id,
+                'DatasetName': f'{brand_name} Dataset {dataset_id % 10}'
+            }
+            for dataset_id, brand_id, brand_name in self.datasets
+        ]
+        return 200, self.get_body('BrandDatasets', data)
+
+    def get_years(self, request):
+        years = sorted(
+            {vehicle['year'] for vehicle in self.get_vehicles(request)}
+        )
+        return 200, self.get_body('Years', years)
+
+    def get_makes(self, request):
+        makes = {
+            vehicle['make_id']: vehicle['make_name']
+            for vehicle in self.get_vehicles(request)
+        }
+        data = [
+            {'MakeID': make_id, 'MakeName': make_name}
+            for make_id, make_name in sorted(makes.items())
+        ]
+        return 200, self.get_body('Makes', data)
+
+    def get_models(self, request):
+        models = {
+            (vehicle['base_vehicle_id'], vehicle['model_id']):
+                vehicle['model_name']
+            for vehicle in self.get_vehicles(request)
+        }
+        data = [
+            {
+                'BaseVehicleID': base_vehicle_id,
+                'ModelID': model_id,
+                'ModelName': model_name
+            }
+            for (base_vehicle_id, model_id), model_name
+            in sorted(models.items())
+        ]
+        return 200, self.get_body('Models', data)
+
+    def get_submodels(self, request):
+        data = [
+            {
+                'VehicleID': vehicle['vehicle_id'],
+                'SubmodelID': vehicle['submodel_id'],
+                'SubmodelName': vehicle['submodel_name']
+            }
+            for vehicle in self.get_vehicles(request)
+        ]
+        return 200, self.get_body('Submodels', data)
+
+    def get_engine_data(self, vehicle):
+        rand = self.get_random('engine', vehicle['vehicle_id'])
+        cylinders = rand.choice([4, 6, 8])
+        liter = round(cylinders * rand.uniform(0.45, 0.8), 1)
+        return {
+            'VehicleID': vehicle['vehicle_id'],
+            'Liter': str(liter),
+            'CC': str(int(liter * 1000)),
+            'CID': str(int(liter * 61)),
+            'Cylinders': str(cylinders),
+            'BlockType': 'V' if cylinders > 4 else 'L',
+            'EngBoreIn': '3.5',
+            'EngBoreMetric': '89',
+            'EngStrokeIn': '3.6',
+            'EngStrokeMetric': '91',
+            'ValvesPerEngine': str(cylinders * 4),
+            'AspirationName': rand.choice(['Naturally Aspirated', 'Turbo']),
+            'CylinderHeadTypeName': 'DOHC',
+            'FuelTypeName': 'GAS',
+            'IgnitionSystemTypeName': 'Electronic',
+            'MfrName': vehicle['make_name'],
+            'HorsePower': str(cylinders * rand.randint(35, 60)),
+            'KilowattPower': str(cylinders * rand.randint(26, 45)),
+            'EngineDesignationName': f'E{cylinders}{int(liter * 10)}'
+        }
+
+    def get_engines(self, request):
+        data = [
+            self.get_engine_data(vehicle)
+            for vehicle in self.get_vehicles(request)
+        ]
+        return 200, self.get_body('Engines', data)
+
+    def get_vehicle_info(self, request):
+        base_vehicle_id = int(request.params.get('baseVehicleID') or 0)
+        vehicle_id = int(request.params.get('vehicleID') or 0)
+        data = []
+        for vehicle in self.vehicles:
+            if not (vehicle['base_vehicle_id'] == base_vehicle_id
+                    or vehicle['vehicle_id'] == vehicle_id):
+                continue
+            engine = self.get_engine_data(vehicle)
+            data.append(
+                {
+                    'Year': vehicle['year'],
+                    'Make': vehicle['make_name'],
+                    'Model': vehicle['model_name'],
+                    'Submodel': vehicle['submodel_name'],
+                    'Region': 'United States',
+                    'Liter': engine['Liter'],
+                    'Cylinders': engine['Cylinders'],
+                    'BlockType': engine['BlockType'],
+                    'FuelTypeName': engine['FuelTypeName'],
+                    'CC': engine['CC'],
+                    'CID': engine['CID'],
+                    'AspirationName': engine['AspirationName'],
+                    'HorsePower': engine['HorsePower'],
+                    'KilowattPower': engine['KilowattPower']
+                }
+            )
+        return 200, self.get_body('Vehicles', data)
+
+    def get_categories(self, request):
+        category_ids = {
+            product['category_id'] for product in self.get_products(request)
+        }
+
+        def prune(categories):
+            pruned = []
+            for category in categories:
+                children = prune(category['Categories'])
+                if children or category['CategoryId'] in category_ids:
+                    pruned.append(dict(category, Categories=children))
+            return pruned
+
+        return 200, self.get_body('Categories', prune(self.categories))
+
+    def get_products_by_brand(self, request):
+        segments = [
+            segment for segment in request.get_list('piesSegments')
+            if not segment == 'all'
+        ]
+        data = [
+            self.get_product_data(product, segments)
+            for product in self.get_products(request)
+        ]
+        return 200, self.get_body('Products', data)
+
+    def get_products_by_category(self, request):
+        category_id = int(request.params.get('CategoryId') or 0)
+        include_children = request.params.get('includeChildCategoryParts')
+
+        def is_in_category(product_category_id):
+            if product_category_id == category_id:
+                return True
+            if include_children == 'true':
+                return str(product_category_id).startswith(str(category_id))
+            return False
+
+        segments = [
+            segment for segment in request.get_list('piesSegments')
+            if not segment == 'all'
+        ]
+        data = [
+            self.get_product_data(product, segments)
+            for product in self.get_products(request)
+            if is_in_category(product['category_id'])
+        ]
+        return 200, self.get_body('Products', data)
+
+    def get_product_html(self, request):
+        product_id = int(request.params.get('productid') or 0)
+        dataset_id = product_id // 100000
+        dataset = next(
+            (dataset for dataset in self.datasets if dataset[0] == dataset_id),
+            None
+        )
+        product = None
+        if dataset:
+            products = self.get_dataset_products(dataset)
+            index = product_id % 100000 - 1
+            if 0 <= index < len(products):
+                product = products[index]
+        if not product:
+            return 200, '<html><body>Product not found</body></html>'
+
+        paragraphs = ''.join(
+            f'<p>{product["brand_name"]} {product["part_number"]} '
+            f'feature {index}.</p>\n'
+            for index in range(product['length'] // 50)
+        )
+        return 200, (
+            f'<html><head><title>{product["part_number"]}</title></head>\n'
+            f'<body><div class="product">\n{paragraphs}</div></body></html>'
+        )
+
+    def get_vehicles_by_product(self, request):
+        products = []
+        part_numbers = request.get_list('partNumbers')
+        datasets = self.get_datasets(
+            request,
+            brand_key='aaia_brandid',
+            dataset_key='branddatasetid'
+        )
+        for dataset in datasets:
+            for product in self.get_dataset_products(dataset):
+                if part_numbers and product['part_number'] not in part_numbers:
+                    continue
+                products.append(product)
+
+        def get_vehicle_data(vehicle):
+            return {
+                'Year': vehicle['year'],
+                'MakeName': vehicle['make_name'],
+                'ModelName': vehicle['model_name'],
+                'SubmodelName': vehicle['submodel_name']
+            }
+
+        if request.params.get('groupByPart') == 'true':
+            data = [
+                {
+                    'PartNumber': product['part_number'],
+                    'Vehicles': [
+                        get_vehicle_data(vehicle)
+                        for vehicle in product['vehicles']
+                    ]
+                }
+                for product in products
+            ]
+            return 200, self.get_body('Parts', data)
+
+        data = [
+            get_vehicle_data(vehicle)
+            for product in products
+            for vehicle in product['vehicles']
+        ]
+        return 200, self.get_body('Vehicles', data)
+
+    def get_vehicles_by_brand(self, request):
+        data = [
+            {
+                'AAIA_BrandID': brand_id,
+                'BrandName': brand_name,
+                'Year': vehicle['year'],
+                'MakeName': vehicle['make_name'],
+                'ModelName': vehicle['model_name'],
+                'SubmodelName': vehicle['submodel_name']
+            }
+            for dataset_id, brand_id, brand_name in self.get_datasets(request)
+            for vehicle in self.get_dataset_vehicles(dataset_id)
+        ]
+        return 200, self.get_body('BrandVehicles', data)
+    # </editor-fold>
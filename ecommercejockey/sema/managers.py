@@ -5,9 +5,12 @@ This module defines all managers and querysets for the SEMA app.
 
 
 from collections import defaultdict
-from random import randint
+from hashlib import sha1
+from itertools import chain
 
+from django.conf import settings
 from django.core.exceptions import MultipleObjectsReturned
+from django.db import connection, transaction
 from django.db.models import (
     Manager,
     QuerySet,
@@ -21,7 +24,13 @@ from django.db.models import (
 )
 from django.db.models.functions import Floor
 
+from core.exceptions import ConcurrentCallError
+from core.links import link_checker
+from core.utils import chunkify_list, map_concurrently, staged_values
+from .allocators import local_id_allocator
 from .clients import sema_client
+from .resolvers import vehicle_resolver
+from .sanitizers import html_sanitizer
 
 
 class SemaBaseQuerySet(QuerySet):
@@ -49,6 +58,53 @@ class SemaBaseQuerySet(QuerySet):
         return msgs
     # </editor-fold>
 
+    # <editor-fold desc="retrieve properties ...">
+    @staticmethod
+    def retrieve_data_from_api_concurrently(objs, method, object_kwargs=None,
+                                            **kwargs):
+        """
+        Calls retrieve method of each object concurrently (under the
+        shared SEMA API rate limit), and concatenates data in object
+        order.
+
+        :param objs: objects on which to call retrieve method
+        :type objs: iterable
+        :param method: name of object retrieve method
+        :type method: str
+        :param object_kwargs: additional kwargs by object
+        :type object_kwargs: dict
+        :param kwargs: kwargs passed to every retrieve method call
+
+        :return: concatenated data
+        :rtype: list
+
+        :raises ConcurrentCallError: if any call fails, with errors by
+            object
+
+        """
+
+        def retrieve(obj):
+            call_kwargs = dict(kwargs)
+            if object_kwargs:
+                call_kwargs.update(object_kwargs.get(obj, {}))
+            return getattr(obj, method)(**call_kwargs)
+
+        results = map_concurrently(
+            retrieve,
+            objs,
+            max_workers=settings.SEMA_MAX_WORKERS
+        )
+
+        errors = [(obj, err) for obj, _, err in results if err]
+        if errors:
+            raise ConcurrentCallError(errors)
+
+        data = []
+        for _, result, _ in results:
+            data += result
+        return data
+    # </editor-fold>
+
 
 class SemaBrandQuerySet(SemaBaseQuerySet):
     """
@@ -121,11 +177,11 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_years_data_from_api(
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_years_data_from_api',
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_years(
                     brand_ids=[brand.brand_id for brand in self]
@@ -177,12 +233,12 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_makes_data_from_api(
-                        year=year,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_makes_data_from_api',
+                    year=year,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_makes(
                     brand_ids=[brand.brand_id for brand in self],
@@ -241,13 +297,13 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_models_data_from_api(
-                        year=year,
-                        make_id=make_id,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_models_data_from_api',
+                    year=year,
+                    make_id=make_id,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_models(
                     brand_ids=[brand.brand_id for brand in self],
@@ -310,14 +366,14 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_submodels_data_from_api(
-                        year=year,
-                        make_id=make_id,
-                        model_id=model_id,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_submodels_data_from_api',
+                    year=year,
+                    make_id=make_id,
+                    model_id=model_id,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_submodels(
                     brand_ids=[brand.brand_id for brand in self],
@@ -414,14 +470,14 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_engines_data_from_api(
-                        year=year,
-                        make_id=make_id,
-                        model_id=model_id,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_engines_data_from_api',
+                    year=year,
+                    make_id=make_id,
+                    model_id=model_id,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_engines(
                     brand_ids=[brand.brand_id for brand in self],
@@ -543,17 +599,17 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_categories_data_from_api(
-                        base_vehicle_ids=base_vehicle_ids,
-                        vehicle_ids=vehicle_ids,
-                        year=year,
-                        make_name=make_name,
-                        model_name=model_name,
-                        submodel_name=submodel_name,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_categories_data_from_api',
+                    base_vehicle_ids=base_vehicle_ids,
+                    vehicle_ids=vehicle_ids,
+                    year=year,
+                    make_name=make_name,
+                    model_name=model_name,
+                    submodel_name=submodel_name,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_categories(
                     brand_ids=[brand.brand_id for brand in self],
@@ -667,19 +723,19 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_products_by_brand_data_from_api(
-                        base_vehicle_ids=base_vehicle_ids,
-                        vehicle_ids=vehicle_ids,
-                        year=year,
-                        make_name=make_name,
-                        model_name=model_name,
-                        submodel_name=submodel_name,
-                        part_numbers=part_numbers,
-                        pies_segments=pies_segments,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_products_by_brand_data_from_api',
+                    base_vehicle_ids=base_vehicle_ids,
+                    vehicle_ids=vehicle_ids,
+                    year=year,
+                    make_name=make_name,
+                    model_name=model_name,
+                    submodel_name=submodel_name,
+                    part_numbers=part_numbers,
+                    pies_segments=pies_segments,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_products_by_brand(
                     brand_ids=[brand.brand_id for brand in self],
@@ -800,20 +856,20 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_products_by_category_data_from_api(
-                        category_id=category_id,
-                        base_vehicle_ids=base_vehicle_ids,
-                        vehicle_ids=vehicle_ids,
-                        year=year,
-                        make_name=make_name,
-                        model_name=model_name,
-                        submodel_name=submodel_name,
-                        part_numbers=part_numbers,
-                        pies_segments=pies_segments,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_products_by_category_data_from_api',
+                    category_id=category_id,
+                    base_vehicle_ids=base_vehicle_ids,
+                    vehicle_ids=vehicle_ids,
+                    year=year,
+                    make_name=make_name,
+                    model_name=model_name,
+                    submodel_name=submodel_name,
+                    part_numbers=part_numbers,
+                    pies_segments=pies_segments,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_products_by_category(
                     category_id=category_id,
@@ -890,12 +946,12 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
         """
 
         try:
-            data = []
-            for brand in self:
-                data += brand.retrieve_vehicles_by_product_data_from_api(
-                    part_numbers=part_numbers,
-                    annotated=annotated
-                )
+            data = self.retrieve_data_from_api_concurrently(
+                objs=self,
+                method='retrieve_vehicles_by_product_data_from_api',
+                part_numbers=part_numbers,
+                annotated=annotated
+            )
             return data
         except Exception:
             raise
@@ -949,11 +1005,11 @@ class SemaBrandQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for brand in self:
-                    data += brand.retrieve_vehicles_by_brand_data_from_api(
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self,
+                    method='retrieve_vehicles_by_brand_data_from_api',
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_vehicles_by_brand(
                     brand_ids=[brand.brand_id for brand in self]
@@ -1043,11 +1099,11 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_years_data_from_api(
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_years_data_from_api',
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_years(
                     dataset_ids=[dataset.dataset_id for dataset in self]
@@ -1100,12 +1156,12 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_makes_data_from_api(
-                        year=year,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_makes_data_from_api',
+                    year=year,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_makes(
                     dataset_ids=[dataset.dataset_id for dataset in self],
@@ -1165,13 +1221,13 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_models_data_from_api(
-                        year=year,
-                        make_id=make_id,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_models_data_from_api',
+                    year=year,
+                    make_id=make_id,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_models(
                     dataset_ids=[dataset.dataset_id for dataset in self],
@@ -1235,14 +1291,14 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_submodels_data_from_api(
-                        year=year,
-                        make_id=make_id,
-                        model_id=model_id,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_submodels_data_from_api',
+                    year=year,
+                    make_id=make_id,
+                    model_id=model_id,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_submodels(
                     dataset_ids=[dataset.dataset_id for dataset in self],
@@ -1340,14 +1396,14 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_engines_data_from_api(
-                        year=year,
-                        make_id=make_id,
-                        model_id=model_id,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_engines_data_from_api',
+                    year=year,
+                    make_id=make_id,
+                    model_id=model_id,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_engines(
                     dataset_ids=[dataset.dataset_id for dataset in self],
@@ -1470,17 +1526,17 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_categories_data_from_api(
-                        base_vehicle_ids=base_vehicle_ids,
-                        vehicle_ids=vehicle_ids,
-                        year=year,
-                        make_name=make_name,
-                        model_name=model_name,
-                        submodel_name=submodel_name,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_categories_data_from_api',
+                    base_vehicle_ids=base_vehicle_ids,
+                    vehicle_ids=vehicle_ids,
+                    year=year,
+                    make_name=make_name,
+                    model_name=model_name,
+                    submodel_name=submodel_name,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_categories(
                     dataset_ids=[dataset.dataset_id for dataset in self],
@@ -1608,19 +1664,19 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_products_by_brand_data_from_api(
-                        base_vehicle_ids=base_vehicle_ids,
-                        vehicle_ids=vehicle_ids,
-                        year=year,
-                        make_name=make_name,
-                        model_name=model_name,
-                        submodel_name=submodel_name,
-                        part_numbers=part_numbers,
-                        pies_segments=pies_segments,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_products_by_brand_data_from_api',
+                    base_vehicle_ids=base_vehicle_ids,
+                    vehicle_ids=vehicle_ids,
+                    year=year,
+                    make_name=make_name,
+                    model_name=model_name,
+                    submodel_name=submodel_name,
+                    part_numbers=part_numbers,
+                    pies_segments=pies_segments,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_products_by_brand(
                     dataset_ids=[dataset.dataset_id for dataset in self],
@@ -1741,20 +1797,20 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_products_by_category_data_from_api(
-                        category_id=category_id,
-                        base_vehicle_ids=base_vehicle_ids,
-                        vehicle_ids=vehicle_ids,
-                        year=year,
-                        make_name=make_name,
-                        model_name=model_name,
-                        submodel_name=submodel_name,
-                        part_numbers=part_numbers,
-                        pies_segments=pies_segments,
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_products_by_category_data_from_api',
+                    category_id=category_id,
+                    base_vehicle_ids=base_vehicle_ids,
+                    vehicle_ids=vehicle_ids,
+                    year=year,
+                    make_name=make_name,
+                    model_name=model_name,
+                    submodel_name=submodel_name,
+                    part_numbers=part_numbers,
+                    pies_segments=pies_segments,
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_products_by_category(
                     category_id=category_id,
@@ -1833,12 +1889,12 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
         """
 
         try:
-            data = []
-            for dataset in self:
-                data += dataset.retrieve_vehicles_by_product_data_from_api(
-                    part_numbers=part_numbers,
-                    annotated=annotated
-                )
+            data = self.retrieve_data_from_api_concurrently(
+                objs=self.select_related('brand'),
+                method='retrieve_vehicles_by_product_data_from_api',
+                part_numbers=part_numbers,
+                annotated=annotated
+            )
             return data
         except Exception:
             raise
@@ -1893,11 +1949,11 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
 
         try:
             if annotated:
-                data = []
-                for dataset in self:
-                    data += dataset.retrieve_vehicles_by_brand_data_from_api(
-                        annotated=annotated
-                    )
+                data = self.retrieve_data_from_api_concurrently(
+                    objs=self.select_related('brand'),
+                    method='retrieve_vehicles_by_brand_data_from_api',
+                    annotated=annotated
+                )
             else:
                 data = sema_client.retrieve_vehicles_by_brand(
                     dataset_ids=[dataset.dataset_id for dataset in self]
@@ -1908,11 +1964,13 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_dataset_categories_update_from_api(self, **filters):
+    def perform_dataset_categories_update_from_api(self, full_sync=False,
+                                                   **filters):
         msgs = []
         for dataset in self:
             try:
                 msgs += dataset.perform_dataset_categories_update_from_api(
+                    full_sync=full_sync,
                     **filters
                 )
             except Exception as err:
@@ -1922,11 +1980,13 @@ class SemaDatasetQuerySet(SemaBaseQuerySet):
             msgs.append(self.model.get_class_up_to_date_msg())
         return msgs
 
-    def perform_dataset_vehicles_update_from_api(self):
+    def perform_dataset_vehicles_update_from_api(self, full_sync=False):
         msgs = []
         for dataset in self:
             try:
-                msgs += dataset.perform_dataset_vehicles_update_from_api()
+                msgs += dataset.perform_dataset_vehicles_update_from_api(
+                    full_sync=full_sync
+                )
             except Exception as err:
                 msgs.append(self.model.get_class_error_msg(str(err)))
 
@@ -2021,14 +2081,13 @@ class SemaYearQuerySet(SemaBaseQuerySet):
         """
 
         try:
-            data = []
-            for year in self:
-                data += year.retrieve_makes_data_from_api(
-                    brand_ids=brand_ids,
-                    dataset_ids=dataset_ids,
-                    annotated=annotated
-                )
-            return data
+            return self.retrieve_data_from_api_concurrently(
+                objs=self,
+                method='retrieve_makes_data_from_api',
+                brand_ids=brand_ids,
+                dataset_ids=dataset_ids,
+                annotated=annotated
+            )
         except Exception:
             raise
 
@@ -2848,14 +2907,13 @@ class SemaMakeYearQuerySet(SemaBaseQuerySet):
         """
 
         try:
-            data = []
-            for make_year in self:
-                data += make_year.retrieve_models_data_from_api(
-                    brand_ids=brand_ids,
-                    dataset_ids=dataset_ids,
-                    annotated=annotated
-                )
-            return data
+            return self.retrieve_data_from_api_concurrently(
+                objs=self,
+                method='retrieve_models_data_from_api',
+                brand_ids=brand_ids,
+                dataset_ids=dataset_ids,
+                annotated=annotated
+            )
         except Exception:
             raise
 
@@ -3113,14 +3171,13 @@ class SemaBaseVehicleQuerySet(SemaBaseQuerySet):
         """
 
         try:
-            data = []
-            for base_vehicle in self:
-                data += base_vehicle.retrieve_submodels_data_from_api(
-                    brand_ids=brand_ids,
-                    dataset_ids=dataset_ids,
-                    annotated=annotated
-                )
-            return data
+            return self.retrieve_data_from_api_concurrently(
+                objs=self,
+                method='retrieve_submodels_data_from_api',
+                brand_ids=brand_ids,
+                dataset_ids=dataset_ids,
+                annotated=annotated
+            )
         except Exception:
             raise
 
@@ -3211,14 +3268,13 @@ class SemaBaseVehicleQuerySet(SemaBaseQuerySet):
         """
 
         try:
-            data = []
-            for base_vehicle in self:
-                data += base_vehicle.retrieve_engines_data_from_api(
-                    brand_ids=brand_ids,
-                    dataset_ids=dataset_ids,
-                    annotated=annotated
-                )
-            return data
+            return self.retrieve_data_from_api_concurrently(
+                objs=self,
+                method='retrieve_engines_data_from_api',
+                brand_ids=brand_ids,
+                dataset_ids=dataset_ids,
+                annotated=annotated
+            )
         except Exception:
             raise
 
@@ -4435,11 +4491,13 @@ class SemaCategoryQuerySet(SemaBaseQuerySet):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_category_products_update_from_api(self, **filters):
+    def perform_category_products_update_from_api(self, full_sync=False,
+                                                  **filters):
         msgs = []
         for category in self:
             try:
                 msgs += category.perform_category_products_update_from_api(
+                    full_sync=full_sync,
                     **filters
                 )
             except Exception as err:
@@ -4501,7 +4559,8 @@ class SemaProductQuerySet(SemaBaseQuerySet):
                                                  model_name=None,
                                                  submodel_name=None,
                                                  pies_segments=None,
-                                                 annotated=False):
+                                                 annotated=False,
+                                                 stream=False):
         """
         Retrieves products by brand data from SEMA API.
 
@@ -4521,9 +4580,13 @@ class SemaProductQuerySet(SemaBaseQuerySet):
         :type pies_segments: list
         :param annotated: whether or not to include filter annotation
         :type annotated: bool
+        :param stream: whether or not to return products as an
+            iterator that retrieves datasets one after another and
+            decodes products from each response stream one at a time
+        :type stream: bool
 
         :return: product data
-        :rtype: list
+        :rtype: list (or generator if streamed)
 
         :raises Exception: on general exception
 
@@ -4540,6 +4603,8 @@ class SemaProductQuerySet(SemaBaseQuerySet):
             Only one of `base_vehicle_ids`, `vehicle_ids`, or named
             year/make/model group allowed
 
+            `stream` not allowed with `annotated`
+
         **-Return Format-**
         ::
             if annotated:
@@ -4592,22 +4657,42 @@ class SemaProductQuerySet(SemaBaseQuerySet):
 
         try:
             dataset_products = defaultdict(list)
-            for product in self:
+            for product in self.select_related('dataset__brand'):
                 dataset_products[product.dataset].append(product.part_number)
 
-            data = []
-            for dataset, part_numbers in dataset_products.items():
-                data += dataset.retrieve_products_by_brand_data_from_api(
-                    base_vehicle_ids=base_vehicle_ids,
-                    vehicle_ids=vehicle_ids,
-                    year=year,
-                    make_name=make_name,
-                    model_name=model_name,
-                    submodel_name=submodel_name,
-                    part_numbers=part_numbers,
-                    pies_segments=pies_segments,
-                    annotated=annotated
+            if stream:
+                return chain.from_iterable(
+                    dataset.retrieve_products_by_brand_data_from_api(
+                        base_vehicle_ids=base_vehicle_ids,
+                        vehicle_ids=vehicle_ids,
+                        year=year,
+                        make_name=make_name,
+                        model_name=model_name,
+                        submodel_name=submodel_name,
+                        part_numbers=part_numbers,
+                        pies_segments=pies_segments,
+                        annotated=annotated,
+                        stream=True
+                    )
+                    for dataset, part_numbers in dataset_products.items()
                 )
+
+            data = self.retrieve_data_from_api_concurrently(
+                objs=list(dataset_products),
+                method='retrieve_products_by_brand_data_from_api',
+                object_kwargs={
+                    dataset: {'part_numbers': part_numbers}
+                    for dataset, part_numbers in dataset_products.items()
+                },
+                base_vehicle_ids=base_vehicle_ids,
+                vehicle_ids=vehicle_ids,
+                year=year,
+                make_name=make_name,
+                model_name=model_name,
+                submodel_name=submodel_name,
+                pies_segments=pies_segments,
+                annotated=annotated
+            )
             return data
         except Exception:
             raise
@@ -4715,23 +4800,26 @@ class SemaProductQuerySet(SemaBaseQuerySet):
 
         try:
             dataset_products = defaultdict(list)
-            for product in self:
+            for product in self.select_related('dataset__brand'):
                 dataset_products[product.dataset].append(product.part_number)
 
-            data = []
-            for dataset, part_numbers in dataset_products.items():
-                data += dataset.retrieve_products_by_category_data_from_api(
-                    category_id=category_id,
-                    base_vehicle_ids=base_vehicle_ids,
-                    vehicle_ids=vehicle_ids,
-                    year=year,
-                    make_name=make_name,
-                    model_name=model_name,
-                    submodel_name=submodel_name,
-                    part_numbers=part_numbers,
-                    pies_segments=pies_segments,
-                    annotated=annotated
-                )
+            data = self.retrieve_data_from_api_concurrently(
+                objs=list(dataset_products),
+                method='retrieve_products_by_category_data_from_api',
+                object_kwargs={
+                    dataset: {'part_numbers': part_numbers}
+                    for dataset, part_numbers in dataset_products.items()
+                },
+                category_id=category_id,
+                base_vehicle_ids=base_vehicle_ids,
+                vehicle_ids=vehicle_ids,
+                year=year,
+                make_name=make_name,
+                model_name=model_name,
+                submodel_name=submodel_name,
+                pies_segments=pies_segments,
+                annotated=annotated
+            )
             return data
         except Exception:
             raise
@@ -4792,15 +4880,18 @@ class SemaProductQuerySet(SemaBaseQuerySet):
 
         try:
             dataset_products = defaultdict(list)
-            for product in self:
+            for product in self.select_related('dataset__brand'):
                 dataset_products[product.dataset].append(product.part_number)
 
-            data = []
-            for dataset, part_numbers in dataset_products.items():
-                data += dataset.retrieve_vehicles_by_product_data_from_api(
-                    part_numbers=part_numbers,
-                    annotated=annotated
-                )
+            data = self.retrieve_data_from_api_concurrently(
+                objs=list(dataset_products),
+                method='retrieve_vehicles_by_product_data_from_api',
+                object_kwargs={
+                    dataset: {'part_numbers': part_numbers}
+                    for dataset, part_numbers in dataset_products.items()
+                },
+                annotated=annotated
+            )
             return data
         except Exception:
             raise
@@ -4848,11 +4939,13 @@ class SemaProductQuerySet(SemaBaseQuerySet):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_product_vehicles_update_from_api(self):
+    def perform_product_vehicles_update_from_api(self, full_sync=False):
         msgs = []
         for product in self:
             try:
-                msgs += product.perform_product_vehicles_update_from_api()
+                msgs += product.perform_product_vehicles_update_from_api(
+                    full_sync=full_sync
+                )
             except Exception as err:
                 msgs.append(self.model.get_class_error_msg(str(err)))
 
@@ -4893,25 +4986,190 @@ class SemaProductQuerySet(SemaBaseQuerySet):
             msgs.append(self.model.get_class_up_to_date_msg())
         return msgs
 
+    def perform_pies_attributes_update_from_api(self, pies_attr_models=None,
+                                                new_only=False,
+                                                refresh_cache=False,
+                                                **filters):
+        """
+        Retrieves products PIES attribute data from SEMA API in one
+        pass, with the segments of all PIES attribute models, and
+        creates and/or updates PIES attribute objects of the model of
+        each attribute segment, in chunks of SEMA_IMPORT_CHUNK_SIZE.
+
+        :param pies_attr_models: SEMA PIES Attribute model classes
+            (defaults to description and digital assets models)
+        :type pies_attr_models: list
+        :param new_only: whether or not to skip updating existing
+            objects
+        :type new_only: bool
+        :param refresh_cache: whether or not to bypass cached API
+            responses (and refresh cache)
+        :type refresh_cache: bool
+        :param filters: kwargs by which to filter data retrieve
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        """
+
+        if not pies_attr_models:
+            from sema.models import (
+                SemaDescriptionPiesAttribute,
+                SemaDigitalAssetsPiesAttribute
+            )
+            pies_attr_models = [
+                SemaDescriptionPiesAttribute,
+                SemaDigitalAssetsPiesAttribute
+            ]
+
+        msgs = []
+        managers = [model.objects for model in pies_attr_models]
+        pies_segments = sorted({
+            code
+            for manager in managers
+            for code in manager.DEFAULT_ATTRIBUTE_CODES
+        })
+        # Items are routed into a buffer per manager, each imported as
+        # it fills, so the stream is never held in memory.
+        routed_data = {manager: [] for manager in managers}
+        manager_msgs = {manager: [] for manager in managers}
+        try:
+            with sema_client.response_cache.refreshing(refresh_cache):
+                data = self.retrieve_products_by_brand_data_from_api(
+                    pies_segments=pies_segments,
+                    annotated=False,
+                    stream=True,
+                    **filters
+                )
+                for item in managers[0].clean_api_data(data=data):
+                    manager = next(
+                        (
+                            manager for manager in managers
+                            if manager.is_attribute_segment(
+                                item['PiesSegment']
+                            )
+                        ),
+                        None
+                    )
+                    if not manager:
+                        continue
+
+                    routed_data[manager].append(item)
+                    chunk_size = settings.SEMA_IMPORT_CHUNK_SIZE
+                    if len(routed_data[manager]) >= chunk_size:
+                        manager_msgs[manager] += manager.import_from_api_data(
+                            data=routed_data[manager],
+                            new_only=new_only
+                        )
+                        routed_data[manager] = []
+        except Exception as err:
+            for manager in managers:
+                msgs += manager_msgs[manager]
+            msgs.append(self.model.get_class_error_msg(str(err)))
+            return msgs
+
+        for manager, data in routed_data.items():
+            if data:
+                manager_msgs[manager] += manager.import_from_api_data(
+                    data=data,
+                    new_only=new_only
+                )
+            if not manager_msgs[manager]:
+                manager_msgs[manager].append(
+                    manager.model.get_class_up_to_date_msg()
+                )
+            msgs += manager_msgs[manager]
+        return msgs
+
     def perform_product_html_update_from_api(self):
         """
-        Retrieves products HTML data from SEMA API, and updates HTML
-        fields.
+        Retrieves products HTML data from SEMA API concurrently (under
+        the shared SEMA API rate limit), in batches keyset ordered by
+        PK, and updates HTML fields of products whose HTML hash has
+        changed, with one bulk update per batch.
 
-        :return: update or error messages
+        :return: info, update, or error messages, and a summary of
+            fetched, unchanged, changed, and failed products and bytes
+            transferred
         :rtype: list
 
         """
 
         msgs = []
-        for product in self:
+        stats = dict.fromkeys(
+            ('fetched', 'unchanged', 'changed', 'failed', 'bytes'),
+            0
+        )
+        products = self.select_related('dataset__brand').defer(
+            'html',
+            'clean_html'
+        ).order_by('pk')
+        last_pk = None
+        while True:
+            batch = products
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(batch[:settings.SEMA_HTML_SYNC_BATCH_SIZE])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            results = map_concurrently(
+                lambda product: product.retrieve_product_html_data_from_api(
+                    annotated=False
+                ),
+                batch,
+                max_workers=settings.SEMA_MAX_WORKERS
+            )
+
+            changed = []
+            for product, html, err in results:
+                if err:
+                    stats['failed'] += 1
+                    msgs.append(product.get_instance_error_msg(str(err)))
+                    continue
+
+                stats['fetched'] += 1
+                stats['bytes'] += len(html.encode('utf-8'))
+                html_hash = self.model.get_html_hash(html)
+                if html_hash == product.html_hash:
+                    stats['unchanged'] += 1
+                    msgs.append(product.get_instance_up_to_date_msg())
+                    continue
+                product.html = html
+                product.html_hash = html_hash
+                product.clean_html = html_sanitizer.clean(html)
+                changed.append(product)
+
             try:
-                msgs.append(product.perform_product_html_update_from_api())
+                self.model.objects.bulk_update(
+                    changed,
+                    fields=['html', 'html_hash', 'clean_html']
+                )
+                stats['changed'] += len(changed)
+                msgs += [
+                    product.get_update_success_msg() for product in changed
+                ]
             except Exception as err:
-                msgs.append(product.get_instance_error_msg(str(err)))
-
-        if not msgs:
-            msgs.append(self.model.get_class_up_to_date_msg())
+                stats['failed'] += len(changed)
+                msgs += [
+                    product.get_instance_error_msg(str(err))
+                    for product in changed
+                ]
+
+        summary = (
+            f"HTML {stats['fetched']} fetched, "
+            f"{stats['unchanged']} unchanged, "
+            f"{stats['changed']} changed, "
+            f"{stats['failed']} failed, "
+            f"{stats['bytes']} bytes"
+        )
+        if stats['failed']:
+            msgs.append(self.model.get_class_error_msg(summary))
+        elif stats['changed']:
+            msgs.append(self.model.get_class_success_msg(summary))
+        else:
+            msgs.append(self.model.get_class_up_to_date_msg(message=summary))
         return msgs
     # </editor-fold>
 
@@ -4944,21 +5202,55 @@ class SemaDigitalAssetsPiesAttributeQuerySet(SemaBasePiesAttributeQuerySet):
     """
 
     # <editor-fold desc="perform properties ...">
-    def perform_relevancy_update(self):
+    def perform_relevancy_update(self, refresh_links=False):
+        """
+        Updates relevancy of digital assets PIES attributes, checking
+        links of those that may be relevant concurrently, and reusing
+        fresh link statuses. If links cannot be checked, relevancy is
+        left unchanged (of all attributes if the check fails, or of
+        those whose link status is unknown).
+
+        :param refresh_links: whether or not to check links with a
+            fresh status
+        :type refresh_links: bool
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        """
+
         msgs = []
 
-        for pies_attr in self:
+        pies_attrs = list(self.select_related('product__dataset__brand'))
+        try:
+            link_statuses = link_checker.check(
+                urls=[
+                    pies_attr.value for pies_attr in pies_attrs
+                    if pies_attr.may_be_relevant
+                ],
+                refresh=refresh_links
+            )
+        except Exception as err:
+            msgs.append(self.model.get_class_error_msg(str(err)))
+            return msgs
+
+        updated = []
+        for pies_attr in pies_attrs:
             if pies_attr.may_be_relevant:
-                try:
-                    if pies_attr.is_broken:
-                        relevant = False
-                        relevancy_exception = 'Broken'
-                    else:
-                        relevant = True
-                        relevancy_exception = ''
-                except Exception as err:
+                link_status = link_statuses.get(pies_attr.value)
+                if not link_status:
+                    msgs.append(
+                        pies_attr.get_instance_error_msg(
+                            "link could not be checked"
+                        )
+                    )
+                    continue
+                if link_status.is_broken:
                     relevant = False
-                    relevancy_exception = str(err)[:100]
+                    relevancy_exception = 'Broken'
+                else:
+                    relevant = True
+                    relevancy_exception = ''
             else:
                 relevant = False
                 relevancy_exception = ''
@@ -4966,7 +5258,7 @@ class SemaDigitalAssetsPiesAttributeQuerySet(SemaBasePiesAttributeQuerySet):
             if not pies_attr.is_relevant == relevant:
                 pies_attr.is_relevant = relevant
                 pies_attr.relevancy_exception = relevancy_exception
-                pies_attr.save()
+                updated.append(pies_attr)
                 msgs.append(
                     pies_attr.get_update_success_msg(
                         previous_data={'relevant': not relevant},
@@ -4974,7 +5266,16 @@ class SemaDigitalAssetsPiesAttributeQuerySet(SemaBasePiesAttributeQuerySet):
                     )
                 )
             else:
-                msgs.append(pies_attr.get_up_to_date_msg())
+                msgs.append(pies_attr.get_instance_up_to_date_msg())
+
+        try:
+            self.model.objects.bulk_update(
+                updated,
+                fields=['is_relevant', 'relevancy_exception'],
+                batch_size=settings.SEMA_IMPORT_CHUNK_SIZE
+            )
+        except Exception as err:
+            msgs = [self.model.get_class_error_msg(str(err))]
 
         if not msgs:
             msgs.append(self.model.get_class_up_to_date_msg())
@@ -4988,6 +5289,10 @@ class SemaBaseManager(Manager):
 
     """
 
+    can_stream_api_data = False
+    import_key_fields = ('pk',)
+    invalidates_vehicle_resolver = False
+
     def get_queryset(self):
         """
         Returns custom QuerySet object.
@@ -5003,7 +5308,8 @@ class SemaBaseManager(Manager):
         )
 
     # <editor-fold desc="perform properties ...">
-    def perform_import_from_api(self, new_only=False, **filters):
+    def perform_import_from_api(self, new_only=False, refresh_cache=False,
+                                **filters):
         """
         Retrieves data from SEMA API, and creates and/or updates
         objects.
@@ -5011,6 +5317,9 @@ class SemaBaseManager(Manager):
         :param new_only: whether or not to skip updating existing
             objects
         :type new_only: bool
+        :param refresh_cache: whether or not to bypass cached API
+            responses (and refresh cache)
+        :type refresh_cache: bool
         :param filters: kwargs by which to filter data retrieve
 
         :return: info, success, and/or error messages
@@ -5021,7 +5330,11 @@ class SemaBaseManager(Manager):
         msgs = []
 
         try:
-            data = self.get_api_data(**filters)
+            data = self.get_api_data(
+                refresh_cache=refresh_cache,
+                stream=True,
+                **filters
+            )
             msgs += self.import_from_api_data(data=data, new_only=new_only)
         except Exception as err:
             msgs.append(self.model.get_class_error_msg(str(err)))
@@ -5031,11 +5344,19 @@ class SemaBaseManager(Manager):
             msgs.append(self.model.get_class_up_to_date_msg())
         return msgs
 
-    def perform_unauthorize_from_api(self):
+    def perform_unauthorize_from_api(self, refresh_cache=False,
+                                     detailed=False):
         """
         Retrieves data from SEMA API, and unauthorizes existing objects
         not in data.
 
+        :param refresh_cache: whether or not to bypass cached API
+            responses (and refresh cache)
+        :type refresh_cache: bool
+        :param detailed: whether or not to return a message per
+            unauthorized object, instead of a summary
+        :type detailed: bool
+
         :return: info, success, and/or error messages
         :rtype: list
 
@@ -5044,19 +5365,29 @@ class SemaBaseManager(Manager):
         msgs = []
 
         try:
-            data = self.get_api_data()
-            msgs += self.unauthorize_from_api_data(data=data)
+            data = self.get_api_data(refresh_cache=refresh_cache)
+            msgs += self.unauthorize_from_api_data(
+                data=data,
+                detailed=detailed
+            )
         except Exception as err:
             msgs.append(self.model.get_class_error_msg(str(err)))
             return msgs
 
         return msgs
 
-    def perform_api_sync(self):
+    def perform_api_sync(self, refresh_cache=False, detailed=False):
         """
         Retrieves data from SEMA API, and creates and updates objects in
         data, and unauthorizes existing objects not in data.
 
+        :param refresh_cache: whether or not to bypass cached API
+            responses (and refresh cache)
+        :type refresh_cache: bool
+        :param detailed: whether or not to return a message per
+            unauthorized object, instead of a summary
+        :type detailed: bool
+
         :return: info, success, and/or error messages
         :rtype: list
 
@@ -5065,9 +5396,12 @@ class SemaBaseManager(Manager):
         msgs = []
 
         try:
-            data = self.get_api_data()
+            data = self.get_api_data(refresh_cache=refresh_cache)
             msgs += self.import_from_api_data(data=data, new_only=False)
-            msgs += self.unauthorize_from_api_data(data=data)
+            msgs += self.unauthorize_from_api_data(
+                data=data,
+                detailed=detailed
+            )
         except Exception as err:
             msgs.append(self.model.get_class_error_msg(str(err)))
             return msgs
@@ -5078,20 +5412,30 @@ class SemaBaseManager(Manager):
     # </editor-fold>
 
     # <editor-fold desc="data properties ...">
-    def get_api_data(self, **filters):
+    def get_api_data(self, refresh_cache=False, stream=False, **filters):
         """
         Retrieves and cleans data from SEMA API.
 
+        :param refresh_cache: whether or not to bypass cached API
+            responses (and refresh cache)
+        :type refresh_cache: bool
+        :param stream: whether or not to return data as an iterator
+            that is retrieved and cleaned as it is consumed (if manager
+            can stream API data)
+        :type stream: bool
         :param filters: kwargs by which to filter data retrieve
 
         :return: clean API data
-        :rtype: list
+        :rtype: list (or iterator if streamed)
 
         """
 
         try:
             filters = self.get_retrieve_data_from_api_params(**filters)
-            data = self.retrieve_data_from_api(**filters)
+            if stream and self.can_stream_api_data:
+                filters['stream'] = True
+            with sema_client.response_cache.refreshing(refresh_cache):
+                data = self.retrieve_data_from_api(**filters)
             clean_data = self.clean_api_data(data=data)
             return clean_data
         except Exception:
@@ -5185,10 +5529,46 @@ class SemaBaseManager(Manager):
     # </editor-fold>
 
     # <editor-fold desc="import properties ...">
-    def import_from_api_data(self, data, new_only=False):
+    def import_from_api_data(self, data, new_only=False, bulk=None):
         """
         Retrieves and creates and/or updates objects from API data.
 
+        :param data: API data
+        :type data: list
+        :param new_only: whether or not to skip updating existing
+            objects
+        :type new_only: bool
+        :param bulk: whether or not to import in chunks with bulk
+            queries (defaults to SEMA_BULK_IMPORT setting)
+        :type bulk: bool
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        """
+
+        if bulk is None:
+            bulk = settings.SEMA_BULK_IMPORT
+
+        try:
+            if bulk:
+                return self.bulk_import_from_api_data(
+                    data=data,
+                    new_only=new_only
+                )
+            return self.import_items_from_api_data(
+                data=data,
+                new_only=new_only
+            )
+        finally:
+            if self.invalidates_vehicle_resolver:
+                vehicle_resolver.invalidate()
+
+    def import_items_from_api_data(self, data, new_only=False):
+        """
+        Creates and/or updates objects from API data, one item at a
+        time.
+
         :param data: API data
         :type data: list
         :param new_only: whether or not to skip updating existing
@@ -5211,13 +5591,506 @@ class SemaBaseManager(Manager):
             try:
                 obj = self.get_object_from_api_data(pk=pk, **fields)
                 if not new_only:
-                    msgs.append(obj.update_from_api_data(**fields))
+                    msgs.append(
+                        obj.update_from_api_data(
+                            **self.get_update_fields(**fields)
+                        )
+                    )
             except self.model.DoesNotExist:
                 msgs.append(self.create_from_api_data(pk=pk, **fields))
             except Exception as err:
                 msgs.append(self.model.get_class_error_msg(f"{item}: {err}"))
         return msgs
 
+    def bulk_import_from_api_data(self, data, new_only=False):
+        """
+        Creates and/or updates objects from API data in chunks. Existing
+        objects of each chunk are retrieved in one query and compared
+        in memory, and new and changed objects are written with bulk
+        queries. Many-to-many values are added once all chunks are
+        written, so they may refer to objects later in data. If a
+        chunk cannot be written in bulk, its items are imported one by
+        one.
+
+        :param data: API data
+        :type data: list (or iterator)
+        :param new_only: whether or not to skip updating existing
+            objects
+        :type new_only: bool
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        """
+
+        msgs = []
+        chunk = {}
+        m2m_updates = {}
+        for item in data:
+            try:
+                pk, fields = self.parse_api_data(data=item)
+                key = self.get_import_key(pk=pk, **fields)
+            except Exception as err:
+                msgs.append(self.model.get_class_error_msg(f"{item}: {err}"))
+                continue
+
+            # A repeated object is written before its next occurrence
+            # is compared, as it would be when importing item by item.
+            if key in chunk:
+                msgs += self.bulk_import_chunk_from_api_data(
+                    chunk=chunk,
+                    new_only=new_only,
+                    m2m_updates=m2m_updates
+                )
+                chunk = {}
+            chunk[key] = (item, pk, fields)
+            if len(chunk) >= settings.SEMA_IMPORT_CHUNK_SIZE:
+                msgs += self.bulk_import_chunk_from_api_data(
+                    chunk=chunk,
+                    new_only=new_only,
+                    m2m_updates=m2m_updates
+                )
+                chunk = {}
+
+        if chunk:
+            msgs += self.bulk_import_chunk_from_api_data(
+                chunk=chunk,
+                new_only=new_only,
+                m2m_updates=m2m_updates
+            )
+        msgs += self.bulk_import_m2m_from_api_data(m2m_updates=m2m_updates)
+        return msgs
+
+    def bulk_import_chunk_from_api_data(self, chunk, new_only,
+                                        m2m_updates):
+        """
+        Creates and/or updates objects of a chunk of API data with bulk
+        queries, and collects many-to-many values to be added.
+
+        :param chunk: PK and field/value kwargs of API data items by
+            import key
+        :type chunk: dict
+        :param new_only: whether or not to skip updating existing
+            objects
+        :type new_only: bool
+        :param m2m_updates: pending many-to-many updates by import key,
+            to which updates of chunk are added
+        :type m2m_updates: dict
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        **-M2M Updates Format-**
+            .. code-block:: python
+                {
+                    <import key>: {
+                        "pk": <PK>,
+                        "fields": <field/value kwargs>,
+                        "previous": <state> (or None if created),
+                        "values": {<M2M field name>: <set of PKs>}
+                    }
+                }
+
+        """
+
+        msgs = []
+
+        m2m_attrs = self.get_m2m_attrs(
+            attr for _, _, fields in chunk.values() for attr in fields
+        )
+        try:
+            existing = self.get_objects_by_import_key(
+                keys=chunk.keys(),
+                m2m_attrs=m2m_attrs
+            )
+            existing_m2m_pks = self.get_existing_m2m_pks_by_pk(
+                pks=[obj.pk for obj in existing.values()],
+                values={
+                    attr: {
+                        fields[attr] for _, _, fields in chunk.values()
+                        if attr in fields
+                    }
+                    for attr in m2m_attrs
+                }
+            )
+        except Exception as err:
+            msgs.append(self.model.get_class_error_msg(str(err)))
+            return msgs
+
+        new_objs = {}
+        changed_objs = {}
+        unchanged_objs = {}
+        previous = {}
+        update_attrs = set()
+        chunk_m2m_updates = {}
+        for key, (item, pk, fields) in chunk.items():
+            obj = existing.get(key)
+            if obj and new_only:
+                continue
+
+            try:
+                m2m_fields = {}
+                create_fields = {}
+                for attr, value in fields.items():
+                    if isinstance(
+                            self.model._meta.get_field(attr),
+                            ManyToManyField):
+                        m2m_fields[attr] = value
+                    else:
+                        create_fields[attr] = value
+            except Exception as err:
+                msgs.append(self.model.get_class_error_msg(f"{item}: {err}"))
+                continue
+
+            if obj:
+                previous[key] = obj.state
+                changed = [
+                    attr for attr, value in self.get_update_fields(
+                        **create_fields
+                    ).items()
+                    if not getattr(obj, attr) == value
+                ]
+                for attr in changed:
+                    setattr(obj, attr, create_fields[attr])
+                update_attrs.update(changed)
+                if changed:
+                    changed_objs[key] = obj
+                else:
+                    unchanged_objs[key] = obj
+            else:
+                new_objs[key] = self.model(pk=pk, **create_fields)
+
+            for attr, value in m2m_fields.items():
+                if obj and (obj.pk, value) in existing_m2m_pks[attr]:
+                    continue
+                if key not in chunk_m2m_updates:
+                    chunk_m2m_updates[key] = {
+                        'pk': pk,
+                        'fields': fields,
+                        'previous': previous.get(key),
+                        'values': defaultdict(set)
+                    }
+                chunk_m2m_updates[key]['values'][attr].add(value)
+
+        try:
+            with transaction.atomic():
+                self.bulk_create(
+                    new_objs.values(),
+                    batch_size=settings.SEMA_IMPORT_CHUNK_SIZE
+                )
+                if changed_objs:
+                    self.bulk_update(
+                        changed_objs.values(),
+                        fields=[
+                            self.model._meta.get_field(attr).name
+                            for attr in update_attrs
+                        ],
+                        batch_size=settings.SEMA_IMPORT_CHUNK_SIZE
+                    )
+        except Exception:
+            msgs += self.import_items_from_api_data(
+                data=[item for item, _, _ in chunk.values()],
+                new_only=new_only
+            )
+            return msgs
+
+        for key, update in chunk_m2m_updates.items():
+            if key in m2m_updates:
+                for attr, values in update['values'].items():
+                    m2m_updates[key]['values'][attr].update(values)
+            else:
+                m2m_updates[key] = update
+
+        try:
+            written = self.get_objects_by_import_key(
+                keys=list(new_objs.keys()) + list(changed_objs.keys()),
+                m2m_attrs=m2m_attrs
+            )
+        except Exception as err:
+            msgs.append(self.model.get_class_error_msg(str(err)))
+            return msgs
+
+        for key in chunk:
+            if key in m2m_updates:
+                continue
+            elif key in new_objs:
+                msgs.append(written[key].get_create_success_msg())
+            elif key in changed_objs:
+                msgs.append(
+                    written[key].get_update_success_msg(
+                        previous_data=previous[key],
+                        new_data=written[key].state
+                    )
+                )
+            elif key in unchanged_objs:
+                msgs.append(unchanged_objs[key].get_instance_up_to_date_msg())
+        return msgs
+
+    def bulk_import_m2m_from_api_data(self, m2m_updates):
+        """
+        Adds pending many-to-many values of imported objects by
+        inserting rows into through tables, and returns messages of
+        their creates or updates.
+
+        :param m2m_updates: pending many-to-many updates by import key
+        :type m2m_updates: dict
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        """
+
+        msgs = []
+        keys = list(m2m_updates.keys())
+        chunk_size = settings.SEMA_IMPORT_CHUNK_SIZE
+        for i in range(0, len(keys), chunk_size):
+            chunk = {key: m2m_updates[key] for key in keys[i:i + chunk_size]}
+            m2m_attrs = self.get_m2m_attrs(
+                attr for update in chunk.values() for attr in update['values']
+            )
+            try:
+                objs = self.get_objects_by_import_key(
+                    keys=chunk.keys(),
+                    m2m_attrs=m2m_attrs
+                )
+                related_pks = self.get_existing_m2m_pks(updates=chunk)
+            except Exception as err:
+                msgs.append(self.model.get_class_error_msg(str(err)))
+                continue
+
+            errors = {}
+            through_objs = defaultdict(list)
+            for key, update in chunk.items():
+                obj = objs[key]
+                for attr, values in update['values'].items():
+                    field = self.model._meta.get_field(attr)
+                    through = field.remote_field.through
+                    for value in values:
+                        if value not in related_pks[attr]:
+                            errors[key] = (
+                                f"{field.related_model.__name__} "
+                                f"{value} does not exist"
+                            )
+                            continue
+                        through_objs[through].append(
+                            through(
+                                **{
+                                    f'{field.m2m_field_name()}_id': obj.pk,
+                                    f'{field.m2m_reverse_field_name()}_id':
+                                        value
+                                }
+                            )
+                        )
+
+            try:
+                with transaction.atomic():
+                    for through, rows in through_objs.items():
+                        through.objects.bulk_create(
+                            rows,
+                            batch_size=chunk_size,
+                            ignore_conflicts=True
+                        )
+                objs = self.get_objects_by_import_key(
+                    keys=chunk.keys(),
+                    m2m_attrs=m2m_attrs
+                )
+            except Exception as err:
+                msgs.append(self.model.get_class_error_msg(str(err)))
+                continue
+
+            for key, update in chunk.items():
+                obj = objs[key]
+                if update['previous'] is None:
+                    if key in errors:
+                        msgs.append(
+                            self.model.get_class_error_msg(
+                                f"{update['pk']}, {update['fields']}, "
+                                f"{errors[key]}"
+                            )
+                        )
+                    else:
+                        msgs.append(obj.get_create_success_msg())
+                elif key in errors:
+                    msgs.append(
+                        obj.get_instance_error_msg(
+                            f"{update['fields']}, {errors[key]}"
+                        )
+                    )
+                else:
+                    msgs.append(
+                        obj.get_update_success_msg(
+                            previous_data=update['previous'],
+                            new_data=obj.state
+                        )
+                    )
+        return msgs
+
+    def get_existing_m2m_pks(self, updates):
+        """
+        Returns PKs of existing related objects of many-to-many values
+        of updates, by field name.
+
+        :param updates: many-to-many updates by import key
+        :type updates: dict
+
+        :return: existing related object PKs by field name
+        :rtype: dict
+
+        """
+
+        values = defaultdict(set)
+        for update in updates.values():
+            for attr, attr_values in update['values'].items():
+                values[attr].update(attr_values)
+
+        try:
+            related_pks = {}
+            for attr, attr_values in values.items():
+                field = self.model._meta.get_field(attr)
+                related_pks[attr] = set(
+                    field.related_model._default_manager.filter(
+                        pk__in=attr_values
+                    ).values_list('pk', flat=True)
+                )
+            return related_pks
+        except Exception:
+            raise
+
+    def get_existing_m2m_pks_by_pk(self, pks, values):
+        """
+        Returns existing (object PK, related object PK) pairs of
+        objects and many-to-many values, by field name, with one
+        through table query per field.
+
+        :param pks: object PKs
+        :type pks: list
+        :param values: related object PKs by field name
+        :type values: dict
+
+        :return: existing PK pairs by field name
+        :rtype: dict
+
+        """
+
+        try:
+            existing_pks = {}
+            for attr, attr_values in values.items():
+                existing_pks[attr] = set()
+                if not pks or not attr_values:
+                    continue
+                field = self.model._meta.get_field(attr)
+                source = f'{field.m2m_field_name()}_id'
+                target = f'{field.m2m_reverse_field_name()}_id'
+                existing_pks[attr] = set(
+                    field.remote_field.through.objects.filter(
+                        **{
+                            f'{source}__in': pks,
+                            f'{target}__in': attr_values
+                        }
+                    ).values_list(source, target)
+                )
+            return existing_pks
+        except Exception:
+            raise
+
+    def get_m2m_attrs(self, attrs):
+        """
+        Returns names of many-to-many fields among field names.
+
+        :param attrs: field names
+        :type attrs: iterable
+
+        :return: many-to-many field names
+        :rtype: set
+
+        """
+
+        return set(attrs) & {
+            field.name for field in self.model._meta.many_to_many
+        }
+
+    def get_import_key(self, pk, **fields):
+        """
+        Returns key that identifies object of API data item, made of
+        values of import key fields. Key fields other than PK are
+        required.
+
+        :param pk: object PK
+        :param fields: object field/value kwargs
+
+        :return: import key
+        :rtype: tuple
+
+        :raises Exception: on missing key field value
+
+        """
+
+        key = tuple(
+            pk if attr == 'pk' else fields.get(attr)
+            for attr in self.import_key_fields
+        )
+        if not self.import_key_fields == ('pk',) and not all(key):
+            raise Exception(f"{', '.join(self.import_key_fields)} required")
+        return key
+
+    def get_objects_by_import_key(self, keys, m2m_attrs=()):
+        """
+        Retrieves objects by import keys in one query, with related
+        objects and values of many-to-many fields.
+
+        :param keys: import keys
+        :type keys: list
+        :param m2m_attrs: names of many-to-many fields to prefetch
+            (those of API data, which object states may use)
+        :type m2m_attrs: iterable
+
+        :return: model instances by import key
+        :rtype: dict
+
+        :raises Exception: on general exception
+
+        """
+
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        try:
+            objs = self.get_queryset().select_related().prefetch_related(
+                *m2m_attrs
+            ).filter(
+                **{
+                    f'{self.import_key_fields[0]}__in': {
+                        key[0] for key in keys
+                    }
+                }
+            )
+            objs_by_key = {}
+            for obj in objs:
+                key = tuple(
+                    getattr(obj, attr) for attr in self.import_key_fields
+                )
+                if key in keys:
+                    objs_by_key[key] = obj
+            return objs_by_key
+        except Exception:
+            raise
+
+    def get_update_fields(self, **fields):
+        """
+        Returns field/value kwargs of API data item that may differ
+        from those of the existing object matched by its import key.
+        Can be overridden to leave out fields implied by import key.
+
+        :param fields: object field/value kwargs
+
+        :return: field/value kwargs to compare and update
+        :rtype: dict
+
+        """
+
+        return fields
+
     def parse_api_data(self, data):
         """
         Raises exception. Must be overridden with method that returns
@@ -5283,16 +6156,40 @@ class SemaBaseManager(Manager):
         except Exception as err:
             msg = self.model.get_class_error_msg(f"{pk}, {fields}, {err}")
         return msg
+
+    def get_unauthorized_pks(self, count):
+        """
+        Returns unused PKs for objects created unauthorized (objects
+        needed by API data, but not returned by their own endpoint),
+        from the range reserved for locally created objects.
+
+        :param count: number of PKs
+        :type count: int
+
+        :return: unused PKs
+        :rtype: list
+
+        :raises Exception: on general exception
+
+        """
+
+        try:
+            return local_id_allocator.allocate(model=self.model, count=count)
+        except Exception:
+            raise
     # </editor-fold>
 
     # <editor-fold desc="unauthorize properties ...">
-    def unauthorize_from_api_data(self, data):
+    def unauthorize_from_api_data(self, data, detailed=False):
         """
         Retrieves PKs of objects in data and unauthorizes any objects
         not in data.
 
         :param data: API data
         :type data: list
+        :param detailed: whether or not to return a message per
+            unauthorized object, instead of a summary
+        :type detailed: bool
 
         :return: info, success, and/or error messages
         :rtype: list
@@ -5303,14 +6200,101 @@ class SemaBaseManager(Manager):
 
         try:
             authorized_pks = self.get_pk_list_from_api_data(data=data)
-            unauthorized = self.model.objects.filter(~Q(pk__in=authorized_pks))
-            msgs += unauthorized.unauthorize()
+            msgs += self.unauthorize_all_except(
+                pks=authorized_pks,
+                detailed=detailed
+            )
         except Exception as err:
             msgs.append(self.model.get_class_error_msg(str(err)))
             return msgs
 
         return msgs
 
+    def unauthorize_all_except(self, pks, detailed=False):
+        """
+        Unauthorizes all authorized objects with PKs not in list, in a
+        single update statement. PKs are staged in a temporary table,
+        so the statement stays small however long the list.
+
+        :param pks: PKs of objects to leave authorized
+        :type pks: list
+        :param detailed: whether or not to return a message per
+            unauthorized object, instead of a summary
+        :type detailed: bool
+
+        :return: info or success messages
+        :rtype: list
+
+        :raises Exception: on general exception
+
+        """
+
+        quote_name = connection.ops.quote_name
+        table = quote_name(self.model._meta.db_table)
+        pk_column = quote_name(self.model._meta.pk.column)
+        authorized_column = quote_name(
+            self.model._meta.get_field('is_authorized').column
+        )
+
+        try:
+            msgs = []
+            objs = []
+            with transaction.atomic(), staged_values(
+                    values=pks,
+                    db_type=self.model._meta.pk.rel_db_type(connection),
+                    name=f'{self.model._meta.db_table}_authorized'
+            ) as staged, connection.cursor() as cursor:
+                condition = (
+                    f'{table}.{authorized_column} = %s AND NOT EXISTS ('
+                    f'SELECT 1 FROM {staged} '
+                    f'WHERE {staged}.value = {table}.{pk_column})'
+                )
+                if detailed:
+                    cursor.execute(
+                        f'SELECT {pk_column} FROM {table} WHERE {condition}',
+                        [True]
+                    )
+                    unauthorized_pks = [row[0] for row in cursor.fetchall()]
+                    for chunk in chunkify_list(
+                            unauthorized_pks,
+                            chunk_size=settings.SEMA_IMPORT_CHUNK_SIZE):
+                        objs += list(
+                            self.get_queryset().select_related().filter(
+                                pk__in=chunk
+                            )
+                        )
+                cursor.execute(
+                    f'UPDATE {table} SET {authorized_column} = %s '
+                    f'WHERE {condition}',
+                    [False, True]
+                )
+                count = cursor.rowcount
+
+            if detailed:
+                for obj in objs:
+                    previous = obj.state
+                    obj.is_authorized = False
+                    msgs.append(
+                        obj.get_update_success_msg(
+                            previous_data=previous,
+                            new_data=obj.state
+                        )
+                    )
+            elif count:
+                msgs.append(
+                    self.model.get_class_success_msg(f"{count} unauthorized")
+                )
+
+            if not msgs:
+                msgs.append(
+                    self.model.get_class_up_to_date_msg(
+                        message="nothing to unauthorize"
+                    )
+                )
+            return msgs
+        except Exception:
+            raise
+
     def get_pk_list_from_api_data(self, data):
         """
         Raises exception. Must be overridden with method that returns a
@@ -7155,10 +8139,12 @@ class SemaDatasetManager(SemaBaseManager):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_dataset_categories_update_from_api(self, **filters):
+    def perform_dataset_categories_update_from_api(self, full_sync=False,
+                                                   **filters):
         msgs = []
         try:
             msgs += self.get_queryset().perform_dataset_categories_update_from_api(
+                full_sync=full_sync,
                 **filters
             )
         except Exception as err:
@@ -7168,10 +8154,12 @@ class SemaDatasetManager(SemaBaseManager):
             msgs.append(self.model.get_class_up_to_date_msg())
         return msgs
 
-    def perform_dataset_vehicles_update_from_api(self):
+    def perform_dataset_vehicles_update_from_api(self, full_sync=False):
         msgs = []
         try:
-            msgs += self.get_queryset().perform_dataset_vehicles_update_from_api()
+            msgs += self.get_queryset().perform_dataset_vehicles_update_from_api(
+                full_sync=full_sync
+            )
         except Exception as err:
             msgs.append(self.model.get_class_error_msg(str(err)))
 
@@ -7187,6 +8175,8 @@ class SemaYearManager(SemaBaseManager):
 
     """
 
+    invalidates_vehicle_resolver = True
+
     def get_queryset(self):
         return SemaYearQuerySet(
             self.model,
@@ -7608,6 +8598,8 @@ class SemaMakeManager(SemaBaseManager):
 
     """
 
+    invalidates_vehicle_resolver = True
+
     def get_queryset(self):
         return SemaMakeQuerySet(
             self.model,
@@ -7622,9 +8614,7 @@ class SemaMakeManager(SemaBaseManager):
             make = self.get(name=make_name)
             created = False
         except self.model.DoesNotExist:
-            pk = randint(1000000, 9999999)
-            while self.model.objects.filter(pk=pk).exists():
-                pk = randint(1000000, 9999999)
+            pk, = self.get_unauthorized_pks(count=1)
             make = self.create(
                 make_id=pk,
                 name=make_name,
@@ -7998,6 +8988,8 @@ class SemaModelManager(SemaBaseManager):
 
     """
 
+    invalidates_vehicle_resolver = True
+
     def get_queryset(self):
         return SemaModelQuerySet(
             self.model,
@@ -8014,9 +9006,7 @@ class SemaModelManager(SemaBaseManager):
         except MultipleObjectsReturned:
             raise
         except self.model.DoesNotExist:
-            pk = randint(1000000, 9999999)
-            while self.model.objects.filter(pk=pk).exists():
-                pk = randint(1000000, 9999999)
+            pk, = self.get_unauthorized_pks(count=1)
             model = self.create(
                 model_id=pk,
                 name=model_name,
@@ -8332,6 +9322,8 @@ class SemaSubmodelManager(SemaBaseManager):
 
     """
 
+    invalidates_vehicle_resolver = True
+
     def get_queryset(self):
         return SemaSubmodelQuerySet(
             self.model,
@@ -8346,9 +9338,7 @@ class SemaSubmodelManager(SemaBaseManager):
             submodel = self.get(name=submodel_name)
             created = False
         except self.model.DoesNotExist:
-            pk = randint(1000000, 9999999)
-            while self.model.objects.filter(pk=pk).exists():
-                pk = randint(1000000, 9999999)
+            pk, = self.get_unauthorized_pks(count=1)
             submodel = self.create(
                 submodel_id=pk,
                 name=submodel_name,
@@ -8490,6 +9480,9 @@ class SemaMakeYearManager(SemaBaseManager):
 
     """
 
+    import_key_fields = ('year_id', 'make_id')
+    invalidates_vehicle_resolver = True
+
     def get_queryset(self):
         return SemaMakeYearQuerySet(
             self.model,
@@ -8540,28 +9533,31 @@ class SemaMakeYearManager(SemaBaseManager):
             raise
 
     def get_or_create_by_names(self, year, make_name):
+        """
+        Returns make year object by year and make name, resolved from
+        memory, and creates it (unauthorized) if it does not exist.
+
+        :type year: int
+        :type make_name: str
+
+        :return: make year object, and whether or not it was created
+        :rtype: tuple
+
+        :raises: Exception on resolve or get exception
+
+        """
+
+        key = vehicle_resolver.get_key(year, make_name)
         try:
-            make_year = self.get_by_names(
-                year=year,
-                make_name=make_name
+            objs, created, errors = vehicle_resolver.resolve_objects(
+                queryset=self.all(),
+                keys=[key]
             )
-            created = False
-        except self.model.DoesNotExist:
-            from sema.models import SemaYear, SemaMake
-            year, created = SemaYear.objects.get_or_create(year=year)
-            if created:
-                print(f'Created unauthorized year {year}')
-            make, _ = SemaMake.objects.get_or_create_by_names(
-                make_name=make_name
-            )
-            make_year = self.create(
-                year=year,
-                make=make,
-                is_authorized=False
-            )
-            created = True
-            print(f'Created unauthorized make year {make_year}')
-        return make_year, created
+            if key in errors:
+                raise errors[key]
+            return objs[key], key in created
+        except Exception:
+            raise
 
     # <editor-fold desc="retrieve properties ...">
     def retrieve_data_from_api(self, years, brand_ids=None,
@@ -9055,6 +10051,8 @@ class SemaBaseVehicleManager(SemaBaseManager):
 
     """
 
+    invalidates_vehicle_resolver = True
+
     def get_queryset(self):
         return SemaBaseVehicleQuerySet(
             self.model,
@@ -9109,48 +10107,33 @@ class SemaBaseVehicleManager(SemaBaseManager):
             raise
 
     def get_or_create_by_names(self, year, make_name, model_name):
+        """
+        Returns base vehicle object by year, make name, and model name,
+        resolved from memory, and creates it (unauthorized) if it does
+        not exist.
+
+        :type year: int
+        :type make_name: str
+        :type model_name: str
+
+        :return: base vehicle object, and whether or not it was created
+        :rtype: tuple
+
+        :raises: Exception on resolve or get exception
+
+        """
+
+        key = vehicle_resolver.get_key(year, make_name, model_name)
         try:
-            base_vehicle = self.get_by_names(
-                year=year,
-                make_name=make_name,
-                model_name=model_name
-            )
-            created = False
-        except self.model.DoesNotExist:
-            from sema.models import SemaMakeYear, SemaModel
-            make_year, _ = SemaMakeYear.objects.get_or_create_by_names(
-                year=year,
-                make_name=make_name
-            )
-            try:
-                model, _ = SemaModel.objects.get_or_create_by_names(
-                    model_name=model_name
-                )
-            except MultipleObjectsReturned:  # FIXME
-                if make_name == 'Chrysler':
-                    model = SemaModel.objects.get(
-                        model_id=2489,
-                        name=model_name
-                    )
-                elif make_name == 'GMC':
-                    model = SemaModel.objects.get(
-                        model_id=21430,
-                        name=model_name
-                    )
-                else:
-                    raise
-            pk = randint(1000000, 9999999)
-            while self.model.objects.filter(pk=pk).exists():
-                pk = randint(1000000, 9999999)
-            base_vehicle = self.create(
-                base_vehicle_id=pk,
-                make_year=make_year,
-                model=model,
-                is_authorized=False
+            objs, created, errors = vehicle_resolver.resolve_objects(
+                queryset=self.all(),
+                keys=[key]
             )
-            created = True
-            print(f'Created unauthorized base vehicle {base_vehicle}')
-        return base_vehicle, created
+            if key in errors:
+                raise errors[key]
+            return objs[key], key in created
+        except Exception:
+            raise
 
     # <editor-fold desc="retrieve properties ...">
     def retrieve_data_from_api(self, make_years, brand_ids=None,
@@ -9834,7 +10817,9 @@ class SemaBaseVehicleManager(SemaBaseManager):
         try:
             if 'make_years' not in params:
                 from sema.models import SemaMakeYear
-                make_years = SemaMakeYear.objects.filter(is_authorized=True)
+                make_years = SemaMakeYear.objects.filter(
+                    is_authorized=True
+                ).select_related('year', 'make')
                 params['make_years'] = make_years
             params['annotated'] = True
             return params
@@ -9984,6 +10969,8 @@ class SemaVehicleManager(SemaBaseManager):
 
     """
 
+    invalidates_vehicle_resolver = True
+
     def get_queryset(self):
         return SemaVehicleQuerySet(
             self.model,
@@ -10045,36 +11032,71 @@ class SemaVehicleManager(SemaBaseManager):
 
     def get_or_create_by_names(self, year, make_name,
                                model_name, submodel_name):
+        """
+        Returns vehicle object by year, make name, model name, and
+        submodel name, resolved from memory, and creates it
+        (unauthorized) if it does not exist.
+
+        :type year: int
+        :type make_name: str
+        :type model_name: str
+        :type submodel_name: str
+
+        :return: vehicle object, and whether or not it was created
+        :rtype: tuple
+
+        :raises: Exception on resolve or get exception
+
+        """
+
+        key = vehicle_resolver.get_key(
+            year,
+            make_name,
+            model_name,
+            submodel_name
+        )
         try:
-            vehicle = self.get_by_names(
-                year=year,
-                make_name=make_name,
-                model_name=model_name,
-                submodel_name=submodel_name
+            objs, created, errors = vehicle_resolver.resolve_objects(
+                queryset=self.all(),
+                keys=[key]
             )
-            created = False
-        except self.model.DoesNotExist:
-            from sema.models import SemaBaseVehicle, SemaSubmodel
-            base_vehicle, _ = SemaBaseVehicle.objects.get_or_create_by_names(
-                year=year,
-                make_name=make_name,
-                model_name=model_name
-            )
-            submodel, _ = SemaSubmodel.objects.get_or_create_by_names(
-                submodel_name=submodel_name
-            )
-            pk = randint(1000000, 9999999)
-            while self.model.objects.filter(pk=pk).exists():
-                pk = randint(1000000, 9999999)
-            vehicle = self.model.objects.create(
-                vehicle_id=pk,
-                base_vehicle=base_vehicle,
-                submodel=submodel,
-                is_authorized=False
+            if key in errors:
+                raise errors[key]
+            return objs[key], key in created
+        except Exception:
+            raise
+
+    def get_or_create_many_by_names(self, names):
+        """
+        Returns vehicle objects by year, make name, model name, and
+        submodel name, resolved from memory, and creates missing ones
+        (unauthorized) in batches.
+
+        :param names: (year, make name, model name, submodel name)
+            tuples
+        :type names: iterable
+
+        :return: vehicle objects by resolver key, and exceptions by
+            resolver key of unresolved names
+        :rtype: tuple
+
+        :raises: Exception on resolve or get exception
+
+        """
+
+        try:
+            objs, _, errors = vehicle_resolver.resolve_objects(
+                queryset=self.select_related(
+                    'base_vehicle__make_year__year',
+                    'base_vehicle__make_year__make',
+                    'base_vehicle__model',
+                    'submodel'
+                ),
+                keys=names
             )
-            created = True
-            print(f'Created unauthorized vehicle {vehicle}')
-        return vehicle, created
+            return objs, errors
+        except Exception:
+            raise
 
     # <editor-fold desc="retrieve properties ...">
     def retrieve_data_from_api(self, base_vehicles, brand_ids=None,
@@ -10613,6 +11635,10 @@ class SemaVehicleManager(SemaBaseManager):
                 from sema.models import SemaBaseVehicle
                 base_vehicles = SemaBaseVehicle.objects.filter(
                     is_authorized=True
+                ).select_related(
+                    'make_year__year',
+                    'make_year__make',
+                    'model'
                 )
                 params['base_vehicles'] = base_vehicles
             params['annotated'] = True
@@ -10765,6 +11791,8 @@ class SemaEngineManager(SemaBaseManager):
 
     """
 
+    import_key_fields = ('fingerprint',)
+
     def get_queryset(self):
         return SemaEngineQuerySet(
             self.model,
@@ -10845,7 +11873,8 @@ class SemaEngineManager(SemaBaseManager):
     def parse_api_data(self, data):
         """
         Returns NoneType (because PK is not defined in API data) and
-        field/value dictionary from API data item.
+        field/value dictionary, with engine fingerprint, from API data
+        item.
 
         :param data: API data item
         :type data: dict
@@ -10853,7 +11882,8 @@ class SemaEngineManager(SemaBaseManager):
         :return: object PK and field/value dictionary
         :rtype: tuple
 
-        :raises Exception: on general exception
+        :raises Exception: missing engine fields, or on general
+            exception
 
         **-Expected Data Format-**
         ::
@@ -10902,7 +11932,8 @@ class SemaEngineManager(SemaBaseManager):
                 "manufacturer": <str>,
                 "horse_power": <str>,
                 "kilowatt_power": <str>,
-                "engine_designation": <str>
+                "engine_designation": <str>,
+                "fingerprint": <str>
             }
 
         """
@@ -10930,77 +11961,12 @@ class SemaEngineManager(SemaBaseManager):
                 'kilowatt_power': data['KilowattPower'],
                 'engine_designation': data['EngineDesignationName']
             }
-            return None, fields
         except Exception:
             raise
 
-    def get_object_from_api_data(self, vehicle_id=None, litre=None,
-                                 cc=None, cid=None, cylinders=None,
-                                 block_type=None, engine_bore_in=None,
-                                 engine_bore_metric=None,
-                                 engine_stroke_in=None,
-                                 engine_stroke_metric=None,
-                                 valves_per_engine=None, aspiration=None,
-                                 cylinder_head_type=None, fuel_type=None,
-                                 ignition_system_type=None, manufacturer=None,
-                                 horse_power=None, kilowatt_power=None,
-                                 engine_designation=None, **kwargs):
-        """
-        Returns object by all engine fields.
-
-        :param vehicle_id: vehicle ID field value
-        :type vehicle_id: int
-        :param litre: litre field value
-        :type litre: str
-        :param cc: CC field value
-        :type cc: str
-        :param cid: CID field value
-        :type cid: str
-        :param cylinders: cylinders field value
-        :type cylinders: str
-        :param block_type: block type field value
-        :type block_type: str
-        :param engine_bore_in: engine bore inches field value
-        :type engine_bore_in: str
-        :param engine_bore_metric: engine bore metric field value
-        :type engine_bore_metric: str
-        :param engine_stroke_in: engine stroke inches field value
-        :type engine_stroke_in: str
-        :param engine_stroke_metric: engine stroke metric field value
-        :type engine_stroke_metric: str
-        :param valves_per_engine: valves per engine field value
-        :type valves_per_engine: str
-        :param aspiration: aspiration field value
-        :type aspiration: str
-        :param cylinder_head_type: cylinder head type field value
-        :type cylinder_head_type: str
-        :param fuel_type: fuel type field value
-        :type fuel_type: str
-        :param ignition_system_type: ignition system type field value
-        :type ignition_system_type: str
-        :param manufacturer: manufacturer field value
-        :type manufacturer: str
-        :param horse_power: horse power field value
-        :type horse_power: str
-        :param kilowatt_power: kilowatt power field value
-        :type kilowatt_power: str
-        :param engine_designation: engine designation field value
-        :type engine_designation: str
-
-
-        :return: model instance
-        :rtype: object
-
-        :raises Exception: missing year_id or make_id, or on general
-            exception
-
-        """
-        if not (litre and cc and cid and cylinders and block_type
-                and engine_bore_in and engine_bore_metric
-                and engine_stroke_in and engine_stroke_metric
-                and valves_per_engine and aspiration and cylinder_head_type
-                and fuel_type and ignition_system_type and manufacturer
-                and horse_power and kilowatt_power and engine_designation):
+        if not all(
+                fields[attr] for attr in self.model.FINGERPRINT_FIELDS
+                if not attr == 'vehicle_id'):
             raise Exception(
                 'litre, CC, CID, cylinders, block type, engine bore inches,'
                 'engine bore metric, engine stroke inches, engine stroke '
@@ -11009,31 +11975,46 @@ class SemaEngineManager(SemaBaseManager):
                 'kilowatt power, and engine designation required'
             )
 
+        fields['fingerprint'] = self.model.get_fingerprint(**fields)
+        return None, fields
+
+    def get_object_from_api_data(self, fingerprint=None, **kwargs):
+        """
+        Returns object by engine fingerprint.
+
+        :param fingerprint: fingerprint field value
+        :type fingerprint: str
+
+        :return: model instance
+        :rtype: object
+
+        :raises Exception: on general exception
+
+        """
+
         try:
-            return self.get(
-                vehicle__vehicle_id=vehicle_id,
-                litre=litre,
-                cc=cc,
-                cid=cid,
-                cylinders=cylinders,
-                block_type=block_type,
-                engine_bore_in=engine_bore_in,
-                engine_bore_metric=engine_bore_metric,
-                engine_stroke_in=engine_stroke_in,
-                engine_stroke_metric=engine_stroke_metric,
-                valves_per_engine=valves_per_engine,
-                aspiration=aspiration,
-                cylinder_head_type=cylinder_head_type,
-                fuel_type=fuel_type,
-                ignition_system_type=ignition_system_type,
-                manufacturer=manufacturer,
-                horse_power=horse_power,
-                kilowatt_power=kilowatt_power,
-                engine_designation=engine_designation
-            )
+            return self.get(fingerprint=fingerprint)
         except Exception:
             raise
-    # </editor-fold
+
+    def get_update_fields(self, **fields):
+        """
+        Returns field/value kwargs of API data item other than those of
+        engine fingerprint, which are unchanged for objects matched by
+        fingerprint.
+
+        :param fields: object field/value kwargs
+
+        :return: field/value kwargs to compare and update
+        :rtype: dict
+
+        """
+
+        return {
+            attr: value for attr, value in fields.items()
+            if attr not in self.model.FINGERPRINT_FIELDS + ('fingerprint',)
+        }
+    # </editor-fold>
 
     # <editor-fold desc="unauthorize properties ...">
     def get_pk_list_from_api_data(self, data):
@@ -11085,33 +12066,20 @@ class SemaEngineManager(SemaBaseManager):
         """
 
         try:
-            pk_list = []
+            fingerprints = set()
             for item in data:
                 try:
-                    engine = self.get(
-                        vehicle__vehicle_id=data['VehicleID'],
-                        litre=data['Liter'],
-                        cc=data['CC'],
-                        cid=data['CID'],
-                        cylinders=data['Cylinders'],
-                        block_type=data['BlockType'],
-                        engine_bore_in=data['EngBoreIn'],
-                        engine_bore_metric=data['EngBoreMetric'],
-                        engine_stroke_in=data['EngStrokeIn'],
-                        engine_stroke_metric=data['EngStrokeMetric'],
-                        valves_per_engine=data['ValvesPerEngine'],
-                        aspiration=data['AspirationName'],
-                        cylinder_head_type=data['CylinderHeadTypeName'],
-                        fuel_type=data['FuelTypeName'],
-                        ignition_system_type=data['IgnitionSystemTypeName'],
-                        manufacturer=data['MfrName'],
-                        horse_power=data['HorsePower'],
-                        kilowatt_power=data['KilowattPower'],
-                        engine_designation=data['EngineDesignationName']
-                    )
-                    pk_list.append(engine.pk)
-                except self.model.DoesNotExist:
-                    pass
+                    _, fields = self.parse_api_data(data=item)
+                except Exception:
+                    continue
+                fingerprints.add(fields['fingerprint'])
+
+            pk_list = []
+            for chunk in chunkify_list(
+                    list(fingerprints), settings.SEMA_IMPORT_CHUNK_SIZE):
+                pk_list += self.filter(
+                    fingerprint__in=chunk
+                ).values_list('pk', flat=True)
             return pk_list
         except Exception:
             raise
@@ -11562,10 +12530,12 @@ class SemaCategoryManager(SemaBaseManager):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_category_products_update_from_api(self, **filters):
+    def perform_category_products_update_from_api(self, full_sync=False,
+                                                  **filters):
         msgs = []
         try:
             msgs += self.get_queryset().perform_category_products_update_from_api(
+                full_sync=full_sync,
                 **filters
             )
         except Exception as err:
@@ -12130,10 +13100,12 @@ class SemaProductManager(SemaBaseManager):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_product_vehicles_update_from_api(self):
+    def perform_product_vehicles_update_from_api(self, full_sync=False):
         msgs = []
         try:
-            msgs += self.get_queryset().perform_product_vehicles_update_from_api()
+            msgs += self.get_queryset().perform_product_vehicles_update_from_api(
+                full_sync=full_sync
+            )
         except Exception as err:
             msgs.append(self.model.get_class_error_msg(str(err)))
 
@@ -12175,6 +13147,48 @@ class SemaProductManager(SemaBaseManager):
             msgs.append(self.model.get_class_up_to_date_msg())
         return msgs
 
+    def perform_pies_attributes_update_from_api(self, pies_attr_models=None,
+                                                new_only=False,
+                                                refresh_cache=False,
+                                                **filters):
+        """
+        Retrieves products PIES attribute data from SEMA API in one
+        pass, and creates and/or updates PIES attribute objects of
+        each model.
+
+        :param pies_attr_models: SEMA PIES Attribute model classes
+            (defaults to description and digital assets models)
+        :type pies_attr_models: list
+        :param new_only: whether or not to skip updating existing
+            objects
+        :type new_only: bool
+        :param refresh_cache: whether or not to bypass cached API
+            responses (and refresh cache)
+        :type refresh_cache: bool
+        :param filters: kwargs by which to filter data retrieve
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        """
+
+        msgs = []
+        try:
+            msgs += self.get_queryset(
+            ).perform_pies_attributes_update_from_api(
+                pies_attr_models=pies_attr_models,
+                new_only=new_only,
+                refresh_cache=refresh_cache,
+                **filters
+            )
+        except Exception as err:
+            msgs.append(self.model.get_class_error_msg(str(err)))
+            return msgs
+
+        if not msgs:
+            msgs.append(self.model.get_class_up_to_date_msg())
+        return msgs
+
     def perform_product_html_update_from_api(self):
         """
         Retrieves products HTML data from SEMA API, and updates HTML
@@ -12205,6 +13219,8 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
     """
 
     DEFAULT_ATTRIBUTE_CODES = ['all']
+    can_stream_api_data = True
+    import_key_fields = ('product_id', 'segment')
 
     def get_queryset(self):
         return SemaBasePiesAttributeQuerySet(
@@ -12216,7 +13232,8 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
     def retrieve_data_from_api(self, products, base_vehicle_ids=None,
                                vehicle_ids=None, year=None,
                                make_name=None, model_name=None,
-                               submodel_name=None, annotated=False):
+                               submodel_name=None, annotated=False,
+                               stream=False):
         """
         Retrieves product and attribute data from SEMA API.
 
@@ -12236,9 +13253,13 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
         :type submodel_name: str
         :param annotated: whether or not to include filter annotation
         :type annotated: bool
+        :param stream: whether or not to return products as an
+            iterator that decodes them from response streams one at a
+            time
+        :type stream: bool
 
         :return: product and attribute data
-        :rtype: list
+        :rtype: list (or generator if streamed)
 
         :raises Exception: on general exception
 
@@ -12314,7 +13335,8 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
                 model_name=model_name,
                 submodel_name=submodel_name,
                 pies_segments=self.DEFAULT_ATTRIBUTE_CODES,
-                annotated=annotated
+                annotated=annotated,
+                stream=stream
             )
         except Exception:
             raise
@@ -12346,15 +13368,61 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
         except Exception:
             raise
 
+    def clean_api_data(self, data):
+        """
+        Cleans object data by flattening nested data and removing
+        duplicates. Streamed data is cleaned lazily, one product at a
+        time, as it is consumed.
+
+        :param data: API data
+        :type data: list (or iterator if streamed)
+
+        :return: clean API data
+        :rtype: list (or generator if streamed)
+
+        :raises Exception: on general exception
+
+        """
+
+        try:
+            if isinstance(data, list):
+                return super().clean_api_data(data=data)
+            return self.iter_unique_api_data(
+                data=self.flatten_api_data(data=data)
+            )
+        except Exception:
+            raise
+
+    @staticmethod
+    def iter_unique_api_data(data):
+        """
+        Yields data items, skipping duplicates. Only SHA-1 digests of
+        items are kept, so memory use is small relative to the data.
+
+        :param data: API data
+        :type data: iterable
+
+        :return: unique API data
+        :rtype: generator
+
+        """
+
+        seen = set()
+        for item in data:
+            key = sha1(repr(tuple(item.items())).encode('utf-8')).digest()
+            if key not in seen:
+                seen.add(key)
+                yield item
+
     def flatten_api_data(self, data):
         """
-        Flattens nested data and returns relevant key/values.
+        Flattens nested data and yields relevant key/values.
 
         :param data: API data
-        :type data: list
+        :type data: iterable
 
         :return: flat API data
-        :rtype: list
+        :rtype: generator
 
         :raises Exception: on general exception
 
@@ -12390,18 +13458,14 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
         """
 
         try:
-            flattened_data = []
             for product in data:
                 for pies_attribute in product['PiesAttributes']:
                     if pies_attribute['Value']:
-                        flattened_data.append(
-                            {
-                                'ProductId': product['ProductId'],
-                                'PiesSegment': pies_attribute['PiesSegment'],
-                                'Value': pies_attribute['Value']
-                            }
-                        )
-            return flattened_data
+                        yield {
+                            'ProductId': product['ProductId'],
+                            'PiesSegment': pies_attribute['PiesSegment'],
+                            'Value': pies_attribute['Value']
+                        }
         except Exception:
             raise
 
@@ -12448,8 +13512,26 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
         except Exception:
             raise
 
+    def is_attribute_segment(self, segment):
+        """
+        Returns whether or not PIES segment is one of the attribute
+        codes of manager.
+
+        :param segment: PIES segment
+        :type segment: str
+
+        :return: whether or not segment is of manager
+        :rtype: bool
+
+        """
+
+        return any(
+            code == 'all' or segment.startswith(code)
+            for code in self.DEFAULT_ATTRIBUTE_CODES
+        )
+
     def get_object_from_api_data(self, pk=None, product_id=None,
-                                 segment=None, value=None):
+                                 segment=None, **kwargs):
         """
         Returns object by product and segment.
 
@@ -12458,8 +13540,6 @@ class SemaBasePiesAttributeManager(SemaBaseManager):
         :type product_id: int
         :param segment: segment field value
         :type segment: str
-        :param value: placeholder for overridden value param
-        :type value: str
 
         :return: model instance
         :rtype: object
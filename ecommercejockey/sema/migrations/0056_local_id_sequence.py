@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def create_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE SEQUENCE IF NOT EXISTS sema_local_id_seq '
+            'MINVALUE 900000000 MAXVALUE 999999999 START 900000000'
+        )
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP SEQUENCE IF EXISTS sema_local_id_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sema', '0055_semapiesattributes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
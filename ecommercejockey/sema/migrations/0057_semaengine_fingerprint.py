@@ -0,0 +1,96 @@
+# Generated by Django 2.2.5 on 2026-10-16 20:20
+
+from hashlib import sha1
+
+from django.db import migrations, models
+
+
+# Frozen copy of the engine fingerprint at the time of this migration.
+FINGERPRINT_FIELDS = (
+    'vehicle_id',
+    'litre',
+    'cc',
+    'cid',
+    'cylinders',
+    'block_type',
+    'engine_bore_in',
+    'engine_bore_metric',
+    'engine_stroke_in',
+    'engine_stroke_metric',
+    'valves_per_engine',
+    'aspiration',
+    'cylinder_head_type',
+    'fuel_type',
+    'ignition_system_type',
+    'manufacturer',
+    'horse_power',
+    'kilowatt_power',
+    'engine_designation'
+)
+
+
+def get_fingerprint(engine):
+    spec = '\x1f'.join(
+        '' if getattr(engine, attr) is None
+        else str(getattr(engine, attr)).strip()
+        for attr in FINGERPRINT_FIELDS
+    )
+    return sha1(spec.encode('utf-8')).hexdigest()
+
+
+def set_fingerprints(apps, schema_editor):
+    SemaEngine = apps.get_model('sema', 'SemaEngine')
+    engines = {}
+    duplicate_pks = []
+    for engine in SemaEngine.objects.order_by('pk').iterator():
+        fingerprint = get_fingerprint(engine)
+        kept = engines.get(fingerprint)
+        if kept is None:
+            engine.fingerprint = fingerprint
+            engines[fingerprint] = engine
+            continue
+
+        # Duplicate engines are merged into the first (nothing else
+        # references engines), so every engine has a fingerprint.
+        kept.is_authorized = kept.is_authorized or engine.is_authorized
+        kept.is_relevant = kept.is_relevant or engine.is_relevant
+        kept.relevancy_exception = (
+            kept.relevancy_exception or engine.relevancy_exception
+        )
+        duplicate_pks.append(engine.pk)
+
+    for i in range(0, len(duplicate_pks), 1000):
+        SemaEngine.objects.filter(
+            pk__in=duplicate_pks[i:i + 1000]
+        ).delete()
+    SemaEngine.objects.bulk_update(
+        engines.values(),
+        fields=[
+            'fingerprint',
+            'is_authorized',
+            'is_relevant',
+            'relevancy_exception'
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sema', '0056_local_id_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semaengine',
+            name='fingerprint',
+            field=models.CharField(editable=False, help_text='hash of vehicle ID and engine spec', max_length=40, null=True),
+        ),
+        migrations.RunPython(set_fingerprints, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='semaengine',
+            name='fingerprint',
+            field=models.CharField(editable=False, help_text='hash of vehicle ID and engine spec', max_length=40, null=True, unique=True),
+        ),
+    ]
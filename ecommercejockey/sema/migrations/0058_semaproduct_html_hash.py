@@ -0,0 +1,18 @@
+# Generated by Django 2.2.5 on 2026-10-16 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sema', '0057_semaengine_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semaproduct',
+            name='html_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40, verbose_name='HTML hash'),
+        ),
+    ]
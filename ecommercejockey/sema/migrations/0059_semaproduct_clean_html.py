@@ -0,0 +1,18 @@
+# Generated by Django 2.2.5 on 2026-10-16 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sema', '0058_semaproduct_html_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semaproduct',
+            name='clean_html',
+            field=models.TextField(default='<html></html>', editable=False, verbose_name='clean HTML'),
+        ),
+    ]
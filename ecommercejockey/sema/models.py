@@ -4,12 +4,11 @@ This module defines all models for the SEMA app.
 """
 
 
-from urllib.request import urlopen
-from urllib.error import URLError, HTTPError
+from hashlib import sha1
 
-from bs4 import BeautifulSoup
 from slugify import slugify
 
+from django.conf import settings
 from django.db.models import (
     Model,
     BooleanField,
@@ -23,10 +22,12 @@ from django.db.models import (
     CASCADE
 )
 
+from core.links import link_checker
 from core.models import (
     NotesBaseModel,
     RelevancyBaseModel
 )
+from core.utils import reconcile_m2m
 from .clients import sema_client
 from .managers import (
     SemaBaseManager,
@@ -46,6 +47,8 @@ from .managers import (
     SemaYearManager,
     SemaVehicleManager
 )
+from .resolvers import vehicle_resolver
+from .sanitizers import SemaHtmlSanitizer, html_sanitizer
 
 
 class SemaBaseModel(RelevancyBaseModel):
@@ -125,6 +128,113 @@ class SemaBaseModel(RelevancyBaseModel):
         return msg
     # </editor-fold>
 
+    # <editor-fold desc="relation properties ...">
+    def reconcile_related_from_api_data(self, attr, items, full_sync=False):
+        """
+        Reconciles many-to-many relation with related objects in API
+        data, with one set-based reconcile.
+
+        :param attr: many-to-many field (or reverse relation) name
+        :type attr: str
+        :param items: (PK, label) of each related object in API data
+        :type items: list
+        :param full_sync: whether or not to also remove related objects
+            not in API data
+        :type full_sync: bool
+
+        :return: info, success, and/or error messages, per item in data
+            order, then per removed object
+        :rtype: list
+
+        """
+
+        msgs = []
+
+        try:
+            added, _, removed, missing = reconcile_m2m(
+                obj=self,
+                attr=attr,
+                pks=[pk for pk, _ in items],
+                remove=full_sync,
+                batch_size=settings.SEMA_IMPORT_CHUNK_SIZE
+            )
+            related_model = self._meta.get_field(attr).related_model
+            removed_objs = related_model.objects.filter(pk__in=removed)
+        except Exception as err:
+            msgs.append(self.get_instance_error_msg(str(err)))
+            return msgs
+
+        reported = set()
+        for pk, label in items:
+            if pk in missing:
+                msgs.append(
+                    self.get_instance_error_msg(f"{label} does not exist")
+                )
+            elif pk in added and pk not in reported:
+                msgs.append(
+                    self.get_update_success_msg(message=f"{label} added")
+                )
+            else:
+                msgs.append(
+                    self.get_instance_up_to_date_msg(
+                        message=f"{label} already added"
+                    )
+                )
+            reported.add(pk)
+        for related in removed_objs:
+            msgs.append(
+                self.get_update_success_msg(message=f"{related} removed")
+            )
+        return msgs
+
+    def reconcile_vehicles_from_api_data(self, vehicle_items,
+                                         full_sync=False):
+        """
+        Resolves (or creates) vehicles of vehicle API data items by
+        names, and reconciles vehicles relation with them. Full sync is
+        skipped if any item could not be resolved.
+
+        :param vehicle_items: vehicle API data items
+        :type vehicle_items: list
+        :param full_sync: whether or not to also remove vehicles not in
+            API data
+        :type full_sync: bool
+
+        :return: info, success, and/or error messages
+        :rtype: list
+
+        """
+
+        msgs = []
+        keys = []
+        for vehicle_item in vehicle_items:
+            try:
+                keys.append(vehicle_resolver.get_vehicle_key(vehicle_item))
+            except Exception as err:
+                msgs.append(self.get_instance_error_msg(str(err)))
+
+        try:
+            vehicles, errors = SemaVehicle.objects.get_or_create_many_by_names(
+                names=keys
+            )
+        except Exception as err:
+            msgs.append(self.get_instance_error_msg(str(err)))
+            return msgs
+
+        items = []
+        for key in keys:
+            if key in errors:
+                msgs.append(self.get_instance_error_msg(str(errors[key])))
+            else:
+                items.append((vehicles[key].pk, str(vehicles[key])))
+        msgs += self.reconcile_related_from_api_data(
+            attr='vehicles',
+            items=items,
+            full_sync=full_sync and len(msgs) == 0
+        )
+        return msgs
+    # </editor-fold>
+
     # <editor-fold desc="unauthorize properties ...">
     def unauthorize(self):
         """
@@ -3423,6 +3533,68 @@ class SemaEngine(SemaBaseModel):
     engine_designation = CharField(
         max_length=10
     )
+    fingerprint = CharField(
+        max_length=40,
+        unique=True,
+        null=True,
+        editable=False,
+        help_text='hash of vehicle ID and engine spec'
+    )
+
+    FINGERPRINT_FIELDS = (
+        'vehicle_id',
+        'litre',
+        'cc',
+        'cid',
+        'cylinders',
+        'block_type',
+        'engine_bore_in',
+        'engine_bore_metric',
+        'engine_stroke_in',
+        'engine_stroke_metric',
+        'valves_per_engine',
+        'aspiration',
+        'cylinder_head_type',
+        'fuel_type',
+        'ignition_system_type',
+        'manufacturer',
+        'horse_power',
+        'kilowatt_power',
+        'engine_designation'
+    )
+
+    # <editor-fold desc="fingerprint properties ...">
+    @classmethod
+    def get_fingerprint(cls, **fields):
+        """
+        Returns hash of canonical vehicle ID and engine spec, which
+        identifies an engine (engines have no SEMA ID).
+
+        :param fields: field/value kwargs, including all fingerprint
+            fields
+
+        :return: fingerprint
+        :rtype: str
+
+        .. Topic:: **-Canonical Spec-**
+
+            Values of fingerprint fields in order, as stripped strings
+            (empty if none), separated by unit separators.
+
+        """
+
+        spec = '\x1f'.join(
+            '' if fields.get(attr) is None else str(fields[attr]).strip()
+            for attr in cls.FINGERPRINT_FIELDS
+        )
+        return sha1(spec.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.get_fingerprint(
+            **{attr: getattr(self, attr) for attr in self.FINGERPRINT_FIELDS}
+        )
+        super().save(*args, **kwargs)
+    # </editor-fold>
 
     # <editor-fold desc="relevancy properties ...">
     @property
@@ -3896,8 +4068,18 @@ class SemaCategory(SemaBaseModel):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_category_products_update_from_api(self, **filters):
+    def perform_category_products_update_from_api(self, full_sync=False,
+                                                  **filters):
         msgs = []
+        if full_sync and filters:
+            # Filtered data is a subset, so full sync would remove the rest
+            msgs.append(
+                self.get_instance_error_msg(
+                    error="Full sync not allowed with filters"
+                )
+            )
+            return msgs
+
         try:
             if 'brand_ids' in filters or 'dataset_ids' in filters:
                 data = self.retrieve_products_by_category_data_from_api(
@@ -3915,41 +4097,24 @@ class SemaCategory(SemaBaseModel):
             msgs.append(self.get_instance_error_msg(str(err)))
             return msgs
 
+        items = []
         for item in data:
             if item['category_id_'] == self.category_id:
                 for product_item in item['products_']:
-                    try:
-                        if (product_item['ProductId']
-                                in self.products.values_list(
-                                    'product_id', flat=True)):
-                            msgs.append(
-                                self.get_instance_up_to_date_msg(
-                                    message=(
-                                        f"{product_item['PartNumber']} "
-                                        "already added"
-                                    )
-                                )
-                            )
-                        else:
-                            self.products.add(product_item['ProductId'])
-                            self.save()
-                            msgs.append(
-                                self.get_update_success_msg(
-                                    message=(
-                                        f"{product_item['PartNumber']} added"
-                                    )
-                                )
-                            )
-                    except Exception as err:
-                        msgs.append(self.get_instance_error_msg(str(err)))
-                        continue
+                    items.append(
+                        (product_item['ProductId'], product_item['PartNumber'])
+                    )
             else:
                 msgs.append(
                     self.get_instance_error_msg(
                         error="Incorrect category returned"
                     )
                 )
-                continue
+        msgs += self.reconcile_related_from_api_data(
+            attr='products',
+            items=items,
+            full_sync=full_sync and len(msgs) == 0
+        )
 
         if not msgs:
             msgs.append(self.get_instance_up_to_date_msg())
@@ -5586,7 +5751,8 @@ class SemaDataset(SemaBaseModel):
                                                  submodel_name=None,
                                                  part_numbers=None,
                                                  pies_segments=None,
-                                                 annotated=False):
+                                                 annotated=False,
+                                                 stream=False):
         """
         Retrieves dataset products data from SEMA API.
 
@@ -5608,11 +5774,16 @@ class SemaDataset(SemaBaseModel):
         :type pies_segments: list
         :param annotated: whether or not to include filter annotation
         :type annotated: bool
+        :param stream: whether or not to return products as an
+            iterator that decodes them from the response stream one at
+            a time
+        :type stream: bool
 
         :return: dataset products data
-        :rtype: list
+        :rtype: list (or generator if streamed)
 
-        :raises Exception: on general exception
+        :raises Exception: streamed and annotated, or on general
+            exception
 
         .. Topic:: **-Parameters-**
 
@@ -5627,6 +5798,8 @@ class SemaDataset(SemaBaseModel):
             Only one of `base_vehicle_ids`, `vehicle_ids`, or named
             year/make/model group allowed
 
+            `stream` not allowed with `annotated`
+
         .. Topic:: **-Parameters-**
 
             `year` requires `make_name` and `model_name`
@@ -5690,6 +5863,9 @@ class SemaDataset(SemaBaseModel):
 
         """
 
+        if stream and annotated:
+            raise Exception("Annotated data cannot be streamed")
+
         try:
             data = sema_client.retrieve_products_by_brand(
                 dataset_ids=[self.dataset_id],
@@ -5700,7 +5876,8 @@ class SemaDataset(SemaBaseModel):
                 model_name=model_name,
                 submodel_name=submodel_name,
                 part_numbers=part_numbers,
-                pies_segments=pies_segments
+                pies_segments=pies_segments,
+                stream=stream
             )
             if annotated:
                 data = {
@@ -6031,8 +6208,18 @@ class SemaDataset(SemaBaseModel):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_dataset_categories_update_from_api(self, **filters):
+    def perform_dataset_categories_update_from_api(self, full_sync=False,
+                                                   **filters):
         msgs = []
+        if full_sync and filters:
+            # Filtered data is a subset, so full sync would remove the rest
+            msgs.append(
+                self.get_instance_error_msg(
+                    error="Full sync not allowed with filters"
+                )
+            )
+            return msgs
+
         try:
             data = SemaCategory.objects.get_api_data(
                 datasets=self._meta.model.objects.filter(pk=self.pk),
@@ -6042,32 +6229,20 @@ class SemaDataset(SemaBaseModel):
             msgs.append(self.get_instance_error_msg(str(err)))
             return msgs
 
-        for category in data:
-            try:
-                if category['CategoryId'] in self.categories.values_list(
-                        'category_id', flat=True):
-                    msgs.append(
-                        self.get_instance_up_to_date_msg(
-                            message=f"{category['Name']} already added"
-                        )
-                    )
-                else:
-                    self.categories.add(category['CategoryId'])
-                    self.save()
-                    msgs.append(
-                        self.get_update_success_msg(
-                            message=f"{category['Name']} added"
-                        )
-                    )
-            except Exception as err:
-                msgs.append(self.get_instance_error_msg(str(err)))
-                continue
+        msgs += self.reconcile_related_from_api_data(
+            attr='categories',
+            items=[
+                (category['CategoryId'], category['Name'])
+                for category in data
+            ],
+            full_sync=full_sync
+        )
 
         if not msgs:
             msgs.append(self.get_instance_up_to_date_msg())
         return msgs
 
-    def perform_dataset_vehicles_update_from_api(self):
+    def perform_dataset_vehicles_update_from_api(self, full_sync=False):
         msgs = []
         try:
             data = self.retrieve_vehicles_by_brand_data_from_api(
@@ -6077,31 +6252,10 @@ class SemaDataset(SemaBaseModel):
             msgs.append(self.get_instance_error_msg(str(err)))
             return msgs
 
-        for item in data:
-            try:
-                vehicle, _ = SemaVehicle.objects.get_or_create_by_names(
-                    year=item['Year'],
-                    make_name=item['MakeName'],
-                    model_name=item['ModelName'],
-                    submodel_name=item['SubmodelName']
-                )
-                if vehicle in self.vehicles.all():
-                    msgs.append(
-                        self.get_instance_up_to_date_msg(
-                            message=f"{vehicle} already added"
-                        )
-                    )
-                else:
-                    self.vehicles.add(vehicle)
-                    self.save()
-                    msgs.append(
-                        self.get_update_success_msg(
-                            message=f"{vehicle} added"
-                        )
-                    )
-            except Exception as err:
-                msgs.append(self.get_instance_error_msg(str(err)))
-                continue
+        msgs += self.reconcile_vehicles_from_api_data(
+            vehicle_items=data,
+            full_sync=full_sync
+        )
 
         if not msgs:
             msgs.append(self.get_instance_up_to_date_msg())
@@ -6150,81 +6304,44 @@ class SemaProduct(SemaBaseModel):
         blank=True,
         related_name='products'
     )
+    html_hash = CharField(
+        max_length=40,
+        blank=True,
+        editable=False,
+        verbose_name='HTML hash'
+    )
+    clean_html = TextField(
+        default=SemaHtmlSanitizer.EMPTY_HTML,
+        editable=False,
+        verbose_name='clean HTML'
+    )
 
-    @property
-    def clean_html(self):
-        all_image_classes = [
-            'main-product-img',
-            'brand-logo'
-        ]
-
-        all_extra_div_classes = [
-            'youtube-vids',
-        ]
-
-        def remove_head(html_):
-            prefix = '<html>\n' if '<html>' in html_ else ''
-            if '<head>' in html_:
-                html_ = f"{prefix}{html_.split('</head>', 1)[1]}"
-            return html_
-
-        def shrink_images(html_, image_classes_=None):
-            if not image_classes_:
-                image_classes_ = all_image_classes
-            image_width = '100px'
-            for image_class in image_classes_:
-                if f'class="{image_class}"' in html_:
-                    i = html_.index(f'class="{image_class}"')
-                    html_ = f'{html_[:i]}width="{image_width}" {html_[i:]}'
-            return html_
-
-        def remove_images(html_, image_classes_=None):
-            if not image_classes_:
-                image_classes_ = all_image_classes
-            soup = BeautifulSoup(html_)
-            for image_class in image_classes_:
-                for tag in soup.find_all('img', {'class': image_class}):
-                    tag.decompose()
-            html_ = str(soup)
-            return html_
-
-        def remove_extra_divs(html_, extra_div_classes_=None):
-            if not extra_div_classes_:
-                extra_div_classes_ = all_extra_div_classes
-            soup = BeautifulSoup(html_)
-            for div_class in extra_div_classes_:
-                for div in soup.find_all('div', {'id': div_class}):
-                    div.decompose()
-            html_ = str(soup)
-            return html_
-
-        def remove_buttons(html_):
-            soup = BeautifulSoup(html_)
-            for button in soup.find_all('button'):
-                button.decompose()
-            html_ = str(soup)
-            return html_
-
-        def remove_scripts(html_):
-            soup = BeautifulSoup(html_)
-            for script in soup.find_all('script'):
-                script.decompose()
-            html_ = str(soup)
-            return html_
-
-        if not self.html:
-            return '<html></html>'
-        return remove_head(
-            remove_extra_divs(
-                remove_scripts(
-                    remove_buttons(
-                        remove_images(
-                            self.html
-                        )
-                    )
-                )
-            )
-        )
+    # <editor-fold desc="html properties ...">
+    @staticmethod
+    def get_html_hash(html):
+        """
+        Returns hash of HTML content.
+
+        :param html: HTML content
+        :type html: str
+
+        :return: HTML hash
+        :rtype: str
+
+        """
+
+        return sha1((html or '').encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        # HTML is only cleaned again when it has changed, as cleaning
+        # parses the whole document.
+        if 'html' not in self.get_deferred_fields():
+            html_hash = self.get_html_hash(self.html)
+            if not html_hash == self.html_hash:
+                self.html_hash = html_hash
+                self.clean_html = html_sanitizer.clean(self.html)
+        super().save(*args, **kwargs)
+    # </editor-fold>
 
     # <editor-fold desc="relevancy properties ...">
     @property
@@ -6729,7 +6846,7 @@ class SemaProduct(SemaBaseModel):
     # </editor-fold>
 
     # <editor-fold desc="perform properties ...">
-    def perform_product_vehicles_update_from_api(self):
+    def perform_product_vehicles_update_from_api(self, full_sync=False):
         msgs = []
         try:
             data = self.retrieve_vehicles_by_product_data_from_api(
@@ -6739,40 +6856,20 @@ class SemaProduct(SemaBaseModel):
             msgs.append(self.get_instance_error_msg(str(err)))
             return msgs
 
+        vehicle_items = []
         for item in data:
             if self.part_number == item['PartNumber']:
-                for vehicle_item in item['Vehicles']:
-                    try:
-                        vehicle, _ = SemaVehicle.objects.get_or_create_by_names(
-                            year=vehicle_item['Year'],
-                            make_name=vehicle_item['MakeName'],
-                            model_name=vehicle_item['ModelName'],
-                            submodel_name=vehicle_item['SubmodelName']
-                        )
-                        if vehicle in self.vehicles.all():
-                            msgs.append(
-                                self.get_instance_up_to_date_msg(
-                                    message=f"{vehicle} already added"
-                                )
-                            )
-                        else:
-                            self.vehicles.add(vehicle)
-                            self.save()
-                            msgs.append(
-                                self.get_update_success_msg(
-                                    message=f"{vehicle} added"
-                                )
-                            )
-                    except Exception as err:
-                        msgs.append(self.get_instance_error_msg(str(err)))
-                        continue
+                vehicle_items += item['Vehicles']
             else:
                 msgs.append(
                     self.get_instance_error_msg(
                         error="Incorrect product returned"
                     )
                 )
-                continue
+        msgs += self.reconcile_vehicles_from_api_data(
+            vehicle_items=vehicle_items,
+            full_sync=full_sync and len(msgs) == 0
+        )
 
         if not msgs:
             msgs.append(self.get_instance_up_to_date_msg())
@@ -6813,18 +6910,19 @@ class SemaProduct(SemaBaseModel):
     def perform_product_html_update_from_api(self):
         """
         Retrieves product HTML data from SEMA API, and updates HTML
-        field.
+        field if HTML hash has changed.
 
-        :return: update or error message
+        :return: info, update, or error message
         :rtype: str
 
         """
 
         try:
             html = self.retrieve_product_html_data_from_api(annotated=False)
+            if self.get_html_hash(html) == self.html_hash:
+                return self.get_instance_up_to_date_msg()
             self.html = html
             self.save()
-            self.refresh_from_db()
             return self.get_update_success_msg()
         except Exception as err:
             return self.get_instance_error_msg(str(err))
@@ -6975,10 +7073,8 @@ class SemaDigitalAssetsPiesAttribute(SemaBasePiesAttributeModel):
     @property
     def is_broken(self):
         try:
-            urlopen(self.value)
-            return True
-        except (URLError, HTTPError):
-            return False
+            link_status = link_checker.check(urls=[self.value]).get(self.value)
+            return link_status.is_broken if link_status else None
         except Exception:
             raise
 
@@ -0,0 +1,666 @@
+"""
+This module defines the resolver of SEMA vehicles by names.
+
+"""
+
+
+import sys
+import time
+from threading import RLock
+
+from django.conf import settings
+from django.core.exceptions import MultipleObjectsReturned
+from django.db import connection, transaction
+
+
+class SemaVehicleResolver(object):
+    """
+    This class resolves make years by (year, make name), base vehicles
+    by (year, make name, model name), and vehicles by (year, make
+    name, model name, submodel name), from maps of all of them loaded
+    in a few queries, instead of a join per lookup.
+
+    Keys are tuples of interned names, so the many rows that share a
+    make or model name share its string. Names shared by more than one
+    object map to a tuple of their PKs, and resolve as
+    `MultipleObjectsReturned`, like a get by names would.
+
+    Missing objects (and any missing years, makes, models, and
+    submodels they need) are created unauthorized, one bulk create per
+    model per batch of keys. Creators are serialized by a transaction
+    level advisory lock (on PostgreSQL), and before each bulk create,
+    missing names and keys are looked up again under it, so objects
+    created by another process since maps were loaded (and committed
+    before the lock was taken) are not created twice. Maps
+    are reloaded on next use after `invalidate` is called (on SEMA
+    vehicle imports and deletes) or after TTL. Keys mapped to objects
+    deleted by another process are resolved again by
+    `resolve_objects`.
+
+    """
+
+    # TO NOTE: duplicate model names resolved by make, as in
+    # SemaBaseVehicleManager.get_or_create_by_names
+    MODEL_IDS_BY_MAKE = {
+        'Chrysler': 2489,
+        'GMC': 21430
+    }
+    # Key of PostgreSQL advisory lock held by creators of vehicles
+    CREATE_LOCK_ID = 4102
+    KEY_LOOKUPS = {
+        2: ('id', 'year_id', 'make__name'),
+        3: (
+            'base_vehicle_id',
+            'make_year__year_id',
+            'make_year__make__name',
+            'model__name'
+        ),
+        4: (
+            'vehicle_id',
+            'base_vehicle__make_year__year_id',
+            'base_vehicle__make_year__make__name',
+            'base_vehicle__model__name',
+            'submodel__name'
+        )
+    }
+
+    def __init__(self, ttl=None):
+        """
+        Initializes resolver with empty maps.
+
+        :param ttl: seconds after which maps are reloaded (None to
+            never expire)
+        :type ttl: int
+
+        """
+
+        self.ttl = ttl
+        self.loaded_at = None
+        self.years = set()
+        self.makes = {}
+        self.models = {}
+        self.submodels = {}
+        self.make_years = {}
+        self.base_vehicles = {}
+        self.vehicles = {}
+        self._lock = RLock()
+
+    # <editor-fold desc="map properties ...">
+    @staticmethod
+    def get_key(year, *names):
+        """
+        Returns map key of year and names, with names interned.
+
+        :param year: year
+        :type year: int
+        :param names: make, model, and/or submodel names
+
+        :return: map key
+        :rtype: tuple
+
+        """
+
+        return (int(year),) + tuple(sys.intern(str(name)) for name in names)
+
+    @classmethod
+    def get_vehicle_key(cls, item):
+        """
+        Returns vehicle map key of vehicle API data item.
+
+        :param item: vehicle API data item
+        :type item: dict
+
+        :return: vehicle map key
+        :rtype: tuple
+
+        **-Expected Data Format-**
+        ::
+            item = {
+                "Year": <int>,
+                "MakeName": <str>,
+                "ModelName": <str>,
+                "SubmodelName": <str>,
+                ...
+            }
+
+        """
+
+        return cls.get_key(
+            item['Year'],
+            item['MakeName'],
+            item['ModelName'],
+            item['SubmodelName']
+        )
+
+    @staticmethod
+    def add_to_map(map_, key, pk):
+        """
+        Maps key to PK, or to a tuple of PKs if key already maps to
+        another PK.
+
+        :param map_: map to which to add
+        :type map_: dict
+        :param key: map key
+        :param pk: object PK
+
+        """
+
+        existing = map_.get(key)
+        if existing is None or existing == pk:
+            map_[key] = pk
+        elif isinstance(existing, tuple):
+            if pk not in existing:
+                map_[key] = existing + (pk,)
+        else:
+            map_[key] = (existing, pk)
+
+    @property
+    def is_loaded(self):
+        """
+        Returns whether or not maps are loaded and not expired.
+
+        :rtype: bool
+
+        """
+
+        return bool(
+            self.loaded_at is not None
+            and (
+                self.ttl is None
+                or time.monotonic() - self.loaded_at < self.ttl
+            )
+        )
+
+    def invalidate(self):
+        """
+        Marks maps to be reloaded on next use.
+
+        """
+
+        with self._lock:
+            self.loaded_at = None
+
+    def load(self):
+        """
+        Loads maps of all years, makes, models, submodels, make years,
+        base vehicles, and vehicles.
+
+        :raises Exception: on general exception
+
+        """
+
+        from sema.models import (
+            SemaYear,
+            SemaMake,
+            SemaModel,
+            SemaSubmodel,
+            SemaMakeYear,
+            SemaBaseVehicle,
+            SemaVehicle
+        )
+
+        try:
+            with self._lock:
+                self.years = set(
+                    SemaYear.objects.values_list('year', flat=True)
+                )
+                self.makes = {}
+                for pk, name in SemaMake.objects.values_list(
+                        'make_id', 'name').iterator():
+                    self.add_to_map(self.makes, sys.intern(name), pk)
+                self.models = {}
+                for pk, name in SemaModel.objects.values_list(
+                        'model_id', 'name').iterator():
+                    self.add_to_map(self.models, sys.intern(name), pk)
+                self.submodels = {}
+                for pk, name in SemaSubmodel.objects.values_list(
+                        'submodel_id', 'name').iterator():
+                    self.add_to_map(self.submodels, sys.intern(name), pk)
+
+                self.make_years = {}
+                for pk, *names in SemaMakeYear.objects.values_list(
+                        *self.KEY_LOOKUPS[2]).iterator():
+                    self.add_to_map(self.make_years, self.get_key(*names), pk)
+                self.base_vehicles = {}
+                for pk, *names in SemaBaseVehicle.objects.values_list(
+                        *self.KEY_LOOKUPS[3]).iterator():
+                    self.add_to_map(
+                        self.base_vehicles,
+                        self.get_key(*names),
+                        pk
+                    )
+                self.vehicles = {}
+                for pk, *names in SemaVehicle.objects.values_list(
+                        *self.KEY_LOOKUPS[4]).iterator():
+                    self.add_to_map(self.vehicles, self.get_key(*names), pk)
+                self.loaded_at = time.monotonic()
+        except Exception:
+            raise
+
+    def load_names(self, map_, model, pk_attr, names):
+        """
+        Adds existing makes, models, or submodels of names (created
+        since maps were loaded) to map.
+
+        :param map_: map to which to add
+        :type map_: dict
+        :param model: model of map
+        :type model: django.db.models.Model
+        :param pk_attr: PK attribute of model
+        :type pk_attr: str
+        :param names: names to look up
+        :type names: iterable
+
+        """
+
+        names = set(names)
+        if not names:
+            return
+
+        for pk, name in model.objects.filter(
+                name__in=names).values_list(pk_attr, 'name'):
+            self.add_to_map(map_, sys.intern(name), pk)
+
+    def load_keys(self, map_, model, keys):
+        """
+        Adds existing make years, base vehicles, or vehicles of keys
+        (created since maps were loaded) to map.
+
+        :param map_: map to which to add
+        :type map_: dict
+        :param model: model of map
+        :type model: django.db.models.Model
+        :param keys: keys (of one level) to look up
+        :type keys: iterable
+
+        """
+
+        keys = set(keys)
+        if not keys:
+            return
+
+        lookups = self.KEY_LOOKUPS[len(next(iter(keys)))]
+        filters = {
+            f'{lookup}__in': {key[i] for key in keys}
+            for i, lookup in enumerate(lookups[1:])
+        }
+        for pk, *names in model.objects.filter(
+                **filters).values_list(*lookups):
+            key = self.get_key(*names)
+            if key in keys:
+                self.add_to_map(map_, key, pk)
+
+    @staticmethod
+    def get_pk(map_, key, model):
+        """
+        Returns PK that key maps to.
+
+        :param map_: map in which to look up key
+        :type map_: dict
+        :param key: map key
+        :param model: model of map (for exceptions)
+        :type model: django.db.models.Model
+
+        :return: object PK
+
+        :raises DoesNotExist: if key is not mapped
+        :raises MultipleObjectsReturned: if key maps to many PKs
+
+        """
+
+        pk = map_.get(key)
+        if pk is None:
+            raise model.DoesNotExist(
+                f'{model._meta.verbose_name.title()} {key} does not exist'
+            )
+        if isinstance(pk, tuple):
+            raise MultipleObjectsReturned(
+                f'{model._meta.verbose_name.title()} {key} returned '
+                f'{len(pk)} objects'
+            )
+        return pk
+
+    def get_model_pk(self, model_name, make_name):
+        """
+        Returns PK of model by name, using make to choose between
+        models of the same name.
+
+        :param model_name: model name
+        :type model_name: str
+        :param make_name: make name
+        :type make_name: str
+
+        :return: model PK
+        :rtype: int
+
+        :raises DoesNotExist: if model is not mapped
+        :raises MultipleObjectsReturned: if name maps to many models
+
+        """
+
+        from sema.models import SemaModel
+
+        pk = self.models.get(model_name)
+        if (isinstance(pk, tuple)
+                and self.MODEL_IDS_BY_MAKE.get(make_name) in pk):
+            return self.MODEL_IDS_BY_MAKE[make_name]
+        return self.get_pk(self.models, model_name, SemaModel)
+    # </editor-fold>
+
+    # <editor-fold desc="resolve properties ...">
+    def resolve(self, keys, create=True):
+        """
+        Returns PKs of make years, base vehicles, or vehicles by key,
+        creating any missing ones (unauthorized) in batches.
+
+        :param keys: (year, make name) keys of make years, (year, make
+            name, model name) keys of base vehicles, or (year, make
+            name, model name, submodel name) keys of vehicles
+        :type keys: iterable
+        :param create: whether or not to create missing objects
+        :type create: bool
+
+        :return: PKs by key, keys of created objects, and exceptions
+            by key of unresolved keys
+        :rtype: tuple
+
+        :raises Exception: on general exception
+
+        **-Return Format-**
+        ::
+            ret = (
+                {<key>: <PK>, ...},
+                {<key>, ...},
+                {<key>: <exception>, ...}
+            )
+
+        """
+
+        from sema.models import SemaMakeYear, SemaBaseVehicle, SemaVehicle
+
+        try:
+            with self._lock:
+                if not self.is_loaded:
+                    self.load()
+
+                keys = {self.get_key(*key) for key in keys}
+                if not keys:
+                    return {}, set(), {}
+                level = len(next(iter(keys)))
+                map_, model = {
+                    2: (self.make_years, SemaMakeYear),
+                    3: (self.base_vehicles, SemaBaseVehicle),
+                    4: (self.vehicles, SemaVehicle)
+                }[level]
+
+                created = set()
+                errors = {}
+                missing = [key for key in keys if key not in map_]
+                chunk_size = settings.SEMA_IMPORT_CHUNK_SIZE
+                for i in range(0, len(missing), chunk_size):
+                    if not create:
+                        break
+                    chunk = missing[i:i + chunk_size]
+                    with transaction.atomic():
+                        chunk_created, chunk_errors = self.create(
+                            keys=chunk
+                        )
+                    created.update(chunk_created)
+                    errors.update(chunk_errors)
+
+                pks = {}
+                for key in keys:
+                    if key in errors:
+                        continue
+                    try:
+                        pks[key] = self.get_pk(map_, key, model)
+                    except Exception as err:
+                        errors[key] = err
+                return pks, created & keys, errors
+        except Exception:
+            # Maps may be out of step with rolled back creates.
+            self.invalidate()
+            raise
+
+    def resolve_objects(self, queryset, keys, create=True):
+        """
+        Returns make years, base vehicles, or vehicles by key, like
+        `resolve`. Keys mapped to objects that no longer exist (deleted
+        since maps were loaded, possibly by another process) are
+        resolved again from reloaded maps, and created if missing.
+
+        :param queryset: make year, base vehicle, or vehicle queryset
+            (of keys' level) from which to get objects
+        :type queryset: django.db.models.QuerySet
+        :param keys: make year, base vehicle, or vehicle keys
+        :type keys: iterable
+        :param create: whether or not to create missing objects
+        :type create: bool
+
+        :return: objects by key, keys of created objects, and
+            exceptions by key of unresolved keys
+        :rtype: tuple
+
+        :raises Exception: on general exception
+
+        **-Return Format-**
+        ::
+            ret = (
+                {<key>: <object>, ...},
+                {<key>, ...},
+                {<key>: <exception>, ...}
+            )
+
+        """
+
+        model = queryset.model
+
+        try:
+            pks, created, errors = self.resolve(keys=keys, create=create)
+            objs = queryset.in_bulk(set(pks.values()))
+            stale = {key for key, pk in pks.items() if pk not in objs}
+            if stale:
+                self.invalidate()
+                for key in stale:
+                    del pks[key]
+                stale_pks, stale_created, stale_errors = self.resolve(
+                    keys=stale,
+                    create=create
+                )
+                pks.update(stale_pks)
+                created |= stale_created
+                errors.update(stale_errors)
+                objs.update(queryset.in_bulk(set(stale_pks.values())))
+
+            resolved = {}
+            for key, pk in pks.items():
+                if pk in objs:
+                    resolved[key] = objs[pk]
+                else:
+                    errors[key] = model.DoesNotExist(
+                        f'{model._meta.verbose_name.title()} {key} '
+                        f'does not exist'
+                    )
+            return resolved, created, errors
+        except Exception:
+            raise
+
+    def lock_creates(self):
+        """
+        Takes transaction level advisory lock on creates (on
+        PostgreSQL), so creators look up objects created by others
+        only once those are committed. The lock is held until the
+        transaction ends.
+
+        """
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(%s)',
+                    [self.CREATE_LOCK_ID]
+                )
+
+    def create(self, keys):
+        """
+        Creates missing make years, base vehicles, and vehicles of keys,
+        level by level, and adds them to maps. Objects created since maps
+        were loaded are looked up and added to maps instead. Must be
+        called in a transaction, which holds the create lock until it
+        commits.
+
+        :param keys: make year, base vehicle, or vehicle keys
+        :type keys: list
+
+        :return: keys of created objects (at every level), and
+            exceptions by key of keys that could not be created
+        :rtype: tuple
+
+        :raises Exception: on general exception
+
+        """
+
+        from sema.models import (
+            SemaYear,
+            SemaMake,
+            SemaModel,
+            SemaSubmodel,
+            SemaMakeYear,
+            SemaBaseVehicle,
+            SemaVehicle
+        )
+
+        created = set()
+        errors = {}
+
+        self.lock_creates()
+        years = {key[0] for key in keys} - self.years
+        self.years.update(
+            SemaYear.objects.filter(year__in=years).values_list(
+                'year',
+                flat=True
+            )
+        )
+        years -= self.years
+        SemaYear.objects.bulk_create(
+            [SemaYear(year=year, is_authorized=False) for year in years],
+            ignore_conflicts=True
+        )
+        self.years.update(years)
+        for year in years:
+            print(f'Created unauthorized year {year}')
+
+        for map_, model, pk_attr, index, label in (
+                (self.makes, SemaMake, 'make_id', 1, 'make'),
+                (self.models, SemaModel, 'model_id', 2, 'model'),
+                (self.submodels, SemaSubmodel, 'submodel_id', 3, 'submodel')):
+            names = {
+                key[index] for key in keys
+                if len(key) > index and key[index] not in map_
+            }
+            self.load_names(map_, model, pk_attr, names)
+            names = sorted(name for name in names if name not in map_)
+            pks = model.objects.get_unauthorized_pks(count=len(names))
+            model.objects.bulk_create(
+                [
+                    model(**{pk_attr: pk}, name=name, is_authorized=False)
+                    for pk, name in zip(pks, names)
+                ]
+            )
+            for pk, name in zip(pks, names):
+                map_[name] = pk
+                print(f'Created unauthorized {label} {name}')
+
+        self.load_keys(
+            self.make_years,
+            SemaMakeYear,
+            {key[:2] for key in keys if key[:2] not in self.make_years}
+        )
+        new_make_years = {}
+        for key in keys:
+            make_year_key = key[:2]
+            if (make_year_key in self.make_years
+                    or make_year_key in new_make_years):
+                continue
+            try:
+                new_make_years[make_year_key] = SemaMakeYear(
+                    year_id=key[0],
+                    make_id=self.get_pk(self.makes, key[1], SemaMake),
+                    is_authorized=False
+                )
+            except Exception as err:
+                errors[key] = err
+        SemaMakeYear.objects.bulk_create(new_make_years.values())
+        for pk, *names in SemaMakeYear.objects.filter(
+                year_id__in={obj.year_id for obj in new_make_years.values()},
+                make_id__in={obj.make_id for obj in new_make_years.values()}
+        ).values_list('id', 'year_id', 'make__name'):
+            self.add_to_map(self.make_years, self.get_key(*names), pk)
+        created.update(new_make_years.keys())
+        for make_year_key in new_make_years:
+            print(f'Created unauthorized make year {make_year_key}')
+
+        for map_, model, pk_attr, level, label in (
+                (self.base_vehicles, SemaBaseVehicle, 'base_vehicle_id', 3,
+                 'base vehicle'),
+                (self.vehicles, SemaVehicle, 'vehicle_id', 4, 'vehicle')):
+            self.load_keys(
+                map_,
+                model,
+                {
+                    key[:level] for key in keys
+                    if len(key) >= level and key[:level] not in map_
+                }
+            )
+            new_fields = {}
+            for key in keys:
+                if len(key) < level or key in errors:
+                    continue
+                level_key = key[:level]
+                if level_key in map_ or level_key in new_fields:
+                    continue
+                try:
+                    if level == 3:
+                        new_fields[level_key] = {
+                            'make_year_id': self.get_pk(
+                                self.make_years,
+                                key[:2],
+                                SemaMakeYear
+                            ),
+                            'model_id': self.get_model_pk(
+                                model_name=key[2],
+                                make_name=key[1]
+                            )
+                        }
+                    else:
+                        new_fields[level_key] = {
+                            'base_vehicle_id': self.get_pk(
+                                self.base_vehicles,
+                                key[:3],
+                                SemaBaseVehicle
+                            ),
+                            'submodel_id': self.get_pk(
+                                self.submodels,
+                                key[3],
+                                SemaSubmodel
+                            )
+                        }
+                except Exception as err:
+                    errors[key] = err
+            pks = model.objects.get_unauthorized_pks(count=len(new_fields))
+            model.objects.bulk_create(
+                [
+                    model(**{pk_attr: pk}, **fields, is_authorized=False)
+                    for pk, fields in zip(pks, new_fields.values())
+                ]
+            )
+            for pk, level_key in zip(pks, new_fields):
+                map_[level_key] = pk
+                print(f'Created unauthorized {label} {level_key}')
+            created.update(new_fields.keys())
+
+        return created, errors
+    # </editor-fold>
+
+
+vehicle_resolver = SemaVehicleResolver(ttl=settings.SEMA_VEHICLE_RESOLVER_TTL)
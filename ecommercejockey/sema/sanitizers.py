@@ -0,0 +1,111 @@
+"""
+This module defines the sanitizer of SEMA product HTML.
+
+"""
+
+
+from bs4 import BeautifulSoup, Tag
+
+
+class SemaHtmlSanitizer(object):
+    """
+    This class cleans SEMA product HTML for display: product and brand
+    images, buttons, scripts, and extra divs are removed, and so is the
+    head.
+
+    HTML is parsed once, and all removals are made in a single walk of
+    the tree, skipping subtrees of removed tags.
+
+    """
+
+    EMPTY_HTML = '<html></html>'
+    PARSER = 'html.parser'
+
+    def __init__(self, image_classes, extra_div_ids, tag_names):
+        """
+        Initializes sanitizer with what to remove.
+
+        :param image_classes: classes of images to remove
+        :type image_classes: list
+        :param extra_div_ids: IDs of divs to remove
+        :type extra_div_ids: list
+        :param tag_names: names of tags to remove
+        :type tag_names: list
+
+        """
+
+        self.image_classes = set(image_classes)
+        self.extra_div_ids = set(extra_div_ids)
+        self.tag_names = set(tag_names)
+
+    def is_removed(self, tag):
+        """
+        Returns whether or not tag is to be removed.
+
+        :param tag: tag
+        :type tag: bs4.Tag
+
+        :rtype: bool
+
+        """
+
+        if tag.name in self.tag_names:
+            return True
+        if tag.name == 'img':
+            return bool(self.image_classes & set(tag.get('class') or []))
+        if tag.name == 'div':
+            return tag.get('id') in self.extra_div_ids
+        return False
+
+    @staticmethod
+    def remove_head(html):
+        """
+        Returns HTML without head.
+
+        :param html: HTML
+        :type html: str
+
+        :return: HTML without head
+        :rtype: str
+
+        """
+
+        prefix = '<html>\n' if '<html>' in html else ''
+        if '<head>' in html:
+            html = f"{prefix}{html.split('</head>', 1)[1]}"
+        return html
+
+    def clean(self, html):
+        """
+        Returns clean HTML.
+
+        :param html: HTML
+        :type html: str
+
+        :return: clean HTML
+        :rtype: str
+
+        """
+
+        if not html:
+            return self.EMPTY_HTML
+
+        soup = BeautifulSoup(html, self.PARSER)
+        tags = [soup]
+        while tags:
+            tag = tags.pop()
+            for child in list(tag.children):
+                if not isinstance(child, Tag):
+                    continue
+                if self.is_removed(child):
+                    child.decompose()
+                else:
+                    tags.append(child)
+        return self.remove_head(str(soup))
+
+
+html_sanitizer = SemaHtmlSanitizer(
+    image_classes=['main-product-img', 'brand-logo'],
+    extra_div_ids=['youtube-vids'],
+    tag_names=['button', 'script']
+)
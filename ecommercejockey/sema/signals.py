@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import (
+    SemaYear,
+    SemaMake,
+    SemaModel,
+    SemaSubmodel,
+    SemaMakeYear,
+    SemaBaseVehicle,
+    SemaVehicle
+)
+from .resolvers import vehicle_resolver
+
+
+@receiver(post_delete, sender=SemaYear)
+@receiver(post_delete, sender=SemaMake)
+@receiver(post_delete, sender=SemaModel)
+@receiver(post_delete, sender=SemaSubmodel)
+@receiver(post_delete, sender=SemaMakeYear)
+@receiver(post_delete, sender=SemaBaseVehicle)
+@receiver(post_delete, sender=SemaVehicle)
+def invalidate_vehicle_resolver(sender, instance, **kwargs):
+    vehicle_resolver.invalidate()
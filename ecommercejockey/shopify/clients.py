@@ -10,11 +10,13 @@ from requests.exceptions import HTTPError
 from retry import retry
 
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
+from core.clients import BaseApiClient
 from core.exceptions import ApiRateLimitExceeded
 
 
-class ShopifyApiClient(object):
+class ShopifyApiClient(BaseApiClient):
     """
     This class defines the client used to perform calls to the Shopify
     API.
@@ -260,7 +262,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.post(url=url, json=body)
+            response = self.post(url=url, json=body)
             return self.get_json_body(response)['product']
         except Exception as err:
             raise
@@ -386,7 +388,7 @@ class ShopifyApiClient(object):
         url = f'{self.base_url}/products/{product_id}.json'
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['product']
         except Exception:
             raise
@@ -600,7 +602,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.put(url=url, json=body)
+            response = self.put(url=url, json=body)
             return self.get_json_body(response)['product']
         except Exception:
             raise
@@ -610,7 +612,7 @@ class ShopifyApiClient(object):
         url = f'{self.base_url}/products/{product_id}.json'
 
         try:
-            response = requests.delete(url=url)
+            response = self.delete(url=url)
             return self.get_json_body(response)
         except Exception:
             raise
@@ -627,7 +629,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.post(url=url, json=body)
+            response = self.post(url=url, json=body)
             return self.get_json_body(response)['metafield']
         except Exception:
             raise
@@ -637,7 +639,7 @@ class ShopifyApiClient(object):
         url = f'{self.base_url}/products/{product_id}/metafields.json'
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['metafields']
         except Exception:
             raise
@@ -650,7 +652,7 @@ class ShopifyApiClient(object):
         )
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['metafield']
         except Exception:
             raise
@@ -672,7 +674,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.put(url=url, json=body)
+            response = self.put(url=url, json=body)
             return self.get_json_body(response)['metafield']
         except Exception:
             raise
@@ -685,7 +687,7 @@ class ShopifyApiClient(object):
         )
 
         try:
-            response = requests.delete(url=url)
+            response = self.delete(url=url)
             return self.get_json_body(response)
         except Exception:
             raise
@@ -701,12 +703,12 @@ class ShopifyApiClient(object):
             if 'attachment' in image_data:
                 attachment = image_data['attachment']
                 file = {'attachment': open(attachment, 'rb')}
-                response = requests.post(url=url, files=file)
+                response = self.post(url=url, files=file)
             elif 'src' in image_data:
                 body = {
                     'image': image_data
                 }
-                response = requests.post(url=url, json=body)
+                response = self.post(url=url, json=body)
             else:
                 raise Exception()
 
@@ -719,7 +721,7 @@ class ShopifyApiClient(object):
         url = f'{self.base_url}/products/{product_id}/images.json'
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['images']
         except Exception:
             raise
@@ -732,7 +734,7 @@ class ShopifyApiClient(object):
         )
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['image']
         except Exception:
             raise
@@ -757,12 +759,12 @@ class ShopifyApiClient(object):
                         'attachment': open(attachment, 'rb')
                     }
                 }
-                response = requests.put(url=url, files=file)
+                response = self.put(url=url, files=file)
             elif 'src' in image_data:
                 body = {
                     'image': image_data
                 }
-                response = requests.put(url=url, json=body)
+                response = self.put(url=url, json=body)
             else:
                 raise Exception()
 
@@ -778,7 +780,7 @@ class ShopifyApiClient(object):
         )
 
         try:
-            response = requests.delete(url=url)
+            response = self.delete(url=url)
             return self.get_json_body(response)
         except Exception:
             raise
@@ -791,7 +793,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.post(url=url, json=body)
+            response = self.post(url=url, json=body)
             return self.get_json_body(response)['smart_collection']
         except Exception as err:
             raise
@@ -801,7 +803,7 @@ class ShopifyApiClient(object):
         url = f'{self.base_url}/smart_collections/{collection_id}.json'
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['smart_collection']
         except Exception:
             raise
@@ -819,7 +821,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.put(url=url, json=body)
+            response = self.put(url=url, json=body)
             return self.get_json_body(response)['smart_collection']
         except Exception:
             raise
@@ -831,7 +833,7 @@ class ShopifyApiClient(object):
         )
 
         try:
-            response = requests.delete(url=url)
+            response = self.delete(url=url)
             return self.get_json_body(response)
         except Exception:
             raise
@@ -848,7 +850,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.post(url=url, json=body)
+            response = self.post(url=url, json=body)
             return self.get_json_body(response)['metafield']
         except Exception:
             raise
@@ -858,7 +860,7 @@ class ShopifyApiClient(object):
         url = f'{self.base_url}/smart_collections/{collection_id}/metafields.json'
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['metafields']
         except Exception:
             raise
@@ -871,7 +873,7 @@ class ShopifyApiClient(object):
         )
 
         try:
-            response = requests.get(url=url)
+            response = self.get(url=url)
             return self.get_json_body(response)['metafield']
         except Exception:
             raise
@@ -893,7 +895,7 @@ class ShopifyApiClient(object):
         }
 
         try:
-            response = requests.put(url=url, json=body)
+            response = self.put(url=url, json=body)
             return self.get_json_body(response)['metafield']
         except Exception:
             raise
@@ -906,10 +908,10 @@ class ShopifyApiClient(object):
         )
 
         try:
-            response = requests.delete(url=url)
+            response = self.delete(url=url)
             return self.get_json_body(response)
         except Exception:
             raise
 
 
-shopify_client = ShopifyApiClient()
+shopify_client = SimpleLazyObject(ShopifyApiClient)
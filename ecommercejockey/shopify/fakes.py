@@ -0,0 +1,436 @@
+"""
+This module defines the fake Shopify API used to benchmark Shopify
+pipelines offline.
+
+"""
+
+
+from copy import deepcopy
+from datetime import datetime
+from itertools import count
+from threading import Lock
+
+from django.conf import settings
+
+from core.fakes import FakeApi
+
+
+class FakeShopifyApi(FakeApi):
+    """
+    This class defines a fake Shopify API backed by an in-memory store.
+    Created products, collections, metafields, and images are assigned
+    IDs and echoed back the way Shopify returns them, so create and
+    update pipelines run end to end. Rejections are sent with the
+    Shopify rate limit status code (429).
+
+    """
+
+    base_url = settings.SHOPIFY_BASE_URL
+    rate_limit_status_code = 429
+    routes = (
+        ('POST', r'/products\.json', 'create_product'),
+        ('GET', r'/products/(\d+)\.json', 'retrieve_product'),
+        ('PUT', r'/products/(\d+)\.json', 'update_product'),
+        ('DELETE', r'/products/(\d+)\.json', 'delete_product'),
+        ('POST', r'/products/(\d+)/metafields\.json', 'create_metafield'),
+        ('GET', r'/products/(\d+)/metafields\.json', 'retrieve_metafields'),
+        (
+            'GET',
+            r'/products/(\d+)/metafields/(\d+)\.json',
+            'retrieve_metafield'
+        ),
+        (
+            'PUT',
+            r'/products/(\d+)/metafields/(\d+)\.json',
+            'update_metafield'
+        ),
+        (
+            'DELETE',
+            r'/products/(\d+)/metafields/(\d+)\.json',
+            'delete_metafield'
+        ),
+        ('POST', r'/products/(\d+)/images\.json', 'create_image'),
+        ('GET', r'/products/(\d+)/images\.json', 'retrieve_images'),
+        ('GET', r'/products/(\d+)/images/(\d+)\.json', 'retrieve_image'),
+        ('PUT', r'/products/(\d+)/images/(\d+)\.json', 'update_image'),
+        ('DELETE', r'/products/(\d+)/images/(\d+)\.json', 'delete_image'),
+        ('POST', r'/smart_collections\.json', 'create_collection'),
+        (
+            'GET',
+            r'/smart_collections/(\d+)\.json',
+            'retrieve_collection'
+        ),
+        ('PUT', r'/smart_collections/(\d+)\.json', 'update_collection'),
+        (
+            'DELETE',
+            r'/smart_collections/(\d+)\.json',
+            'delete_collection'
+        ),
+        (
+            'POST',
+            r'/smart_collections/(\d+)/metafields\.json',
+            'create_metafield'
+        ),
+        (
+            'GET',
+            r'/smart_collections/(\d+)/metafields\.json',
+            'retrieve_metafields'
+        ),
+        (
+            'GET',
+            r'/smart_collections/(\d+)/metafields/(\d+)\.json',
+            'retrieve_metafield'
+        ),
+        (
+            'PUT',
+            r'/smart_collections/(\d+)/metafields/(\d+)\.json',
+            'update_metafield'
+        ),
+        (
+            'DELETE',
+            r'/smart_collections/(\d+)/metafields/(\d+)\.json',
+            'delete_metafield'
+        )
+    )
+
+    def __init__(self, scale=1, seed=0, base_url=None):
+        super().__init__(scale=scale, seed=seed, base_url=base_url)
+        self.ids = count(1000000001 + seed * 1000000)
+        self.products = {}
+        self.collections = {}
+        self.metafields = {}
+        self.images = {}
+        self._lock = Lock()
+
+    # <editor-fold desc="store properties ...">
+    @staticmethod
+    def get_timestamp():
+        return datetime.now().strftime('%Y-%m-%dT%H:%M:%S-00:00')
+
+    @staticmethod
+    def get_not_found():
+        return 404, {'errors': 'Not Found'}
+
+    def get_product_images(self, product_id):
+        return [
+            image for image in self.images.values()
+            if image['product_id'] == product_id
+        ]
+
+    def get_product_data(self, product_id):
+        product = deepcopy(self.products[product_id])
+        images = sorted(
+            self.get_product_images(product_id),
+            key=lambda image: image['position']
+        )
+        product['images'] = deepcopy(images)
+        product['image'] = deepcopy(images[0]) if images else None
+        return product
+
+    def set_product_data(self, product, data):
+        now = self.get_timestamp()
+        product_id = product['id']
+        for key in ['title', 'body_html', 'vendor', 'product_type',
+                    'published_scope', 'handle']:
+            if key in data:
+                product[key] = data[key]
+        if 'tags' in data:
+            tags = data['tags']
+            if isinstance(tags, (list, tuple)):
+                tags = ', '.join(tags)
+            product['tags'] = tags
+        if 'published' in data or 'is_published' in data:
+            published = data.get('published', data.get('is_published'))
+            product['published_at'] = now if published else None
+
+        if 'options' in data or not product.get('options'):
+            options = data.get('options') or [
+                {'name': 'Title', 'values': ['Default Title']}
+            ]
+            existing = {
+                option['name']: option['id']
+                for option in product.get('options', [])
+            }
+            product['options'] = [
+                {
+                    'id': existing.get(option['name']) or next(self.ids),
+                    'product_id': product_id,
+                    'name': option['name'],
+                    'position': option.get('position', position),
+                    'values': option.get('values', [])
+                }
+                for position, option in enumerate(options, start=1)
+            ]
+
+        if 'variants' in data or not product.get('variants'):
+            variants = data.get('variants') or [{'title': 'Default Title'}]
+            existing = {
+                variant['id']: variant
+                for variant in product.get('variants', [])
+            }
+            product['variants'] = []
+            for position, variant_data in enumerate(variants, start=1):
+                variant = existing.get(variant_data.get('id')) or {
+                    'id': next(self.ids),
+                    'product_id': product_id,
+                    'inventory_item_id': next(self.ids),
+                    'created_at': now,
+                    'image_id': None,
+                    'option1': 'Default Title',
+                    'option2': None,
+                    'option3': None,
+                    'barcode': '',
+                    'compare_at_price': None,
+                    'grams': 0,
+                    'weight': 0.0,
+                    'weight_unit': 'lb',
+                    'fulfillment_service': 'manual',
+                    'inventory_management': None,
+                    'inventory_policy': 'deny',
+                    'inventory_quantity': 0,
+                    'old_inventory_quantity': 0,
+                    'requires_shipping': True,
+                    'price': '0.00',
+                    'sku': '',
+                    'taxable': True
+                }
+                variant.update(
+                    {
+                        key: value for key, value in variant_data.items()
+                        if not key == 'id'
+                    }
+                )
+                variant.setdefault('title', 'Default Title')
+                variant['position'] = variant_data.get('position', position)
+                variant['updated_at'] = now
+                product['variants'].append(variant)
+
+        for position, image_data in enumerate(
+                data.get('images') or [], start=1):
+            self.add_image(product_id, dict(image_data, position=position))
+
+        product['updated_at'] = now
+
+    def add_image(self, product_id, data):
+        now = self.get_timestamp()
+        image_id = next(self.ids)
+        image = {
+            'id': image_id,
+            'product_id': product_id,
+            'position': data.get(
+                'position', len(self.get_product_images(product_id)) + 1
+            ),
+            'created_at': now,
+            'updated_at': now,
+            'alt': data.get('alt'),
+            'width': 1000,
+            'height': 1000,
+            'src': data.get('src') or (
+                f'https://cdn.shopify.com/s/files/fake/{image_id}.jpg'
+            ),
+            'variant_ids': data.get('variant_ids', [])
+        }
+        self.images[image_id] = image
+        return image
+
+    def get_owner(self, owner_id, owner_type):
+        owners = (
+            self.products if owner_type == 'products' else self.collections
+        )
+        return owners.get(int(owner_id))
+    # </editor-fold>
+
+    # <editor-fold desc="route properties ...">
+    def create_product(self, request):
+        data = request.params.get('product', {})
+        if not data.get('title'):
+            return 422, {'errors': {'title': ["can't be blank"]}}
+        with self._lock:
+            product_id = next(self.ids)
+            now = self.get_timestamp()
+            product = {
+                'id': product_id,
+                'admin_graphql_api_id': (
+                    f'gid://shopify/Product/{product_id}'
+                ),
+                'created_at': now,
+                'published_at': now,
+                'published_scope': 'web',
+                'template_suffix': None,
+                'handle': str(data['title']).lower().replace(' ', '-'),
+                'body_html': '',
+                'product_type': '',
+                'vendor': '',
+                'tags': ''
+            }
+            self.products[product_id] = product
+            self.set_product_data(product, data)
+            return 201, {'product': self.get_product_data(product_id)}
+
+    def retrieve_product(self, request, product_id):
+        with self._lock:
+            if int(product_id) not in self.products:
+                return self.get_not_found()
+            return 200, {'product': self.get_product_data(int(product_id))}
+
+    def update_product(self, request, product_id):
+        data = request.params.get('product', {})
+        with self._lock:
+            product = self.products.get(int(product_id))
+            if not product:
+                return self.get_not_found()
+            self.set_product_data(product, data)
+            return 200, {'product': self.get_product_data(int(product_id))}
+
+    def delete_product(self, request, product_id):
+        with self._lock:
+            if not self.products.pop(int(product_id), None):
+                return self.get_not_found()
+            for image in self.get_product_images(int(product_id)):
+                del self.images[image['id']]
+            return 200, {}
+
+    def create_metafield(self, request, owner_id):
+        data = request.params.get('metafield', {})
+        owner_type = request.path.split('/')[-3]
+        with self._lock:
+            if not self.get_owner(owner_id, owner_type):
+                return self.get_not_found()
+            metafield_id = next(self.ids)
+            now = self.get_timestamp()
+            metafield = {
+                'id': metafield_id,
+                'owner_id': int(owner_id),
+                'owner_resource': owner_type.rstrip('s'),
+                'created_at': now,
+                'updated_at': now,
+                'namespace': data.get('namespace'),
+                'key': data.get('key'),
+                'value': data.get('value'),
+                'value_type': data.get('value_type', 'string'),
+                'description': None
+            }
+            self.metafields[metafield_id] = metafield
+            return 201, {'metafield': deepcopy(metafield)}
+
+    def retrieve_metafields(self, request, owner_id):
+        with self._lock:
+            metafields = [
+                deepcopy(metafield)
+                for metafield in self.metafields.values()
+                if metafield['owner_id'] == int(owner_id)
+            ]
+            return 200, {'metafields': metafields}
+
+    def retrieve_metafield(self, request, owner_id, metafield_id):
+        with self._lock:
+            metafield = self.metafields.get(int(metafield_id))
+            if not metafield:
+                return self.get_not_found()
+            return 200, {'metafield': deepcopy(metafield)}
+
+    def update_metafield(self, request, owner_id, metafield_id):
+        data = request.params.get('metafield', {})
+        with self._lock:
+            metafield = self.metafields.get(int(metafield_id))
+            if not metafield:
+                return self.get_not_found()
+            for key in ['namespace', 'key', 'value', 'value_type']:
+                if key in data:
+                    metafield[key] = data[key]
+            metafield['updated_at'] = self.get_timestamp()
+            return 200, {'metafield': deepcopy(metafield)}
+
+    def delete_metafield(self, request, owner_id, metafield_id):
+        with self._lock:
+            if not self.metafields.pop(int(metafield_id), None):
+                return self.get_not_found()
+            return 200, {}
+
+    def create_image(self, request, product_id):
+        data = request.params.get('image', {})
+        with self._lock:
+            if int(product_id) not in self.products:
+                return self.get_not_found()
+            image = self.add_image(int(product_id), data)
+            return 200, {'image': deepcopy(image)}
+
+    def retrieve_images(self, request, product_id):
+        with self._lock:
+            images = deepcopy(self.get_product_images(int(product_id)))
+            return 200, {'images': images}
+
+    def retrieve_image(self, request, product_id, image_id):
+        with self._lock:
+            image = self.images.get(int(image_id))
+            if not image:
+                return self.get_not_found()
+            return 200, {'image': deepcopy(image)}
+
+    def update_image(self, request, product_id, image_id):
+        data = request.params.get('image', {})
+        with self._lock:
+            image = self.images.get(int(image_id))
+            if not image:
+                return self.get_not_found()
+            for key in ['alt', 'position', 'src', 'variant_ids']:
+                if key in data:
+                    image[key] = data[key]
+            image['updated_at'] = self.get_timestamp()
+            return 200, {'image': deepcopy(image)}
+
+    def delete_image(self, request, product_id, image_id):
+        with self._lock:
+            if not self.images.pop(int(image_id), None):
+                return self.get_not_found()
+            return 200, {}
+
+    def create_collection(self, request):
+        data = request.params.get('smart_collection', {})
+        with self._lock:
+            collection_id = next(self.ids)
+            now = self.get_timestamp()
+            collection = dict(
+                {
+                    'id': collection_id,
+                    'handle': str(data.get('title', '')).lower(),
+                    'created_at': now,
+                    'published_at': now,
+                    'published_scope': 'web',
+                    'disjunctive': False,
+                    'rules': [],
+                    'sort_order': 'best-selling',
+                    'template_suffix': None,
+                    'body_html': None
+                },
+                **data
+            )
+            collection['id'] = collection_id
+            collection['updated_at'] = now
+            self.collections[collection_id] = collection
+            return 201, {'smart_collection': deepcopy(collection)}
+
+    def retrieve_collection(self, request, collection_id):
+        with self._lock:
+            collection = self.collections.get(int(collection_id))
+            if not collection:
+                return self.get_not_found()
+            return 200, {'smart_collection': deepcopy(collection)}
+
+    def update_collection(self, request, collection_id):
+        data = request.params.get('smart_collection', {})
+        with self._lock:
+            collection = self.collections.get(int(collection_id))
+            if not collection:
+                return self.get_not_found()
+            collection.update(data)
+            collection['id'] = int(collection_id)
+            collection['updated_at'] = self.get_timestamp()
+            return 200, {'smart_collection': deepcopy(collection)}
+
+    def delete_collection(self, request, collection_id):
+        with self._lock:
+            if not self.collections.pop(int(collection_id), None):
+                return self.get_not_found()
+            return 200, {}
+    # </editor-fold>
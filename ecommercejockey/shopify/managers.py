@@ -205,6 +205,18 @@ class ShopifyProductQuerySet(QuerySet):
         if not msgs:
             msgs.append(self.model.get_class_up_to_date_msg())
         return msgs
+
+    def perform_calculated_fields_update(self):
+        msgs = []
+        for product in self:
+            try:
+                msgs.append(product.perform_calculated_fields_update())
+            except Exception as err:
+                msgs.append(product.get_instance_error_msg(str(err)))
+
+        if not msgs:
+            msgs.append(self.model.get_class_up_to_date_msg())
+        return msgs
     # </editor-fold>
 
 
@@ -1,7 +1,18 @@
-def initialize_sema():
-    from sema.models import *
-    from task.utils import *
-
+from sema.crawlers import SemaVehicleCrawler
+from sema.models import (
+    SemaBrand,
+    SemaCategory,
+    SemaDataset,
+    SemaMake,
+    SemaModel,
+    SemaProduct,
+    SemaSubmodel,
+    SemaYear
+)
+from task.utils import print_header, print_messages, print_subheader
+
+
+def initialize_sema(restart_crawl=False):
     print_errors_only = True
     import_new_only = True
     filters = {}
@@ -44,32 +55,11 @@ def initialize_sema():
 
     print_header("sema make years, base vehicles, vehicles, and engines")
 
-    print_subheader("importing sema make years")
-    msgs = SemaMakeYear.objects.perform_import_from_api(new_only=import_new_only, **filters)
+    print_subheader("crawling sema make years, base vehicles, vehicles, & engines")
+    crawler = SemaVehicleCrawler(new_only=import_new_only)
+    msgs = crawler.crawl(restart=restart_crawl)
     print_messages(msgs, errors_only=print_errors_only)
 
-    print_subheader("importing sema base vehicles")
-    for make_year in SemaMakeYear.objects.all():
-        make_years = SemaMakeYear.objects.filter(pk=make_year.pk)
-        msgs = SemaBaseVehicle.objects.perform_import_from_api(make_years=make_years)
-        print_messages(msgs, errors_only=print_errors_only)
-
-    print_subheader("importing sema vehicles")
-    for base_vehicle in SemaBaseVehicle.objects.all():
-        base_vehicles = SemaBaseVehicle.objects.filter(pk=base_vehicle.pk)
-        msgs = SemaVehicle.objects.perform_import_from_api(base_vehicles=base_vehicles)
-        print_messages(msgs, errors_only=print_errors_only)
-
-    print_subheader("importing sema engines")
-    for vehicle in SemaVehicle.objects.all():
-        filters = {
-            'year': vehicle.base_vehicle.make_year.year.pk,
-            'make_id': vehicle.base_vehicle.make_year.make.pk,
-            'model_id': vehicle.base_vehicle.model.pk
-        }
-        msgs = SemaEngine.objects.perform_import_from_api(**filters)
-        print_messages(msgs, errors_only=print_errors_only)
-
     # ------------------
 
     print_header("sema categories & products")
@@ -80,4 +70,4 @@ def initialize_sema():
 
     print_subheader("importing sema products")
     msgs = SemaProduct.objects.perform_import_from_api(new_only=import_new_only, **filters)
-    print_messages(msgs, errors_only=print_errors_only)
\ No newline at end of file
+    print_messages(msgs, errors_only=print_errors_only)